@@ -0,0 +1,3 @@
+#!/usr/bin/env python
+"""Benchmarks for the AkaNamen Bot. Run them from the repositories root directory, e.g. via
+``python -m benchmarks.memory``."""
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""Measures the end-to-end latency of :meth:`components.Questioner.ask_question` against a local
+fake Bot API server, which answers every request after a fixed delay.
+
+Usage::
+
+    python -m benchmarks.ask_question [delay per request in ms ...]
+"""
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+from geopy import Photon
+from telegram import Bot
+from telegram.utils.request import Request
+
+from components import Member, Questioner
+from tests.addresses import get_address_from_cache
+from tests.orchestra import orchestra as synthetic_orchestra
+
+CHAT_ID = 123456
+NUMBER_OF_QUESTIONS = 20
+MODES = {
+    'hints': (['photo_file_id'], ['first_name', 'last_name', 'nickname']),
+    'photos': (['first_name', 'last_name', 'nickname'], ['photo_file_id']),
+}
+
+
+def fake_message(method: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Builds a minimal message as returned by the Bot API for the given request."""
+    message: Dict[str, Any] = {
+        'message_id': random.randint(1, 10 ** 6),
+        'date': int(time.time()),
+        'chat': {'id': CHAT_ID, 'type': 'private'},
+    }
+    if method == 'sendPoll':
+        message['poll'] = {
+            'id': str(random.randint(1, 10 ** 9)),
+            'question': payload['question'],
+            'options': [{'text': o, 'voter_count': 0} for o in json.loads(payload['options'])],
+            'total_voter_count': 0,
+            'is_closed': False,
+            'is_anonymous': False,
+            'type': 'quiz',
+            'allows_multiple_answers': False,
+            'correct_option_id': payload['correct_option_id'],
+        }
+    return message
+
+
+def start_server(delay: float) -> ThreadingHTTPServer:
+    """Starts a fake Bot API server in a background thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:  # pylint: disable=C0103
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            # Media groups are sent as multipart/form-data, but we don't need their content
+            is_json = self.headers['Content-Type'].startswith('application/json')
+            payload = json.loads(body) if is_json else {}
+            method = self.path.rsplit('/', 1)[-1]
+            time.sleep(delay)
+            if method == 'sendMediaGroup':
+                result: Any = [fake_message(method, payload) for _ in range(2)]
+            else:
+                result = fake_message(method, payload)
+            body = json.dumps({'ok': True, 'result': result}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:  # pylint: disable=W0221
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(bot: Bot, mode: str, prefetch: bool) -> float:
+    """
+    Returns:
+        The mean latency of a question in seconds.
+    """
+    orchestra = synthetic_orchestra(100, None, None)
+    orchestra.register_member(Member(CHAT_ID))
+    hint_attributes, question_attributes = MODES[mode]
+    questioner = Questioner(
+        user_id=CHAT_ID,
+        orchestra=orchestra,
+        hint_attributes=list(hint_attributes),
+        question_attributes=list(question_attributes),
+        number_of_questions=NUMBER_OF_QUESTIONS,
+        bot=bot,
+        prefetch=prefetch,
+    )
+    start = time.perf_counter()
+    for _ in range(NUMBER_OF_QUESTIONS):
+        questioner.ask_question()
+    return (time.perf_counter() - start) / NUMBER_OF_QUESTIONS
+
+
+def main(delays: List[int]) -> None:
+    """Prints the results for the given delays per request."""
+    Photon.geocode = get_address_from_cache
+
+    print(f'{"delay [ms]":>10} | {"mode":>6} | {"plain [ms]":>10} | {"prefetch [ms]":>13}')
+    for delay in delays:
+        server = start_server(delay / 1000)
+        bot = Bot(
+            '123:ABC',
+            base_url=f'http://127.0.0.1:{server.server_port}/bot',
+            request=Request(con_pool_size=8),
+        )
+        for mode in MODES:
+            plain, prefetch = (1000 * measure(bot, mode, prefetch=p_f) for p_f in [False, True])
+            print(f'{delay:10} | {mode:>6} | {plain:10.1f} | {prefetch:13.1f}')
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [0, 20, 50])
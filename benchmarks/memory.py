@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""Compares the memory footprint of orchestras with shared and with copied members.
+
+Usage::
+
+    python -m benchmarks.memory [number of members ...]
+"""
+import gc
+import pickle
+import sys
+import tracemalloc
+from typing import List, Tuple
+
+from geopy import Photon
+
+from components import Member, Orchestra
+from tests.addresses import get_address_from_cache
+from tests.orchestra import orchestra as synthetic_orchestra
+
+
+def build(members: List[Member], copy_members: bool) -> Tuple[int, int]:
+    """
+    Builds an orchestra from the given members.
+
+    Returns:
+        The memory allocated for the orchestra and the size of the pickled orchestra in bytes.
+    """
+    gc.collect()
+    tracemalloc.start()
+    orchestra = Orchestra(copy_members=copy_members)
+    for member in members:
+        orchestra.register_member(member)
+    gc.collect()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return memory, len(pickle.dumps(orchestra))
+
+
+def main(sizes: List[int]) -> None:
+    """Prints the results for orchestras of the given sizes."""
+    Photon.geocode = get_address_from_cache
+
+    print(f'{"members":>8} | {"mode":>6} | {"memory [KiB]":>12} | {"pickle [KiB]":>12}')
+    for size in sizes:
+        members = list(synthetic_orchestra(size + 1, None, None).members.values())
+        results = {mode: build(members, mode == 'copied') for mode in ['copied', 'shared']}
+        for mode, (memory, pickled) in results.items():
+            print(f'{size:8} | {mode:>6} | {memory / 1024:12.1f} | {pickled / 1024:12.1f}')
+        memory_ratio = results['copied'][0] / results['shared'][0]
+        pickle_ratio = results['copied'][1] / results['shared'][1]
+        print(f'{size:8} | {"ratio":>6} | {memory_ratio:12.1f} | {pickle_ratio:12.1f}')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [100, 500])
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""Compares the time of a cold rebuild of the orchestra by registering the members one by one
+and by :meth:`components.Orchestra.from_members`.
+
+Usage::
+
+    python -m benchmarks.rebuild [number of members ...]
+"""
+import sys
+import time
+from typing import List
+
+from geopy import Photon
+
+from components import Member, Orchestra
+from tests.addresses import get_address_from_cache
+from tests.orchestra import orchestra as synthetic_orchestra
+
+
+def register_one_by_one(members: List[Member]) -> Orchestra:
+    """Rebuilds the orchestra as done before :meth:`components.Orchestra.from_members`."""
+    orchestra = Orchestra()
+    for member in members:
+        orchestra.register_member(member.copy())
+    return orchestra
+
+
+def measure(members: List[Member], repeat: int) -> List[float]:
+    """
+    Returns:
+        The best of :attr:`repeat` runs in seconds for both ways of rebuilding.
+    """
+    out = []
+    for build in [register_one_by_one, Orchestra.from_members]:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            build(members)
+            timings.append(time.perf_counter() - start)
+        out.append(min(timings))
+    return out
+
+
+def main(sizes: List[int]) -> None:
+    """Prints the results for orchestras of the given sizes."""
+    Photon.geocode = get_address_from_cache
+
+    print(f'{"members":>8} | {"one by one [s]":>14} | {"from_members [s]":>16} | {"speedup":>7}')
+    for size in sizes:
+        members = list(synthetic_orchestra(size + 1, None, None).members.values())
+        one_by_one, bulk = measure(members, repeat=3 if size <= 1000 else 1)
+        print(f'{size:8} | {one_by_one:14.3f} | {bulk:16.3f} | {one_by_one / bulk:7.1f}')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000])
@@ -15,6 +15,9 @@ from .constants import (
     GAME_MESSAGE_KEY,
     EDITING_USER_KEY,
     CONVERSATION_KEY,
+    PHOTO_CACHE_KEY,
+    DAILY_QUIZ_KEY,
+    GEOCODE_CACHE_KEY,
 )
 
 from .keyboards import (
@@ -61,4 +64,7 @@ __all__ = [
     'BANNING_KEY',
     'GAME_KEY',
     'CONVERSATION_KEY',
+    'PHOTO_CACHE_KEY',
+    'DAILY_QUIZ_KEY',
+    'GEOCODE_CACHE_KEY',
 ]
@@ -1,11 +1,15 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """This module contains functions for the admin."""
+from typing import List
+
 from telegram import Update
+from telegram.constants import MAX_MESSAGE_LENGTH
 from telegram.ext import CallbackContext
 
-from bot import ORCHESTRA_KEY
-from components import Orchestra
+from bot import ORCHESTRA_KEY, GEOCODE_CACHE_KEY
+from bot.game import QUESTION_HANDLER
+from components import Orchestra, Question
 
 
 def rebuild_orchestra(update: Update, context: CallbackContext) -> None:
@@ -19,10 +23,84 @@ def rebuild_orchestra(update: Update, context: CallbackContext) -> None:
         context: The context as provided by the :class:`telegram.ext.Dispatcher`.
     """
     members = context.bot_data[ORCHESTRA_KEY].members.values()
-    orchestra = Orchestra()
+    context.bot_data[ORCHESTRA_KEY] = Orchestra.from_members(members)
+    update.message.reply_text('Orchester neu besetzt.')
 
-    for member in members:
-        orchestra.register_member(member.copy())
 
-    context.bot_data[ORCHESTRA_KEY] = orchestra
-    update.message.reply_text('Orchester neu besetzt.')
+LOW_HINT_MEMBERS = 5
+""":obj:`int`: Pairs of attributes with fewer hint members are marked in :meth:`question_space`."""
+
+
+def question_space(update: Update, context: CallbackContext) -> None:
+    """
+    Reports for every pair of hint and question attribute, how many members can currently serve as
+    hint and the smallest distractor pool among them for multiple choice questions, as given by
+    :meth:`components.Orchestra.question_space`. Pairs with less than :attr:`LOW_HINT_MEMBERS` hint
+    members are marked, as they are about to become unplayable. Questions for
+    :attr:`components.Question.PHOTO` are always multiple choice, so their free text column is
+    marked as such.
+
+    Args:
+        update: The update.
+        context: The context as provided by the :class:`telegram.ext.Dispatcher`.
+    """
+    orchestra = context.bot_data[ORCHESTRA_KEY]
+    multiple_choice = orchestra.question_space(multiple_choice=True)
+    free_text = orchestra.question_space(multiple_choice=False)
+
+    lines: List[str] = ['<b>Hinweis → Frage: Multiple Choice (kleinster Pool) | Freitext</b>', '']
+    for hint, question in sorted(
+        set(multiple_choice).union(free_text),
+        key=lambda pair: (len(multiple_choice.get(pair, {})), pair),
+    ):
+        pools = multiple_choice.get((hint, question), {})
+        pool_text = f' ({min(pools.values())})' if pools else ''
+        marker = '⚠️ ' if len(pools) < LOW_HINT_MEMBERS else ''
+        if question == Question.PHOTO:
+            free_text_text = 'nur MC'
+        else:
+            free_text_text = str(len(free_text.get((hint, question), {})))
+        lines.append(
+            f'{marker}{Orchestra.TO_HR[hint]} → {Orchestra.TO_HR[question]}: '
+            f'{len(pools)}{pool_text} | {free_text_text}'
+        )
+    if len(lines) == 2:
+        lines.append('Aktuell können keine Fragen gestellt werden.')
+
+    text = ''
+    for line in lines:
+        if len(text) + len(line) + 1 > MAX_MESSAGE_LENGTH:
+            update.message.reply_text(text)
+            text = ''
+        text += line + '\n'
+    update.message.reply_text(text)
+
+
+def sessions(update: Update, context: CallbackContext) -> None:
+    """
+    Reports the number of active game sessions and their approximate memory footprint.
+
+    Args:
+        update: The update.
+        context: The context as provided by the :class:`telegram.ext.Dispatcher`.
+    """
+    update.message.reply_text(
+        f'Aktive Spiele: {QUESTION_HANDLER.session_count}\n'
+        f'Speicherbedarf: ca. {QUESTION_HANDLER.memory_footprint() / 1024:.1f} KiB'
+    )
+
+
+def geocode_cache(update: Update, context: CallbackContext) -> None:
+    """
+    Reports the size and the hit rate of the :class:`components.GeocodeCache`.
+
+    Args:
+        update: The update.
+        context: The context as provided by the :class:`telegram.ext.Dispatcher`.
+    """
+    cache = context.bot_data[GEOCODE_CACHE_KEY]
+    update.message.reply_text(
+        f'Gecachte Adressen: {len(cache)} / {cache.max_size}\n'
+        f'Treffer: {cache.hits} ({100 * cache.hit_rate:.1f} %)\n'
+        f'Fehlschläge: {cache.misses}'
+    )
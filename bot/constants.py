@@ -25,6 +25,21 @@ YOURLS_KEY = 'yourls_key'
 """
 :obj:`str`: Each ``context.bot_data[YOURLS_KEY]`` is expected to be the YOURLS client.
 """
+PHOTO_CACHE_KEY = 'photo_cache_key'
+"""
+:obj:`str`: If set, each ``context.bot_data[PHOTO_CACHE_KEY]`` is expected to be a
+:class:`components.PhotoCache`. In this case, photo questions are sent as collages.
+"""
+DAILY_QUIZ_KEY = 'daily_quiz_key'
+"""
+:obj:`str`: If set, each ``context.bot_data[DAILY_QUIZ_KEY]`` is expected to be the
+:class:`components.DailyQuiz` of the current day.
+"""
+GEOCODE_CACHE_KEY = 'geocode_cache_key'
+"""
+:obj:`str`: Each ``context.bot_data[GEOCODE_CACHE_KEY]`` is expected to be the
+:class:`components.GeocodeCache` used by :meth:`components.Member.set_address`.
+"""
 
 # User data keys
 EDITING_MESSAGE_KEY = 'editing_message_key'
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""This module contains functions for the daily quiz."""
+import datetime as dtm
+import logging
+from typing import Optional
+
+from telegram import Update
+from telegram.ext import CallbackContext, Dispatcher
+
+from bot import ORCHESTRA_KEY, DAILY_QUIZ_KEY
+from bot.refresh_orchestra import local_time
+from components import DailyQuiz, Orchestra
+
+logger = logging.getLogger(__name__)
+
+NUMBER_OF_QUESTIONS = 10
+""":obj:`int`: The number of questions of the daily quiz."""
+
+
+def ensure_daily_quiz(bot_data: dict) -> Optional[DailyQuiz]:
+    """
+    Makes sure that ``bot_data[DAILY_QUIZ_KEY]`` holds the quiz of the current day by generating a
+    new one, if needed. If the orchestra currently has no questionable attributes, the quiz is
+    removed instead.
+
+    Args:
+        bot_data: The ``bot_data`` of the :class:`telegram.ext.Dispatcher`.
+
+    Returns:
+        :class:`components.DailyQuiz`: The quiz of the current day, if there is one.
+    """
+    daily_quiz = bot_data.get(DAILY_QUIZ_KEY)
+    if daily_quiz and daily_quiz.date == dtm.date.today():
+        return daily_quiz
+
+    orchestra = bot_data[ORCHESTRA_KEY]
+    if not orchestra.questionable(multiple_choice=True):
+        logger.warning('Could not generate the daily quiz: No questionable attributes.')
+        bot_data.pop(DAILY_QUIZ_KEY, None)
+        return None
+
+    daily_quiz = DailyQuiz.generate(orchestra, NUMBER_OF_QUESTIONS)
+    bot_data[DAILY_QUIZ_KEY] = daily_quiz
+    return daily_quiz
+
+
+def generate_daily_quiz(context: CallbackContext) -> None:
+    """
+    Generates the quiz of the current day.
+
+    Args:
+        context: The context as provided by the :class:`telegram.ext.Dispatcher`.
+    """
+    ensure_daily_quiz(context.bot_data)
+
+
+def schedule_daily_job(dispatcher: Dispatcher) -> None:
+    """
+    Schedules a job running daily at 00:05 local time which runs :meth:`generate_daily_quiz`, i.e.
+    after the orchestra was refreshed by :meth:`bot.refresh_orchestra.refresh_orchestra`.
+
+    Args:
+        dispatcher: The :class:`telegram.ext.Dispatcher`.
+    """
+    dispatcher.job_queue.run_daily(generate_daily_quiz, local_time(0, 5))
+
+
+def build_text(daily_quiz: DailyQuiz, orchestra: Orchestra, length: int = 10) -> str:
+    """
+    Builds the leaderboard text for the daily quiz.
+
+    Args:
+        daily_quiz: The daily quiz.
+        orchestra: The orchestra to get the names of the players from.
+        length: Optional. The maximum number of players to list. Defaults to ``10``.
+    """
+    total = len(daily_quiz.questions)
+    lines = [f'<b>Rangliste des Tagesquiz vom {daily_quiz.date.strftime("%d.%m.%Y")}:</b>\n']
+    for rank, (user_id, correct) in enumerate(daily_quiz.leaderboard()[:length], start=1):
+        member = orchestra.members.get(user_id)
+        name = member.full_name if member and member.full_name else 'Anonym'
+        lines.append(f'{rank:2}. <b>{name}:</b> {correct} / {total}')
+
+    if len(lines) == 1:
+        lines.append(
+            'Noch keine Einträge vorhanden. Schnell ein /tagesquiz, dann bist Du auf Platz 1! 😎'
+        )
+
+    return '\n'.join(lines)
+
+
+def show_leaderboard(update: Update, context: CallbackContext) -> None:
+    """
+    Shows the leaderboard of the daily quiz.
+
+    Args:
+        update: The update.
+        context: The context as provided by the :class:`telegram.ext.Dispatcher`.
+    """
+    daily_quiz = ensure_daily_quiz(context.bot_data)
+    if not daily_quiz:
+        update.effective_message.reply_text('Heute gibt es leider kein Tagesquiz. 😕')
+        return
+
+    text = build_text(daily_quiz, context.bot_data[ORCHESTRA_KEY])
+    if daily_quiz.has_played(update.effective_user.id):
+        text += f'\n\nDu bist auf Platz {daily_quiz.rank_of(update.effective_user.id)}.'
+    update.effective_message.reply_text(text)
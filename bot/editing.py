@@ -2,9 +2,12 @@
 # -*- coding: utf-8 -*-
 """This module contains functions for editing user information."""
 import datetime as dtm
+import logging
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from typing import Dict, Callable, List
+from threading import Lock
+from typing import Dict, Callable, List, Optional, Tuple
 
 from telegram import (
     Update,
@@ -14,11 +17,10 @@ from telegram import (
     KeyboardButton,
     ReplyKeyboardMarkup,
     ReplyKeyboardRemove,
-    ChatAction,
     InlineQueryResultArticle,
     InputTextMessageContent,
 )
-from telegram.error import BadRequest
+from telegram.error import BadRequest, TelegramError
 from telegram.ext import (
     ConversationHandler,
     CallbackContext,
@@ -53,6 +55,8 @@ from components.helpers import COORDINATES_PATTERN
 
 warnings.filterwarnings('ignore', message="If", module='telegram.ext.conversationhandler')
 
+logger = logging.getLogger(__name__)
+
 # States of the conversation
 
 MENU = 'MENU'
@@ -157,6 +161,16 @@ TEXTS: Dict[str, str] = {
     'oder zu löschen, nutze die Knöpfe unten.',
 }
 """Dict[:obj:`str`,:obj:`str`]: Texts for the different states."""
+ADDRESS_RESOLVING_TEXT = (
+    'Einen Moment, ich suche die Adresse … 🔎 Wenn Du es Dir anders überlegt hast, kannst Du '
+    'zurück zum Menü.'
+)
+""":obj:`str`: Text shown while the address is being resolved."""
+ADDRESS_ERROR_TEXT = (
+    'Beim Suchen der Adresse ist leider ein Fehler aufgetreten. 😕 Du kannst mir die Adresse '
+    'erneut schicken oder zurück zum Menü.'
+)
+""":obj:`str`: Text shown if resolving the address failed."""
 
 # Keyboards
 DELETE = 'DELETE'
@@ -215,6 +229,10 @@ ADDRESS_CONFIRMATION_KEYBOARD = InlineKeyboardMarkup.from_row(
     ]
 )
 """:class:`telegram.InlineKeyboardMarkup`: Keyboard for confirming the address."""
+ADDRESS_RESOLVING_KEYBOARD = InlineKeyboardMarkup.from_button(
+    InlineKeyboardButton(text=BACK, callback_data=BACK)
+)
+""":class:`telegram.InlineKeyboardMarkup`: Keyboard shown while the address is being resolved."""
 SELECTION_KEYBOARD = InlineKeyboardMarkup(
     [
         [
@@ -267,8 +285,9 @@ def selection_keyboard(context: CallbackContext) -> InlineKeyboardMarkup:
 
 def get_member(update: Update, context: CallbackContext) -> Member:
     """
-    Returns the member to be edited. Takes into account the the admin may be editing one of the
-    orchestras members
+    Returns a copy of the member to be edited. Takes into account the the admin may be editing one
+    of the orchestras members. Pass the copy to :meth:`components.Orchestra.update_member` to
+    apply the changes.
 
     Args:
         update: The update.
@@ -280,8 +299,8 @@ def get_member(update: Update, context: CallbackContext) -> Member:
 
     if user_id == admin_id:
         edit_id = context.user_data.get(EDITING_USER_KEY, admin_id)
-        return orchestra.members[edit_id]
-    return orchestra.members[user_id]
+        return orchestra.members[edit_id].copy()
+    return orchestra.members[user_id].copy()
 
 
 def delete_keyboard(context: CallbackContext) -> None:
@@ -587,9 +606,9 @@ def date_of_birth(update: Update, context: CallbackContext) -> str:
         :attr:`ADDRESS`: Else.
     """
     orchestra = context.bot_data[ORCHESTRA_KEY]
-    member = get_member(update, context)
 
     if update.message:
+        member = get_member(update, context)
         delete_keyboard(context)
         date_str = update.message.text
         try:
@@ -619,9 +638,69 @@ def date_of_birth(update: Update, context: CallbackContext) -> str:
     return MENU
 
 
+_ADDRESS_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='AddressResolution')
+# Maps the ID of the editing user to a token for their latest address request. Results of requests
+# that are no longer current are discarded.
+_PENDING_ADDRESSES: Dict[int, object] = dict()
+_PENDING_ADDRESSES_LOCK = Lock()
+
+
+def _cancel_pending_address(user_id: int) -> None:
+    with _PENDING_ADDRESSES_LOCK:
+        _PENDING_ADDRESSES.pop(user_id, None)
+
+
+def _resolve_address(
+    user_id: int,
+    token: object,
+    member_id: int,
+    bot_data: dict,
+    message: Message,
+    addr: Optional[str],
+    coordinates: Optional[Tuple[float, float]],
+) -> None:
+    try:
+        location = Member.resolve_address(address=addr, coordinates=coordinates)
+        failed = False
+    except Exception:  # pylint: disable=W0703
+        logger.exception('Resolving the address %s failed.', addr or coordinates)
+        location, failed = None, True
+
+    # Only the token is swapped under the lock, so that the dispatcher doesn't wait for the
+    # update of the orchestra or the request below
+    with _PENDING_ADDRESSES_LOCK:
+        if _PENDING_ADDRESSES.get(user_id) is not token:
+            return
+        del _PENDING_ADDRESSES[user_id]
+
+    text, reply_markup = ADDRESS_ERROR_TEXT, ADDRESS_RESOLVING_KEYBOARD
+    if not failed:
+        try:
+            # The orchestra may have been rebuilt in the meantime, so we look the member up
+            orchestra = bot_data[ORCHESTRA_KEY]
+            member = orchestra.members[member_id].copy()
+            if location:
+                found_address = member.set_address(location=location)
+            else:
+                member.clear_address()
+                found_address = None
+            orchestra.update_member(member)
+            text = TEXTS[ADDRESS_CONFIRMATION].format(found_address or "-")
+            reply_markup = ADDRESS_CONFIRMATION_KEYBOARD
+        except Exception:  # pylint: disable=W0703
+            logger.exception('Saving the address of member %d failed.', member_id)
+
+    try:
+        message.edit_text(text=text, reply_markup=reply_markup)
+    except TelegramError:
+        pass
+
+
 def address(update: Update, context: CallbackContext) -> str:
     """
-    Parses the reply and asks the user for confirmation of the extracted address.
+    Parses the reply and asks the user for confirmation of the extracted address. The address is
+    resolved in the background. Until the result is available, the user may only go back to the
+    menu, in which case the result is discarded.
 
     Args:
         update: The update.
@@ -650,28 +729,43 @@ def address(update: Update, context: CallbackContext) -> str:
             location = message.location
             coordinates = (location.latitude, location.longitude)
 
-        context.bot.send_chat_action(update.effective_user.id, action=ChatAction.TYPING)
-
-        found_address = member.set_address(address=addr, coordinates=coordinates)
-        text = TEXTS[ADDRESS_CONFIRMATION].format(found_address or "-")
-        msg = update.message.reply_text(text=text, reply_markup=ADDRESS_CONFIRMATION_KEYBOARD)
-
+        msg = update.message.reply_text(
+            text=ADDRESS_RESOLVING_TEXT, reply_markup=ADDRESS_RESOLVING_KEYBOARD
+        )
         context.user_data[EDITING_MESSAGE_KEY] = msg
-        orchestra.update_member(member)
+
+        user_id = update.effective_user.id
+        token = object()
+        with _PENDING_ADDRESSES_LOCK:
+            _PENDING_ADDRESSES[user_id] = token
+        _ADDRESS_EXECUTOR.submit(
+            _resolve_address,
+            user_id,
+            token,
+            member.user_id,
+            context.bot_data,
+            msg,
+            addr,
+            coordinates,
+        )
 
         return ADDRESS_CONFIRMATION
 
+    # Cancel first, so that no result is applied after the member was read. Only deleting
+    # changes the member, so a result that is being applied isn't overwritten otherwise
+    _cancel_pending_address(update.effective_user.id)
+    member = get_member(update, context)
     update.callback_query.answer()
 
     if update.callback_query.data == DELETE:
         member.clear_address()
+        orchestra.update_member(member)
 
     msg = update.effective_message.edit_text(
         text=TEXTS[MENU].format(member.to_str()), reply_markup=selection_keyboard(context)
     )
 
     context.user_data[EDITING_MESSAGE_KEY] = msg
-    orchestra.update_member(member)
 
     return MENU
 
@@ -780,9 +874,9 @@ def instruments(update: Update, context: CallbackContext) -> str:
     key = Instrument.from_string(instrument, allowed=Member.ALLOWED_INSTRUMENTS)
     if key is not None:
         current_selection[key] = not selection == SELECTED
-    member.instruments = [i for i, s in current_selection.items() if s]
-
-    orchestra.update_member(member)
+    orchestra.update_member_attribute(
+        member.user_id, 'instruments', [i for i, s in current_selection.items() if s]
+    )
 
     message.edit_reply_markup(reply_markup=build_instruments_keyboard(current_selection))
 
@@ -809,8 +903,8 @@ def phone_number(update: Update, context: CallbackContext) -> str:
         number = update.message.contact.phone_number
         if number.startswith('49'):
             number = f'+{number}'
-        member.phone_number = number
-        orchestra.update_member(member)
+        orchestra.update_member_attribute(member.user_id, 'phone_number', number)
+        member = get_member(update, context)
 
         msg = message.reply_text('Danke!', reply_markup=ReplyKeyboardRemove())
         msg.delete()
@@ -824,8 +918,8 @@ def phone_number(update: Update, context: CallbackContext) -> str:
     data = update.callback_query.data
 
     if data == DELETE:
-        member.phone_number = None
-        orchestra.update_member(member)
+        orchestra.update_member_attribute(member.user_id, 'phone_number', None)
+        member = get_member(update, context)
         message.edit_text(
             text=TEXTS[MENU].format(member.to_str()), reply_markup=selection_keyboard(context)
         )
@@ -867,8 +961,8 @@ def allow_contact_sharing(update: Update, context: CallbackContext) -> str:
     orchestra = context.bot_data[ORCHESTRA_KEY]
     member = get_member(update, context)
 
-    member.allow_contact_sharing = data == YES
-    orchestra.update_member(member)
+    orchestra.update_member_attribute(member.user_id, 'allow_contact_sharing', data == YES)
+    member = get_member(update, context)
 
     message.edit_text(
         text=TEXTS[MENU].format(member.to_str()), reply_markup=selection_keyboard(context)
@@ -950,11 +1044,11 @@ def build_editing_handler(admin: int) -> ConversationHandler:
                 CallbackQueryHandler(date_of_birth),
             ],
             ADDRESS: [
-                MessageHandler(ADDRESS_FILTER, address, run_async=True),
+                MessageHandler(ADDRESS_FILTER, address),
                 CallbackQueryHandler(address),
             ],
             ADDRESS_CONFIRMATION: [
-                MessageHandler(ADDRESS_FILTER, address, run_async=True),
+                MessageHandler(ADDRESS_FILTER, address),
                 CallbackQueryHandler(address),
             ],
             PHOTO: [
@@ -1,12 +1,16 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """This module contains classes and functions for playing the game."""
+import datetime as dtm
+import logging
+import time
 from dataclasses import dataclass, field
-from threading import Lock
-from typing import Optional, List, cast, Dict, Union
+from contextlib import contextmanager
+from threading import Lock, RLock
+from typing import Any, Iterator, Optional, List, cast, Dict, Union, Tuple
 
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.error import BadRequest
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, Bot, Message
+from telegram.error import BadRequest, TelegramError
 from telegram.ext import (
     ConversationHandler,
     CallbackContext,
@@ -14,6 +18,7 @@ from telegram.ext import (
     CommandHandler,
     CallbackQueryHandler,
     Filters,
+    Dispatcher,
 )
 
 from bot import (
@@ -26,8 +31,20 @@ from bot import (
     ALL,
     GAME_MESSAGE_KEY,
     CONVERSATION_KEY,
+    PHOTO_CACHE_KEY,
 )
-from components import Questioner, Member
+from bot.daily_quiz import ensure_daily_quiz
+from components import (
+    Questioner,
+    Member,
+    Question,
+    Orchestra,
+    AttributeManager,
+    PhotoCache,
+)
+from components.helpers import deep_getsizeof
+
+logger = logging.getLogger(__name__)
 
 # States of the conversation
 
@@ -141,13 +158,71 @@ class GameSettings:
 class QuestionHandler(Handler):
     """
     A Handler that manages a collection of :class:`components.Questioner` instances for each user.
+    Each questioner represents a game session. Sessions are ended, when the game is over or
+    cancelled. Sessions that were idle for longer than :attr:`session_timeout` are ended by
+    :meth:`evict_idle_sessions`.
+
+    Note:
+        Each user has their own lock, which is held while their update is handled and while
+        their session is ended. Updates of different users are handled concurrently, as the
+        callback is run asynchronously by default. :meth:`check_update` looks up the questioner
+        without acquiring a lock. The lock of a user is dropped, once their session ended and
+        no thread holds or waits for the lock anymore.
+
+    Note:
+        While the callback is running asynchronously, the conversation is in the state
+        :attr:`telegram.ext.ConversationHandler.WAITING`. The handler should therefore be listed
+        for that state as well, along with a way to cancel the game. If the session is ended
+        while an update is waiting for the lock, the update is discarded and no further question
+        is asked.
+
+    Note:
+        The IDs of the quiz polls that are currently awaiting an answer are mapped to the user and
+        the question they belong to. :class:`telegram.PollAnswer` updates are therefore routed by a
+        single lookup and answers to old polls are rejected right away. Use :meth:`ask_question`
+        to ask questions, so that the polls are registered.
+
+    Attributes:
+        session_timeout (:obj:`float`): Number of seconds after which an idle session is ended.
+
+    Args:
+        run_async: Optional. Whether the callback should be run asynchronously. Defaults to
+            :obj:`True`.
+        session_timeout: Optional. Number of seconds after which an idle session is ended.
+            Defaults to ``3600``.
     """
 
-    def __init__(self) -> None:
-        super().__init__(self.callback)
+    def __init__(self, run_async: bool = True, session_timeout: float = 3600) -> None:
+        super().__init__(self.callback, run_async=run_async)
+        self.session_timeout = session_timeout
         self._questioners: Dict[int, Questioner] = dict()
+        self._last_activity: Dict[int, float] = dict()
+        # The lock of each user along with the number of threads holding or waiting for it
+        self._user_locks: Dict[int, List[Any]] = dict()
+        self._polls: Dict[str, Tuple[int, Question]] = dict()
+        # Only guards changes of the dictionaries
         self._questioners_lock = Lock()
 
+    @contextmanager
+    def _user_lock(self, user_id: int) -> Iterator[None]:
+        # The lock is reentrant, so that pop_questioner can be called while holding it
+        with self._questioners_lock:
+            entry = self._user_locks.setdefault(user_id, [RLock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._questioners_lock:
+                entry[1] -= 1
+                if entry[1] == 0 and user_id not in self._questioners:
+                    del self._user_locks[user_id]
+
+    def _forget_poll(self, questioner: Optional[Questioner]) -> None:
+        # Call only while holding self._questioners_lock
+        if questioner and questioner.current_question and questioner.current_question.poll:
+            self._polls.pop(questioner.current_question.poll.id, None)
+
     def set_questioner(self, user_id: int, questioner: Questioner) -> None:
         """
         Sets a new questioner for a user.
@@ -157,17 +232,81 @@ class QuestionHandler(Handler):
             questioner: The Questioner instance
         """
         with self._questioners_lock:
+            self._forget_poll(self._questioners.get(user_id))
             self._questioners[user_id] = questioner
+            self._last_activity[user_id] = time.monotonic()
 
     def pop_questioner(self, user_id: int) -> Optional[Questioner]:
         """
-        Pops questioner of a user.
+        Pops questioner of a user, i.e. ends their session. Waits for an update of the user,
+        that is currently being handled.
 
         Args:
             user_id: The ID of the user.
+
+        Returns:
+            The questioner or :obj:`None`, if the user has no session.
+        """
+        with self._user_lock(user_id), self._questioners_lock:
+            questioner = self._questioners.pop(user_id, None)
+            self._last_activity.pop(user_id, None)
+            self._forget_poll(questioner)
+            return questioner
+
+    def evict_idle_sessions(self) -> List[int]:
+        """
+        Ends all sessions that were idle for longer than :attr:`session_timeout`.
+
+        Returns:
+            The IDs of the users whose sessions were ended.
+        """
+        deadline = time.monotonic() - self.session_timeout
+        with self._questioners_lock:
+            idle = [uid for uid, last in self._last_activity.items() if last < deadline]
+        # A user may have become active in the meantime, so we check again under their lock
+        evicted = []
+        for user_id in idle:
+            with self._user_lock(user_id):
+                if self._last_activity.get(user_id, deadline) < deadline:
+                    self.pop_questioner(user_id)
+                    evicted.append(user_id)
+        return evicted
+
+    @property
+    def session_count(self) -> int:
+        """:obj:`int`: The number of currently active sessions."""
+        return len(self._questioners)
+
+    def memory_footprint(self) -> int:
+        """
+        Estimates the memory used by the active sessions. Objects shared by the sessions like the
+        orchestra, its members and the bot are not counted.
+
+        Returns:
+            :obj:`int`: The size in bytes.
         """
         with self._questioners_lock:
-            return self._questioners.pop(user_id)
+            questioners = list(self._questioners.values())
+        return deep_getsizeof(
+            questioners,
+            exclude=(Orchestra, Member, AttributeManager, Bot, PhotoCache),
+        )
+
+    def ask_question(self, user_id: int, questioner: Questioner) -> None:
+        """
+        Asks the next question of the users questioner and registers the poll, if one was sent.
+
+        Args:
+            user_id: The ID of the user.
+            questioner: The questioner of the user.
+        """
+        questioner.ask_question()
+        question = cast(Question, questioner.current_question)
+        if question.poll:
+            with self._questioners_lock:
+                # The session may have been ended in the meantime
+                if self._questioners.get(user_id) is questioner:
+                    self._polls[question.poll.id] = (user_id, question)
 
     def check_update(self, update: Update) -> bool:
         """
@@ -180,13 +319,14 @@ class QuestionHandler(Handler):
             True: If the update is to be handled
             False: Otherwise.
         """
+        # Looking up a key is atomic, so there is no need to acquire a lock
+        if update.poll_answer:
+            entry = self._polls.get(update.poll_answer.poll_id)
+            return entry is not None and entry[0] == update.poll_answer.user.id
         if update.effective_message and Filters.command(update):
             return False
-        user_id = update.effective_user.id
-        with self._questioners_lock:
-            if user_id in self._questioners and self._questioners[user_id].check_update(update):
-                return True
-        return False
+        questioner = self._questioners.get(update.effective_user.id)
+        return questioner is not None and questioner.check_update(update)
 
     def callback(self, update: Update, context: CallbackContext) -> Union[str, int]:
         """
@@ -199,23 +339,40 @@ class QuestionHandler(Handler):
             context: The context as provided by the :class:`telegram.ext.Dispatcher`.
         """
         user_id = update.effective_user.id
-        with self._questioners_lock:
-            questioner = self._questioners[user_id]
+        with self._user_lock(user_id):
+            questioner = self._questioners.get(user_id)
+            if questioner is None:
+                # The session was ended while the update was waiting for the lock
+                return ConversationHandler.END
+            self._last_activity[user_id] = time.monotonic()
             questioner.handle_update(update)
+            if update.poll_answer:
+                with self._questioners_lock:
+                    self._polls.pop(update.poll_answer.poll_id, None)
 
             if questioner.number_of_questions_asked < questioner.number_of_questions:
-                questioner.ask_question()
+                # Sessions are only ended while holding the lock. This is just a safeguard
+                if self._questioners.get(user_id) is not questioner:
+                    return ConversationHandler.END
+                self.ask_question(user_id, questioner)
                 return GAME
 
             correct = questioner.score.correct
             total = questioner.score.answers
             text = f'Das Spiel ist vorbei! {correct} von {total} Antworten waren richtig.'
+            if questioner.daily_quiz and questioner.daily_quiz.add_result(user_id, correct):
+                rank = questioner.daily_quiz.rank_of(user_id)
+                text += (
+                    f' Damit bist Du auf Platz {rank} des Tagesquiz. Die Rangliste gibt\'s '
+                    'mit /tagesquiz_rangliste.'
+                )
             update.effective_user.send_message(text=text)
 
             orchestra = context.bot_data[ORCHESTRA_KEY]
             member = cast(Member, orchestra.members[user_id])
             member.user_score.add_to_score(total, correct)
 
+            self.pop_questioner(user_id)
             context.user_data[CONVERSATION_KEY] = False
             return ConversationHandler.END
 
@@ -244,29 +401,29 @@ def multiple_choice(update: Update, context: CallbackContext) -> Union[str, int]
         game_settings = cast(GameSettings, context.user_data[GAME_KEY])
         game_settings.multiple_choice = data == 'True'
 
-        try:
-            message.edit_text(
-                TEXTS[HINT_ATTRIBUTES],
-                reply_markup=build_questions_hints_keyboard(
-                    orchestra=orchestra,
-                    hint=True,
-                    multiple_choice=game_settings.multiple_choice,
-                    exclude_members=[orchestra.members[update.effective_user.id]],
-                    current_selection={h: True for h in game_settings.hint_attributes},
-                ),
+        exclude_members = [orchestra.members[update.effective_user.id]]
+        if not orchestra.questionable(
+            multiple_choice=game_settings.multiple_choice, exclude_members=exclude_members
+        ):
+            message.reply_text(
+                'Es sind leider noch nicht genug AkaBlasen angemeldet, um ein '
+                'Spiel starten zu können. 😕 Bitte versuche es später erneut.'
             )
-            return HINT_ATTRIBUTES
-        except RuntimeError as exc:
-            if str(exc) == 'Orchestra currently has no questionable attributes.':
-                message.reply_text(
-                    'Es sind leider noch nicht genug AkaBlasen angemeldet, um ein '
-                    'Spiel starten zu können. 😕 Bitte versuche es später erneut.'
-                )
-                message.delete()
-                context.user_data[CONVERSATION_KEY] = False
-                return ConversationHandler.END
+            message.delete()
+            context.user_data[CONVERSATION_KEY] = False
+            return ConversationHandler.END
 
-            raise exc
+        message.edit_text(
+            TEXTS[HINT_ATTRIBUTES],
+            reply_markup=build_questions_hints_keyboard(
+                orchestra=orchestra,
+                hint=True,
+                multiple_choice=game_settings.multiple_choice,
+                exclude_members=exclude_members,
+                current_selection={h: True for h in game_settings.hint_attributes},
+            ),
+        )
+        return HINT_ATTRIBUTES
     else:
         msg = message.reply_text(TEXTS[MULTIPLE_CHOICE], reply_markup=MULTIPLE_CHOICE_KEYBOARD)
         context.user_data[GAME_MESSAGE_KEY] = msg
@@ -440,11 +597,13 @@ def number_questions(update: Update, context: CallbackContext) -> str:
             number_of_questions=game_settings.number_of_questions,
             bot=context.bot,
             multiple_choice=game_settings.multiple_choice,
+            prefetch=True,
+            photo_cache=context.bot_data.get(PHOTO_CACHE_KEY),
         )
         QUESTION_HANDLER.set_questioner(user_id, questioner)
         message.delete()
 
-        questioner.ask_question()
+        QUESTION_HANDLER.ask_question(user_id, questioner)
 
         return GAME
     except ValueError:
@@ -455,6 +614,63 @@ def number_questions(update: Update, context: CallbackContext) -> str:
         return ConversationHandler.END
 
 
+def daily_quiz(update: Update, context: CallbackContext) -> Union[str, int]:
+    """
+    Starts the daily quiz by initializing the :class:`components.Questioner` with the
+    :class:`components.DailyQuiz` of the current day and asking the first question. Each user can
+    take the daily quiz only once.
+
+    Args:
+        update: The update.
+        context: The context as provided by the :class:`telegram.ext.Dispatcher`.
+    """
+    message = update.effective_message
+    user_id = update.effective_user.id
+    quiz = ensure_daily_quiz(context.bot_data)
+
+    if not quiz:
+        message.reply_text('Heute gibt es leider kein Tagesquiz. 😕')
+        return ConversationHandler.END
+    if quiz.has_played(user_id):
+        return _already_played(message)
+
+    try:
+        questioner = Questioner(
+            user_id=user_id,
+            orchestra=context.bot_data[ORCHESTRA_KEY],
+            hint_attributes=[],
+            question_attributes=[],
+            number_of_questions=len(quiz.questions),
+            bot=context.bot,
+            prefetch=True,
+            photo_cache=context.bot_data.get(PHOTO_CACHE_KEY),
+            daily_quiz=quiz,
+        )
+    except ValueError:
+        message.reply_text(
+            'Es sind leider noch nicht genug AkaBlasen angemeldet, um ein Spiel starten zu '
+            'können. 😕 Bitte versuche es später erneut.'
+        )
+        return ConversationHandler.END
+
+    # From now on, the user counts as having played, as the polls reveal the correct answers
+    if not quiz.start(user_id):
+        return _already_played(message)
+
+    context.user_data[CONVERSATION_KEY] = CONVERSATION_VALUE
+    QUESTION_HANDLER.set_questioner(user_id, questioner)
+    QUESTION_HANDLER.ask_question(user_id, questioner)
+    return GAME
+
+
+def _already_played(message: Message) -> int:
+    message.reply_text(
+        'Du hast das Tagesquiz heute schon gespielt. Morgen gibt\'s ein neues! Die '
+        'Rangliste gibt\'s mit /tagesquiz_rangliste.'
+    )
+    return ConversationHandler.END
+
+
 def cancel(update: Update, context: CallbackContext) -> int:
     """
     Cancels the game
@@ -470,21 +686,74 @@ def cancel(update: Update, context: CallbackContext) -> int:
         context.user_data[GAME_MESSAGE_KEY].delete()
     except BadRequest:
         pass
+    QUESTION_HANDLER.pop_questioner(update.effective_user.id)
     context.user_data[CONVERSATION_KEY] = False
     return ConversationHandler.END
 
 
 GAME_HANDLER = ConversationHandler(
-    entry_points=[CommandHandler('spiel_starten', multiple_choice)],
+    entry_points=[
+        CommandHandler('spiel_starten', multiple_choice),
+        CommandHandler('tagesquiz', daily_quiz),
+    ],
     states={
         MULTIPLE_CHOICE: [CallbackQueryHandler(multiple_choice)],
         HINT_ATTRIBUTES: [CallbackQueryHandler(hint_attributes)],
         QUESTION_ATTRIBUTES: [CallbackQueryHandler(question_attributes)],
         NUMBER_QUESTIONS: [CallbackQueryHandler(number_questions)],
         GAME: [QUESTION_HANDLER],
+        # While QUESTION_HANDLER runs asynchronously, the conversation is waiting for its result.
+        # Answers and cancelling must still be possible in the meantime. Cancelling waits for the
+        # update being handled, so it's run asynchronously, too.
+        ConversationHandler.WAITING: [
+            CommandHandler('spiel_abbrechen', cancel, run_async=True),
+            QUESTION_HANDLER,
+        ],
     },
     fallbacks=[CommandHandler('spiel_abbrechen', cancel)],
     # We need to set per_chat to False in order to be able to handle PollAnswer updates
     per_chat=False,
 )
 """:class:`telegram.ext.ConversationHandler`: Handler for playing games."""
+
+
+def evict_idle_sessions(context: CallbackContext) -> None:
+    """
+    Ends the games of all users, who didn't answer for longer than
+    :attr:`QuestionHandler.session_timeout`, and informs them about it.
+
+    Args:
+        context: The context as provided by the :class:`telegram.ext.Dispatcher`.
+    """
+    for user_id in QUESTION_HANDLER.evict_idle_sessions():
+        # Takes the handler's lock and keeps the persistence up to date
+        GAME_HANDLER.update_state(ConversationHandler.END, (user_id,))
+        context.dispatcher.user_data[user_id][CONVERSATION_KEY] = False
+        try:
+            context.bot.send_message(
+                chat_id=user_id,
+                text='Dein Spiel wurde wegen Inaktivität beendet. Es geht <i>nicht</i> in den '
+                'Highscore ein.',
+            )
+        except TelegramError:
+            pass
+
+    logger.info(
+        'Active game sessions: %d, using approx. %d bytes',
+        QUESTION_HANDLER.session_count,
+        QUESTION_HANDLER.memory_footprint(),
+    )
+
+
+def schedule_session_sweep(dispatcher: Dispatcher, session_timeout: float = None) -> None:
+    """
+    Schedules a job running every ten minutes which runs :meth:`evict_idle_sessions`.
+
+    Args:
+        dispatcher: The :class:`telegram.ext.Dispatcher`.
+        session_timeout: Optional. If passed, :attr:`QuestionHandler.session_timeout` of
+            :attr:`QUESTION_HANDLER` is set to this value.
+    """
+    if session_timeout is not None:
+        QUESTION_HANDLER.session_timeout = session_timeout
+    dispatcher.job_queue.run_repeating(evict_idle_sessions, dtm.timedelta(minutes=10))
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-"""This module contains functions for the inline mode."""
+"""This module contains functions for the inline mode and for sending vCards."""
+from tempfile import TemporaryFile
 
 from telegram import (
     Update,
@@ -13,6 +14,7 @@ from telegram import (
 from telegram.ext import CallbackContext, CallbackQueryHandler
 
 from bot import ORCHESTRA_KEY, INLINE_HELP, ADMIN_KEY
+from components import Member
 
 REQUEST_CONTACT = 'contact_request {}'
 """:obj:`str`: Callback data for requesting the vCard of a member.
@@ -22,6 +24,8 @@ REQUEST_CONTACT_PATTERN = r'contact_request (\d*)'
 ``context.match.group(1)`` will be users id."""
 MEMBERS_PER_PAGE = 10
 """:obj:`int`: Number of members per page in inline mode."""
+ALL_VCARDS_FILENAME = 'AkaBlas.vcf'
+""":obj:`str`: Filename of the file containing the vCards of all members."""
 
 
 def search_users(update: Update, context: CallbackContext) -> None:
@@ -101,5 +105,44 @@ def send_vcard(update: Update, context: CallbackContext) -> None:
     vcard.close()
 
 
+def send_all_vcards(update: Update, context: CallbackContext) -> None:
+    """
+    Sends a single file containing the vCards of all members that the user may see in inline
+    mode. The file is written to a temporary file on disk.
+
+    Args:
+        update: The update.
+        context: The context as provided by the :class:`telegram.ext.Dispatcher`.
+    """
+    user_id = update.effective_user.id
+    admin = user_id == context.bot_data[ADMIN_KEY]
+    orchestra = context.bot_data[ORCHESTRA_KEY]
+
+    members = sorted(
+        (
+            m
+            for uid, m in orchestra.members.items()
+            if (m.allow_contact_sharing and uid != user_id) or admin
+        ),
+        key=lambda m: m.full_name,
+    )
+    if not members:
+        update.message.reply_text(
+            text='Leider gibt es noch keine Kontaktdaten, die ich Dir schicken könnte. 😕'
+        )
+        return
+
+    context.bot.send_chat_action(user_id, action=ChatAction.UPLOAD_DOCUMENT)
+    with TemporaryFile() as file:
+        number = Member.write_vcards(context.bot, members, file, admin=admin)
+        file.seek(0)
+        context.bot.send_document(
+            chat_id=user_id,
+            document=file,
+            filename=ALL_VCARDS_FILENAME,
+            caption=f'Kontaktdaten von {number} AkaBlasen',
+        )
+
+
 SEND_VCARD_HANDLER = CallbackQueryHandler(send_vcard, pattern=REQUEST_CONTACT_PATTERN)
 """:class:`telegram.ext.CallbackQueryHandler`: Handler used to send vCards on request."""
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""This module contains functions for updating attributes of the orchestra, that change daily."""
+import datetime as dtm
+
+import pytz
+import tzlocal
+from telegram.ext import CallbackContext, Dispatcher
+
+from bot import ORCHESTRA_KEY
+
+
+def local_time(hour: int, minute: int = 0) -> dtm.time:
+    """
+    Gives a timezone aware time in the local timezone of the machine. Use this for jobs that
+    depend on :meth:`datetime.date.today`, which is based on the local timezone, while the job
+    queue defaults to UTC or the timezone set in the bots defaults.
+
+    Args:
+        hour: The hour.
+        minute: Optional. The minute. Defaults to ``0``.
+    """
+    timezone = tzlocal.get_localzone()
+    # The job queue only supports pytz timezones
+    if not hasattr(timezone, 'localize'):
+        timezone = pytz.timezone(str(timezone))
+    return dtm.time(hour, minute, tzinfo=timezone)
+
+
+def refresh_orchestra(context: CallbackContext) -> None:
+    """
+    Updates the attributes of the orchestra that change daily, like the members ages.
+
+    Args:
+        context: The context as provided by the :class:`telegram.ext.Dispatcher`.
+    """
+    context.bot_data[ORCHESTRA_KEY].refresh_changing_attributes()
+
+
+def schedule_daily_job(dispatcher: Dispatcher) -> None:
+    """
+    Schedules a job running daily at local midnight which runs :meth:`refresh_orchestra`.
+
+    Args:
+        dispatcher: The :class:`telegram.ext.Dispatcher`.
+    """
+    dispatcher.job_queue.run_daily(refresh_orchestra, local_time(0, 0))
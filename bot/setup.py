@@ -27,21 +27,25 @@ from bot import (
     REGISTRATION_PATTERN,
     INLINE_HELP,
     CONVERSATION_KEY,
+    PHOTO_CACHE_KEY,
+    GEOCODE_CACHE_KEY,
 )
 import bot.editing as editing
 import bot.cancel_membership as cancel_membership
 import bot.backup as backup
 import bot.ban as ban
 import bot.check_user_status as check_user_status
+import bot.refresh_orchestra as refresh_orchestra
 import bot.registration as registration
 import bot.commands as commands
 import bot.inline as inline
 import bot.highscore as highscore
 import bot.error as error
 import bot.game as game
+import bot.daily_quiz as daily_quiz
 import bot.admin
 
-from components import Orchestra, Member
+from components import Orchestra, Member, PhotoCache, GeocodeCache, VCardCache
 from .constants import YOURLS_KEY
 from .yourls import YOURLSClient
 
@@ -50,9 +54,12 @@ BOT_COMMANDS: List[BotCommand] = [
     BotCommand('spiel_abbrechen', 'Bricht das aktuelle Spiel ab'),
     BotCommand('daten_anzeigen', 'Zeigt Deine gespeicherten Daten an'),
     BotCommand('daten_bearbeiten', 'Daten wie Adresse und Foto ändern'),
+    BotCommand('tagesquiz', 'Startet das Tagesquiz'),
     BotCommand('highscore', 'Zeigt den aktuellen Highscore an'),
+    BotCommand('tagesquiz_rangliste', 'Zeigt die Rangliste des Tagesquiz an'),
     BotCommand('hilfe', 'Zeigt ein paar generelle Hinweise zum Bot'),
     BotCommand('kontakt_abrufen', 'Kontaktdaten anderer AkaBlasen abrufen'),
+    BotCommand('kontakte_exportieren', 'Kontaktdaten aller AkaBlasen als eine Datei abrufen'),
     BotCommand('start', 'Startet den Bot'),
     BotCommand('abmelden', 'Vom Bot abmelden und alle Daten löschen'),
 ]
@@ -76,6 +83,8 @@ def setup(  # pylint: disable=R0913,R0914,R0915
     ad_password: str,
     yourls_url: str,
     yourls_signature: str,
+    photo_cache_directory: str = None,
+    session_timeout: float = None,
 ) -> None:
     """
     * Adds handlers. Convenience method to avoid doing that all in the main script.
@@ -97,6 +106,11 @@ def setup(  # pylint: disable=R0913,R0914,R0915
         ad_password: Password for the AkaDressen.
         yourls_url: URL of the YOURLS instance.
         yourls_signature: Signature for the YOURLS instance.
+        photo_cache_directory: Optional. Directory for the :class:`components.PhotoCache`. If
+            passed, photo questions are sent as a single collage and the photos of vCards are
+            downloaded only once.
+        session_timeout: Optional. Number of seconds after which idle games are ended. See
+            :attr:`bot.game.QuestionHandler.session_timeout`.
     """
 
     def check_conversation_status(update: Update, context: CallbackContext) -> None:
@@ -232,10 +246,14 @@ def setup(  # pylint: disable=R0913,R0914,R0915
     # Inline Mode
     dispatcher.add_handler(InlineQueryHandler(inline.search_users))
     dispatcher.add_handler(inline.SEND_VCARD_HANDLER)
+    dispatcher.add_handler(
+        CommandHandler('kontakte_exportieren', inline.send_all_vcards, run_async=True)
+    )
 
     # Highscores
     dispatcher.add_handler(CommandHandler('highscore', highscore.show_highscore))
     dispatcher.add_handler(highscore.HIGHSCORE_HANDLER)
+    dispatcher.add_handler(CommandHandler('tagesquiz_rangliste', daily_quiz.show_leaderboard))
 
     # Set commands
     dispatcher.bot.set_my_commands(BOT_COMMANDS)
@@ -244,6 +262,17 @@ def setup(  # pylint: disable=R0913,R0914,R0915
     dispatcher.add_handler(
         CommandHandler('rebuild', bot.admin.rebuild_orchestra, filters=Filters.user(int(admin)))
     )
+    dispatcher.add_handler(
+        CommandHandler(
+            'question_space', bot.admin.question_space, filters=Filters.user(int(admin))
+        )
+    )
+    dispatcher.add_handler(
+        CommandHandler('sessions', bot.admin.sessions, filters=Filters.user(int(admin)))
+    )
+    dispatcher.add_handler(
+        CommandHandler('geocode_cache', bot.admin.geocode_cache, filters=Filters.user(int(admin)))
+    )
 
     # Error Handler
     dispatcher.add_error_handler(error.handle_error)
@@ -251,6 +280,9 @@ def setup(  # pylint: disable=R0913,R0914,R0915
 
     # Schedule jobs
     check_user_status.schedule_daily_job(dispatcher)
+    refresh_orchestra.schedule_daily_job(dispatcher)
+    daily_quiz.schedule_daily_job(dispatcher)
+    game.schedule_session_sweep(dispatcher, session_timeout=session_timeout)
     backup.PATH = oc_path
     backup.URL = oc_url
     backup.USERNAME = oc_username
@@ -267,13 +299,23 @@ def setup(  # pylint: disable=R0913,R0914,R0915
     else:
         # We rebuild the orchestra on start up to make sure code changes are applied
         old_orchestra = bot_data.pop(ORCHESTRA_KEY)
-        new_orchestra = old_orchestra.copy()
+        new_orchestra = Orchestra.from_members(old_orchestra.members.values())
         bot_data[ORCHESTRA_KEY] = new_orchestra
     if not bot_data.get(PENDING_REGISTRATIONS_KEY):
         bot_data[PENDING_REGISTRATIONS_KEY] = dict()
     if not bot_data.get(DENIED_USERS_KEY):
         bot_data[DENIED_USERS_KEY] = list()
     bot_data[ADMIN_KEY] = int(admin)
+    if not isinstance(bot_data.get(GEOCODE_CACHE_KEY), GeocodeCache):
+        bot_data[GEOCODE_CACHE_KEY] = GeocodeCache()
+    Member.set_geocode_cache(bot_data[GEOCODE_CACHE_KEY])
+    if not photo_cache_directory:
+        bot_data.pop(PHOTO_CACHE_KEY, None)
+    elif getattr(bot_data.get(PHOTO_CACHE_KEY), 'directory', None) != photo_cache_directory:
+        bot_data[PHOTO_CACHE_KEY] = PhotoCache(photo_cache_directory)
+    Member.set_vcard_cache(VCardCache(photo_cache=bot_data.get(PHOTO_CACHE_KEY)))
+
+    daily_quiz.ensure_daily_quiz(bot_data)
 
     yourls_client = YOURLSClient(yourls_url, signature=yourls_signature, nonce_life=True)
     bot_data[YOURLS_KEY] = yourls_client
@@ -37,10 +37,16 @@ from .gender import Gender
 from .attributemanager import AttributeManager, NameManager, PhotoManager, ChangingAttributeManager
 from .score import Score
 from .userscore import UserScore
+from .geocodecache import GeocodeCache
+from .geocoder import Geocoder
+from .vcardcache import VCardCache
 from .member import Member
+from .attributematrix import AttributeMatrix
 from .orchestra import Orchestra
 from .question import Question
 from .texts import question_text, PHOTO_OPTIONS
+from .photocache import PhotoCache
+from .dailyquiz import DailyQuiz, DailyQuestion
 from .questioner import Questioner
 
 __all__ = [
@@ -80,6 +86,10 @@ __all__ = [
     'NameManager',
     'PhotoManager',
     'ChangingAttributeManager',
+    'AttributeMatrix',
+    'GeocodeCache',
+    'Geocoder',
+    'VCardCache',
     # Game related
     'UserScore',
     'Score',
@@ -87,6 +97,9 @@ __all__ = [
     'Questioner',
     'question_text',
     'PHOTO_OPTIONS',
+    'PhotoCache',
+    'DailyQuiz',
+    'DailyQuestion',
     # Utils related
     'PicklableBase',
     'MessageType',
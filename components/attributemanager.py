@@ -3,6 +3,7 @@
 """This module contains the classes for attributes."""
 from __future__ import annotations
 
+import calendar
 import random
 import datetime as dtm
 from collections import defaultdict
@@ -85,6 +86,10 @@ class AttributeManager(PicklableBase, Generic[AttributeType]):
         self.questionable_attributes = questionable_attributes
         self.gendered_questions = gendered_questions
         self._data: MemberDict = defaultdict(set)
+        # Reverse index: user_id -> values the member is registered under
+        self._member_values: Dict[int, List[AttributeType]] = {}
+        self._available_members: Optional[FrozenSet[Member]] = None
+        self._generation = 0
         self._lock = Lock()
 
         if not get_members_attribute:
@@ -96,6 +101,18 @@ class AttributeManager(PicklableBase, Generic[AttributeType]):
     def data(self) -> MemberDict:  # pylint: disable=C0116
         return self._data
 
+    @property
+    def generation(self) -> int:
+        """
+        A counter that is increased on every change of the registered members or their values.
+        """
+        return self._generation
+
+    def _mutated(self) -> None:
+        # Must be called while holding the lock
+        self._generation += 1
+        self._available_members = None
+
     def _default_gma(
         self, member: 'Member'
     ) -> Optional[Union[AttributeType, List[AttributeType]]]:
@@ -137,55 +154,127 @@ class AttributeManager(PicklableBase, Generic[AttributeType]):
             return bool(set(attrs1).intersection(attrs2))
         return False
 
-    def register_member(self, member: 'Member') -> None:
+    def register_member(self, member: 'Member', copy: bool = True) -> None:
         """
         Registers a new member.
 
         Note:
-            Copies the member so changes to the instance wont directly affect the orchestra.
-            Use :meth:`update_member` to update the information about this member.
+            By default, copies the member so changes to the instance wont directly affect the
+            orchestra. Use :meth:`update_member` to update the information about this member.
 
         Args:
             member: The new member
+            copy: Optional. Pass :obj:`False` to store a reference to :attr:`member` instead of
+                a copy. Useful, if the member is owned by someone else, e.g. a
+                :class:`components.Orchestra`, that takes care to call :meth:`update_member` on
+                changes. Defaults to :obj:`True`.
         """
-        if member in self.available_members:
+        if member.user_id in self._member_values:
             raise RuntimeError('Member is already registered.')
 
-        new_member = deepcopy(member)
-        attributes = self._gma_as_list(new_member)
-        if not attributes:
-            return
+        member = deepcopy(member) if copy else member
         with self._lock:
-            for attr in attributes:
-                self.data[attr].add(new_member)
+            if self._add(member):
+                self._mutated()
+
+    def register_members(self, members: Iterable['Member'], copy: bool = True) -> None:
+        """
+        Registers multiple members at once. In contrast to calling :meth:`register_member` for
+        each member, the lock is acquired only once and there are no checks for double
+        registration. Hence, this is only available for empty instances.
+
+        Args:
+            members: The new members. The user IDs must be unique.
+            copy: Optional. Whether to store copies of the members. See
+                :meth:`register_member`. Defaults to :obj:`True`.
+
+        Raises:
+            RuntimeError: If there are already members registered.
+        """
+        with self._lock:
+            if self._member_values:
+                raise RuntimeError('Bulk registration is only available for empty instances.')
+            for member in members:
+                self._add(deepcopy(member) if copy else member)
+            self._mutated()
+
+    def _add(self, member: 'Member') -> bool:
+        # Must be called while holding the lock. Returns whether the member was stored
+        attributes = self._gma_as_list(member)
+        if not attributes:
+            return False
+        for attr in attributes:
+            self._data[attr].add(member)
+        self._member_values[member.user_id] = list(attributes)
+        return True
+
+    @staticmethod
+    def _discard_from(
+        data: MemberDict, attributes: Iterable[AttributeType], member: Member
+    ) -> None:
+        for attr in attributes:
+            members = data.get(attr)
+            if members is None:
+                continue
+            members.discard(member)
+            # Make sure emtpy sets are deleted
+            if len(members) == 0:
+                data.pop(attr)
 
     def kick_member(self, member: 'Member') -> None:
         """
-        Kicks a member, if present.
+        Kicks a member, if present. Only the values the member was registered under are touched.
 
         Args:
             member: The member to kick.
         """
         with self._lock:
-            for attr in list(self.data.keys()):
-                self.data[attr].discard(member)
-                # Make sure emtpy sets are deleted
-                if len(self.data[attr]) == 0:
-                    self.data.pop(attr)
+            attributes = self._member_values.pop(member.user_id, None)
+            if attributes is not None:
+                self._discard_from(self._data, attributes, member)
+                self._mutated()
+
+    def registered_values(self, member: Member) -> Optional[List[AttributeType]]:
+        """
+        Gives the values :attr:`member` is currently registered under, as looked up from the
+        reverse index. In particular, this reflects the state at registration time even if the
+        member was changed afterwards.
+
+        Args:
+            member: The member.
+
+        Returns:
+            The list of values or :obj:`None`, if the member is not registered.
+        """
+        with self._lock:
+            values = self._member_values.get(member.user_id)
+            return list(values) if values is not None else None
+
+    def has_changed(self, member: Member) -> bool:
+        """
+        Checks, if the values of :attr:`member` differ from the values it is registered under.
+
+        Args:
+            member: The member.
+        """
+        attributes = self._gma_as_list(member)
+        return self.registered_values(member) != (list(attributes) if attributes else None)
 
-    def update_member(self, member: 'Member') -> None:
+    def update_member(self, member: 'Member', copy: bool = True) -> None:
         """
         Updates the information of a member.
 
         Note:
-            As :meth:`register_user`, this will copy the
-            member. To update the information again, call this method again.
+            As :meth:`register_user`, this will copy the member by default. To update the
+            information again, call this method again.
 
         Args:
             member: The member with new information.
+            copy: Optional. Whether to store a copy of :attr:`member`. See
+                :meth:`register_member`. Defaults to :obj:`True`.
         """
         self.kick_member(member)
-        self.register_member(member)
+        self.register_member(member, copy=copy)
 
     def _distinct_values_for_member(
         self, data: MemberDict, attribute_manager: AttributeManager, member: Member
@@ -240,16 +329,22 @@ class AttributeManager(PicklableBase, Generic[AttributeType]):
         attributes = self._gma_as_list(member)
         if attributes is None:
             return []
+        data = self.data
         with self._lock:
-            return [attr for attr in attributes if len(self.data[attr].difference({member})) == 0]
+            return [attr for attr in attributes if len(data[attr].difference({member})) == 0]
 
     @property
     def available_members(self) -> FrozenSet['Member']:
         """
-        All the members that have the attribute managed by this instance.
+        All the members that have the attribute managed by this instance. The set is cached and
+        only rebuilt, if :attr:`generation` changed.
         """
+        # Accessing data first, as subclasses may update it
+        data = self.data
         with self._lock:
-            return frozenset(set().union(*self.data.values()))  # type: ignore
+            if self._available_members is None:
+                self._available_members = frozenset(set().union(*data.values()))  # type: ignore
+            return self._available_members
 
     def is_hintable_with_member(
         self, attribute_manager: AttributeManager, member: Member, multiple_choice: bool = True
@@ -271,6 +366,60 @@ class AttributeManager(PicklableBase, Generic[AttributeType]):
             and len(self.unique_attributes_of(member)) >= 1
         )
 
+    def hint_members(
+        self, attribute_manager: AttributeManager, multiple_choice: bool = True
+    ) -> FrozenSet[Member]:
+        """
+        All members that can currently serve as hint for questions where this instance is serving
+        as hint and :attr:`attribute_manager` serves as question. In contrast to
+        :meth:`is_hintable_with`, this checks *all* candidates and is therefore suited for building
+        an index of hint members.
+
+        Args:
+            attribute_manager: The manager describing the attribute serving as question.
+            multiple_choice: Whether this is a multiple choice question or not. Defaults to
+                :obj:`True`
+        """
+        return frozenset(self.question_space(attribute_manager, multiple_choice=multiple_choice))
+
+    def question_space(
+        self, attribute_manager: AttributeManager, multiple_choice: bool = True
+    ) -> Dict[Member, int]:
+        """
+        Enumerates the questions where this instance is serving as hint and
+        :attr:`attribute_manager` serves as question. For every member that can currently serve
+        as hint, gives the size of its distractor pool, i.e. the number of values of
+        :attr:`attribute_manager` that can be presented as wrong answers. This computes the pool
+        sizes in the same pass that determines the members of :meth:`hint_members`.
+
+        Args:
+            attribute_manager: The manager describing the attribute serving as question.
+            multiple_choice: Whether this is a multiple choice question or not. Defaults to
+                :obj:`True`
+
+        Returns:
+            Dict[:class:`components.Member`, :obj:`int`]: The hint members and the sizes of their
+            distractor pools. As free text questions don't have distractors, all sizes are ``0``
+            in that case.
+        """
+        if attribute_manager not in self.questionable_attributes:
+            return {}
+
+        candidates = self.available_members.intersection(attribute_manager.available_members)
+        if not multiple_choice:
+            return {
+                m: 0
+                for m in candidates
+                if self.is_hintable_with_member(attribute_manager, m, multiple_choice=False)
+            }
+
+        out = {}
+        for member in candidates:
+            pool_size = len(attribute_manager.distinct_values_for_member(self, member))
+            if pool_size >= 3:
+                out[member] = pool_size
+        return out
+
     def is_hintable_with(
         self,
         attribute_manager: AttributeManager,
@@ -378,6 +527,7 @@ class AttributeManager(PicklableBase, Generic[AttributeType]):
         attribute_manager: AttributeManager,
         multiple_choice: Literal[False],
         exclude_members: Iterable[Member] = None,
+        hint_member: Member = None,
     ) -> Tuple[Member, AttributeType, Union[Any, List[Any]]]:
         ...
 
@@ -387,6 +537,7 @@ class AttributeManager(PicklableBase, Generic[AttributeType]):
         attribute_manager: AttributeManager,
         multiple_choice: Literal[True],
         exclude_members: Iterable[Member] = None,
+        hint_member: Member = None,
     ) -> Tuple[Member, AttributeType, Tuple[Any, Any, Any, Any], int]:
         ...
 
@@ -395,6 +546,7 @@ class AttributeManager(PicklableBase, Generic[AttributeType]):
         attribute_manager: AttributeManager,
         multiple_choice: bool = True,
         exclude_members: Iterable[Member] = None,
+        hint_member: Member = None,
     ) -> Union[
         Tuple[Member, AttributeType, Tuple[Any, Any, Any, Any], int],
         Tuple[Member, AttributeType, Any],
@@ -420,6 +572,10 @@ class AttributeManager(PicklableBase, Generic[AttributeType]):
                 :obj:`True`
             exclude_members: Optional. Members to exclude from serving as hint. Only relevant, if
              ``multiple_choice is True``
+            hint_member: Optional. The member serving as hint. Pass this, if the member was already
+                drawn, e.g. by :meth:`components.Orchestra.draw_hint_member`. In this case,
+                :attr:`exclude_members` is ignored. Must be a member as returned by
+                :meth:`draw_hint_member`.
 
         Raises:
             ValueError: If :attr:`attribute_manager` is not a valid question for this instance in
@@ -427,9 +583,12 @@ class AttributeManager(PicklableBase, Generic[AttributeType]):
             ValueError: If :attr:`attribute_manager` is currently not questionable for this
                 instance
         """
-        hint_member = self.draw_hint_member(
-            attribute_manager, multiple_choice=multiple_choice, exclude_members=exclude_members
-        )
+        if hint_member is None:
+            hint_member = self.draw_hint_member(
+                attribute_manager,
+                multiple_choice=multiple_choice,
+                exclude_members=exclude_members,
+            )
 
         if multiple_choice:
             # draw_hint_member makes sure that this is not None, but MyPy can't see that ...
@@ -493,44 +652,54 @@ class NameManager(AttributeManager):
         )
         self.male_data: MemberDict = defaultdict(set)
         self.female_data: MemberDict = defaultdict(set)
+        # Reverse index: user_id -> gender and value the member is registered under
+        self._gendered_member_values: Dict[
+            int, Tuple[str, Optional[Union[AttributeType, List[AttributeType]]]]
+        ] = {}
 
-    def register_member(self, member: 'Member') -> None:
-        """
-        Registers a new member.
-
-        Note:
-            Copies the member so changes to the instance wont directly affect the orchestra.
-            Use :meth:`update_member` to update the information about this member.
-
-        Args:
-            member: The new member
-        """
-        super().register_member(member)
+    def _add(self, member: 'Member') -> bool:
+        if not super()._add(member):
+            return False
 
-        new_member = deepcopy(member)
-        attribute = self.get_members_attribute(new_member)
-        if attribute and member.gender:
-            with self._lock:
-                if new_member.gender == Gender.MALE:
-                    self.male_data[attribute].add(new_member)
-                else:
-                    self.female_data[attribute].add(new_member)
+        attribute = self.get_members_attribute(member)
+        if member.gender:
+            if member.gender == Gender.MALE:
+                self.male_data[attribute].add(member)
+            else:
+                self.female_data[attribute].add(member)
+            self._gendered_member_values[member.user_id] = (member.gender, attribute)
+        return True
 
     def kick_member(self, member: 'Member') -> None:
         """
-        Kicks a member, if present.
+        Kicks a member, if present. Only the values the member was registered under are touched.
 
         Args:
             member: The member to kick.
         """
         super().kick_member(member)
         with self._lock:
-            for data in [self.female_data, self.male_data]:
-                for attr in list(data.keys()):
-                    data[attr].discard(member)
-                    # Make sure emtpy sets are deleted
-                    if len(data[attr]) == 0:
-                        data.pop(attr)
+            entry = self._gendered_member_values.pop(member.user_id, None)
+            if entry is not None:
+                gender, attribute = entry
+                data = self.male_data if gender == Gender.MALE else self.female_data
+                self._discard_from(data, [attribute], member)
+
+    def has_changed(self, member: Member) -> bool:
+        """
+        Checks, if the values of :attr:`member` differ from the values it is registered under.
+        In contrast to :meth:`AttributeManager.has_changed`, this also takes the gender into
+        account.
+
+        Args:
+            member: The member.
+        """
+        if super().has_changed(member):
+            return True
+        attribute = self.get_members_attribute(member)
+        entry = (member.gender, attribute) if attribute and member.gender else None
+        with self._lock:
+            return self._gendered_member_values.get(member.user_id) != entry
 
     def distinct_values_for_member(
         self, attribute_manager: AttributeManager, member: Member
@@ -584,8 +753,6 @@ class PhotoManager(NameManager):
             questionable_attributes=questionable_attributes,
             get_members_attribute=self.get_members_attribute,
         )
-        self.male_data: MemberDict = defaultdict(set)
-        self.female_data: MemberDict = defaultdict(set)
 
     @staticmethod
     def get_members_attribute(member: 'Member') -> Optional[str]:
@@ -619,6 +786,11 @@ class ChangingAttributeManager(AttributeManager):
     Subclass of :class:`AttributeManager` that updates it's members attributes once a day. This is
     needed, for attributes like age, which can change on a daily basis.
 
+    Note:
+        If :attr:`anniversary_attribute` is set, the members are kept in a calendar by the day and
+        month of that attribute and :meth:`refresh` only updates the members whose anniversary
+        passed since the last update. Otherwise, all members are updated.
+
     Attributes:
         description: A description of the attribute the instance manages.
         questionable_attributes: A list of :class:`components.AttributeManager` instances that
@@ -626,6 +798,8 @@ class ChangingAttributeManager(AttributeManager):
             manages.
         gendered_questions: Whether questions with tis attribute as hint should try to
             list only members with the same gender as the hint member.
+        anniversary_attribute: The attribute of :class:`components.Member` holding the date, on
+            whose anniversary the managed attribute changes.
 
     Args:
         description: A description of the attribute the instance manages.
@@ -640,6 +814,9 @@ class ChangingAttributeManager(AttributeManager):
                 lambda member: member[self.description]
         gendered_questions: Optional. Whether questions with tis attribute as hint should try to
             list only members with the same gender as the hint member. Defaults to :obj:`False`.
+        anniversary_attribute: Optional. The attribute of :class:`components.Member` holding the
+            date, on whose anniversary the managed attribute changes, e.g. ``'date_of_birth'``
+            for the age.
     """
 
     def __init__(
@@ -650,6 +827,7 @@ class ChangingAttributeManager(AttributeManager):
             ['Member'], Optional[Union[AttributeType, List[AttributeType]]]
         ] = None,
         gendered_questions: bool = False,
+        anniversary_attribute: str = None,
     ) -> None:
         super().__init__(
             description=description,
@@ -657,21 +835,111 @@ class ChangingAttributeManager(AttributeManager):
             get_members_attribute=get_members_attribute,
             gendered_questions=gendered_questions,
         )
+        self.anniversary_attribute = anniversary_attribute
         self._cache_date: Optional[dtm.date] = None
+        # Calendar: (month, day) -> members, whose attribute changes on that day
+        self._calendar: Dict[Tuple[int, int], Set[Member]] = defaultdict(set)
+        self._member_anniversaries: Dict[int, Tuple[int, int]] = {}
 
     @property
     def data(self) -> MemberDict:
+        """
+        The members by their attribute values as of the last call of :meth:`refresh`.
+        """
+        return self._data
+
+    def _add(self, member: 'Member') -> bool:
+        if not super()._add(member):
+            return False
+
+        # The values of new members are computed for the current date
+        if self._cache_date is None:
+            self._cache_date = dtm.date.today()
+        if self.anniversary_attribute:
+            anniversary = cast(Optional[dtm.date], member[self.anniversary_attribute])
+            if anniversary:
+                key = (anniversary.month, anniversary.day)
+                self._calendar[key].add(member)
+                self._member_anniversaries[member.user_id] = key
+        return True
+
+    def kick_member(self, member: 'Member') -> None:
+        """
+        Kicks a member, if present. Only the values the member was registered under are touched.
+
+        Args:
+            member: The member to kick.
+        """
+        super().kick_member(member)
+        with self._lock:
+            key = self._member_anniversaries.pop(member.user_id, None)
+            if key is not None:
+                self._discard_from(self._calendar, [key], member)
+
+    def has_changed(self, member: Member) -> bool:
+        """
+        Checks, if the values of :attr:`member` differ from the values it is registered under.
+        In contrast to :meth:`AttributeManager.has_changed`, this also takes the
+        :attr:`anniversary_attribute` into account.
+
+        Args:
+            member: The member.
+        """
+        if super().has_changed(member):
+            return True
+        if not self.anniversary_attribute or not self._gma_as_list(member):
+            return False
+        anniversary = cast(Optional[dtm.date], member[self.anniversary_attribute])
+        key = (anniversary.month, anniversary.day) if anniversary else None
+        with self._lock:
+            return self._member_anniversaries.get(member.user_id) != key
+
+    def _changing_members(self, today: dtm.date) -> Set[Member]:
+        # Must be called while holding the lock
+        if (
+            not self.anniversary_attribute
+            or self._cache_date is None
+            or (today - self._cache_date).days >= 366
+        ):
+            return set().union(*self._data.values())  # type: ignore
+
+        members: Set[Member] = set()
+        day = self._cache_date
+        while day < today:
+            day += dtm.timedelta(days=1)
+            members.update(self._calendar.get((day.month, day.day), ()))
+            # Anniversaries on February 29th take effect on March 1st in non-leap years
+            if (day.month, day.day) == (3, 1) and not calendar.isleap(day.year):
+                members.update(self._calendar.get((2, 29), ()))
+        return members
+
+    def refresh(self) -> None:
+        """
+        Updates the attribute values of the members to the current date. Does nothing, if the
+        values are already up to date. This is meant to be called once a day shortly after
+        midnight, e.g. by a scheduled job. The values are *not* updated on access.
+        """
         today = dtm.date.today()
-        if self._cache_date is None or today > self._cache_date:
-            members: FrozenSet[Member] = frozenset(
-                set().union(*self._data.values())  # type: ignore
-            )
-            self._data.clear()
-            for member in members:
+        with self._lock:
+            if self._cache_date is not None and today <= self._cache_date:
+                return
+
+            changed = False
+            for member in self._changing_members(today):
+                old_attributes = self._member_values.pop(member.user_id)
+                self._discard_from(self._data, old_attributes, member)
+
                 attributes = self._gma_as_list(member)
-                if attributes is None:
-                    continue
-                for attr in attributes:
-                    self._data[attr].add(member)
+                if attributes:
+                    for attr in attributes:
+                        self._data[attr].add(member)
+                    self._member_values[member.user_id] = list(attributes)
+                else:
+                    key = self._member_anniversaries.pop(member.user_id, None)
+                    if key is not None:
+                        self._discard_from(self._calendar, [key], member)
+                changed = changed or attributes != old_attributes
+
+            if changed:
+                self._mutated()
             self._cache_date = today
-        return self._data
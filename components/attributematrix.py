@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""This module contains the AttributeMatrix class."""
+import random
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from components import AttributeManager, Gender, Member, NameManager, PhotoManager
+
+
+class _Column:  # pylint: disable=R0903
+    """Columnar snapshot of a single attribute manager."""
+
+    def __init__(self, attribute_manager: AttributeManager, rows: Dict[int, int]) -> None:
+        data = attribute_manager.data
+        self.values: List[Any] = list(data.keys())
+        self.codes: Dict[Any, int] = {value: code for code, value in enumerate(self.values)}
+        self.incidence = np.zeros((len(rows), len(self.values)), dtype=bool)
+        for code, members in enumerate(data.values()):
+            self.incidence[[rows[m.user_id] for m in members], code] = True
+        self.registered: np.ndarray = np.asarray(self.incidence.any(axis=1))
+
+        self.male: Optional[np.ndarray] = None
+        self.female: Optional[np.ndarray] = None
+        if isinstance(attribute_manager, NameManager):
+            self.male = np.zeros(len(rows), dtype=bool)
+            self.female = np.zeros(len(rows), dtype=bool)
+            for gendered_data, mask in [
+                (attribute_manager.male_data, self.male),
+                (attribute_manager.female_data, self.female),
+            ]:
+                for members in gendered_data.values():
+                    mask[[rows[m.user_id] for m in members]] = True
+
+
+class AttributeMatrix:
+    """
+    A columnar snapshot of a set of :class:`components.AttributeManager` instances, where every
+    attribute value is mapped to an integer code and every manager is represented by a boolean
+    member×value incidence matrix. This allows to evaluate e.g.
+    :meth:`components.AttributeManager.distinct_values_for_member` by a few boolean mask
+    operations instead of comparing the members pairwise.
+
+    The methods of this class mirror the corresponding methods of
+    :class:`components.AttributeManager` and give the same results as long as the managers don't
+    change. The manager playing the role of ``self`` is passed as first argument.
+
+    Note:
+        The matrix is a snapshot. Build a new instance, whenever the attribute managers changed.
+
+    Attributes:
+        members (List[:class:`components.Member`]): The members in the order of the rows.
+
+    Args:
+        attribute_managers: The attribute managers to include.
+    """
+
+    def __init__(self, attribute_managers: Iterable[AttributeManager]) -> None:
+        attribute_managers = list(attribute_managers)
+        members: Dict[int, Member] = {}
+        for a_m in attribute_managers:
+            for member in a_m.available_members:
+                members.setdefault(member.user_id, member)
+
+        self.members: List[Member] = list(members.values())
+        self._rows: Dict[int, int] = {uid: row for row, uid in enumerate(members)}
+        self._columns: Dict[str, _Column] = {
+            a_m.description: _Column(a_m, self._rows) for a_m in attribute_managers
+        }
+
+    def _codes_of(
+        self, attribute_manager: AttributeManager, member: Member
+    ) -> Optional[List[int]]:
+        # Values not present in the snapshot can't be shared with anyone and are dropped
+        attributes = attribute_manager._gma_as_list(member)  # pylint: disable=W0212
+        if attributes is None:
+            return None
+        codes = self._columns[attribute_manager.description].codes
+        return [codes[attr] for attr in attributes if attr in codes]
+
+    def _scope(
+        self,
+        attribute_manager: AttributeManager,
+        hint_manager: AttributeManager,
+        member: Member,
+    ) -> Optional[np.ndarray]:
+        # Mirrors the selection of the data in the different distinct_values_for_member methods
+        # Returns None, if the result is empty anyway
+        column = self._columns[attribute_manager.description]
+        if isinstance(attribute_manager, NameManager) and hint_manager.gendered_questions:
+            if attribute_manager.get_members_attribute(member) is None:
+                return None
+            if isinstance(attribute_manager, PhotoManager):
+                if member.gender is None:
+                    return None
+                return column.male if member.gender == Gender.MALE else column.female
+            if member.first_name and member.gender is None:
+                return None
+            if member.gender:
+                return column.male if member.gender == Gender.MALE else column.female
+
+        if attribute_manager._gma_as_list(member) is None:  # pylint: disable=W0212
+            return None
+        return column.registered
+
+    def distinct_values_for_member(
+        self, attribute_manager: AttributeManager, hint_manager: AttributeManager, member: Member
+    ) -> Set[Any]:
+        """
+        Same as :meth:`components.AttributeManager.distinct_values_for_member`.
+
+        Args:
+            attribute_manager: The manager describing the attribute whose values are returned.
+            hint_manager: The manager describing the attribute serving as hint.
+            member: The member.
+        """
+        scope = self._scope(attribute_manager, hint_manager, member)
+        if scope is None:
+            return set()
+
+        column = self._columns[attribute_manager.description]
+        hint_column = self._columns[hint_manager.description]
+        question_codes = self._codes_of(attribute_manager, member) or []
+        hint_codes = self._codes_of(hint_manager, member) or []
+
+        shares = column.incidence[:, question_codes].any(axis=1)
+        shares |= hint_column.incidence[:, hint_codes].any(axis=1)
+        candidates = column.incidence[scope].any(axis=0)
+        candidates &= ~column.incidence[scope & shares].any(axis=0)
+        candidates[question_codes] = False
+        return {column.values[code] for code in np.flatnonzero(candidates)}
+
+    def unique_attributes_of(
+        self, attribute_manager: AttributeManager, member: Member
+    ) -> List[Any]:
+        """
+        Same as :meth:`components.AttributeManager.unique_attributes_of`.
+
+        Args:
+            attribute_manager: The manager describing the attribute.
+            member: The member.
+        """
+        attributes = attribute_manager._gma_as_list(member)  # pylint: disable=W0212
+        if attributes is None:
+            return []
+
+        column = self._columns[attribute_manager.description]
+        others = np.ones(len(self.members), dtype=bool)
+        if member.user_id in self._rows:
+            others[self._rows[member.user_id]] = False
+        out = []
+        for attr in attributes:
+            code = column.codes.get(attr)
+            if code is None or not column.incidence[others, code].any():
+                out.append(attr)
+        return out
+
+    def is_hintable_with_member(
+        self,
+        hint_manager: AttributeManager,
+        attribute_manager: AttributeManager,
+        member: Member,
+        multiple_choice: bool = True,
+    ) -> bool:
+        """
+        Same as :meth:`components.AttributeManager.is_hintable_with_member`.
+
+        Args:
+            hint_manager: The manager describing the attribute serving as hint.
+            attribute_manager: The manager describing the attribute serving as question.
+            member: The member.
+            multiple_choice: Whether this is a multiple choice question or not. Defaults to
+                :obj:`True`
+        """
+        if multiple_choice:
+            return (
+                len(self.distinct_values_for_member(attribute_manager, hint_manager, member)) >= 3
+            )
+        row = self._rows.get(member.user_id)
+        return (
+            row is not None
+            and bool(self._columns[attribute_manager.description].registered[row])
+            and len(self.unique_attributes_of(hint_manager, member)) >= 1
+        )
+
+    def hint_members(
+        self,
+        hint_manager: AttributeManager,
+        attribute_manager: AttributeManager,
+        multiple_choice: bool = True,
+        chunk_size: int = 256,
+    ) -> FrozenSet[Member]:
+        """
+        Same as :meth:`components.AttributeManager.hint_members`. For multiple choice questions,
+        the candidates are evaluated in chunks of :attr:`chunk_size` members at once.
+
+        Args:
+            hint_manager: The manager describing the attribute serving as hint.
+            attribute_manager: The manager describing the attribute serving as question.
+            multiple_choice: Whether this is a multiple choice question or not. Defaults to
+                :obj:`True`
+            chunk_size: Optional. Number of members to evaluate at once. Defaults to ``256``.
+        """
+        return frozenset(
+            self.question_space(
+                hint_manager,
+                attribute_manager,
+                multiple_choice=multiple_choice,
+                chunk_size=chunk_size,
+            )
+        )
+
+    def question_space(
+        self,
+        hint_manager: AttributeManager,
+        attribute_manager: AttributeManager,
+        multiple_choice: bool = True,
+        chunk_size: int = 256,
+    ) -> Dict[Member, int]:
+        """
+        Same as :meth:`components.AttributeManager.question_space`. For multiple choice questions,
+        the candidates are evaluated in chunks of :attr:`chunk_size` members at once.
+
+        Args:
+            hint_manager: The manager describing the attribute serving as hint.
+            attribute_manager: The manager describing the attribute serving as question.
+            multiple_choice: Whether this is a multiple choice question or not. Defaults to
+                :obj:`True`
+            chunk_size: Optional. Number of members to evaluate at once. Defaults to ``256``.
+        """
+        if attribute_manager not in hint_manager.questionable_attributes:
+            return {}
+
+        column = self._columns[attribute_manager.description]
+        hint_column = self._columns[hint_manager.description]
+        candidates = np.flatnonzero(hint_column.registered & column.registered)
+
+        if not multiple_choice:
+            shared_values = hint_column.incidence.sum(axis=0) > 1
+            return {
+                self.members[row]: 0
+                for row in candidates
+                if (hint_column.incidence[row] & ~shared_values).any()
+            }
+
+        # Group the candidates by the data they are compared against
+        groups: Dict[int, Tuple[np.ndarray, List[int]]] = {}
+        for row in candidates:
+            scope = self._scope(attribute_manager, hint_manager, self.members[row])
+            if scope is not None:
+                groups.setdefault(id(scope), (scope, []))[1].append(int(row))
+
+        out: Dict[Member, int] = {}
+        for scope, rows in groups.values():
+            in_scope = column.incidence[scope]
+            present = in_scope.any(axis=0)
+            for chunk in np.split(rows, range(chunk_size, len(rows), chunk_size)):
+                own_values = column.incidence[chunk]
+                # shares[i, j]: Does the i-th candidate share an attribute with the j-th member?
+                shares = own_values @ in_scope.T
+                shares |= hint_column.incidence[chunk] @ hint_column.incidence[scope].T
+                distinct = present & ~(shares @ in_scope) & ~own_values
+                for row, pool_size in zip(chunk, distinct.sum(axis=1)):
+                    if pool_size >= 3:
+                        out[self.members[row]] = int(pool_size)
+        return out
+
+    def draw_question_attributes(
+        self, attribute_manager: AttributeManager, hint_manager: AttributeManager, member: Member
+    ) -> Tuple[Tuple[Any, Any, Any, Any], int]:
+        """
+        Same as :meth:`components.AttributeManager.draw_question_attributes`.
+
+        Args:
+            attribute_manager: The manager describing the attribute serving as question.
+            hint_manager: The manager describing the attribute serving as hint.
+            member: The member that defines the correct answer.
+        """
+        correct_attributes = attribute_manager._gma_as_list(member)  # pylint: disable=W0212
+
+        if not correct_attributes:
+            raise RuntimeError(f'Given member has no attribute {attribute_manager.description}')
+        correct_attribute = random.choice(correct_attributes)
+
+        dvs = list(self.distinct_values_for_member(attribute_manager, hint_manager, member))
+
+        if len(dvs) < 3:
+            raise RuntimeError(
+                f'Given member {member} is not hintable for attribute '
+                f'{attribute_manager.description}!'
+            )
+
+        attributes = random.sample(dvs, 3)
+        attributes.append(correct_attribute)
+
+        random.shuffle(attributes)
+
+        return tuple(attributes), attributes.index(correct_attribute)  # type: ignore
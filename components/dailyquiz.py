@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""This module contains the DailyQuiz class."""
+import datetime as dtm
+import random
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, List, Set, Tuple
+
+from components import PicklableBase, Orchestra, question_text
+
+
+@dataclass(frozen=True)
+class DailyQuestion:
+    """
+    A single multiple choice question of a :class:`DailyQuiz`.
+
+    Attributes:
+        user_id (:obj:`int`): The ID of the member with the correct answer.
+        hint_attribute (:obj:`str`): The attribute given as hint.
+        question_attribute (:obj:`str`): The attribute asked for.
+        hint (:obj:`object`): The hint value.
+        text (:obj:`str`): The question text.
+        options (Tuple[:obj:`str`, ...]): The answer options.
+        correct_option_id (:obj:`int`): The index of the correct option.
+    """
+
+    user_id: int
+    hint_attribute: str
+    question_attribute: str
+    hint: Any
+    text: str
+    options: Tuple[str, ...]
+    correct_option_id: int
+
+
+class DailyQuiz(PicklableBase):
+    """
+    A fixed set of multiple choice questions, which is generated once a day and asked to every
+    player. Each player may take the quiz once and their result is ranked on a leaderboard. As the
+    polls reveal the correct answers, a player counts as having played as soon as they start the
+    quiz, see :meth:`start`.
+
+    Note:
+        As all players get the same questions, a player may be asked about themselves. This is
+        accepted, since excluding them would make the results incomparable on the leaderboard.
+
+    Attributes:
+        date (:obj:`datetime.date`): The day of the quiz.
+        questions (List[:class:`DailyQuestion`]): The questions.
+
+    Args:
+        date: The day of the quiz.
+        questions: The questions.
+    """
+
+    def __init__(self, date: dtm.date, questions: List[DailyQuestion]) -> None:
+        self.date = date
+        self.questions = questions
+        self._results: Dict[int, int] = dict()
+        self._finished: Set[int] = set()
+        self._results_lock = Lock()
+
+    @classmethod
+    def generate(
+        cls, orchestra: Orchestra, number_of_questions: int = 10, date: dtm.date = None
+    ) -> 'DailyQuiz':
+        """
+        Generates a new quiz from the current state of the orchestra. Each question is built by
+        :meth:`components.AttributeManager.build_question_with` for a random pair of attributes
+        from :meth:`components.Orchestra.questionable`. The same combination of attributes and
+        member is not used twice, if avoidable.
+
+        Args:
+            orchestra: The orchestra.
+            number_of_questions: Optional. The number of questions. Defaults to ``10``.
+            date: Optional. The day of the quiz. Defaults to today.
+
+        Raises:
+            RuntimeError: If the orchestra currently has no questionable attributes.
+        """
+        pairs = orchestra.questionable(multiple_choice=True)
+        if not pairs:
+            raise RuntimeError('Orchestra currently has no questionable attributes.')
+
+        used: Set[Tuple[str, str, int]] = set()
+        questions: List[DailyQuestion] = []
+        while len(questions) < number_of_questions:
+            for _ in range(10):
+                hint_manager, question_manager = random.choice(pairs)
+                hint_member = orchestra.draw_hint_member(hint_manager, question_manager)
+                key = (hint_manager.description, question_manager.description, hint_member.user_id)
+                if key not in used:
+                    break
+            used.add(key)
+
+            member, hint, options, index = hint_manager.build_question_with(
+                question_manager, multiple_choice=True, hint_member=hint_member
+            )
+            questions.append(
+                DailyQuestion(
+                    user_id=member.user_id,
+                    hint_attribute=hint_manager.description,
+                    question_attribute=question_manager.description,
+                    hint=hint,
+                    text=question_text(
+                        member,
+                        question_manager.description,
+                        hint_manager.description,
+                        multiple_choice=True,
+                    ),
+                    options=tuple(str(o) for o in options),
+                    correct_option_id=index,
+                )
+            )
+        return cls(date or dtm.date.today(), questions)
+
+    def has_played(self, user_id: int) -> bool:
+        """
+        Whether the user already started the quiz.
+
+        Args:
+            user_id: The ID of the user.
+        """
+        return user_id in self._results
+
+    def start(self, user_id: int) -> bool:
+        """
+        Records that the user started the quiz with a result of ``0`` correct answers. The result
+        is updated by :meth:`add_result`, when the user finishes the quiz. If they don't, e.g.
+        because they cancelled the game, the result stays at ``0``.
+
+        Args:
+            user_id: The ID of the user.
+
+        Returns:
+            :obj:`bool`: Whether the user may take the quiz, i.e. didn't start it before.
+        """
+        with self._results_lock:
+            if user_id in self._results:
+                return False
+            self._results[user_id] = 0
+            return True
+
+    def add_result(self, user_id: int, correct: int) -> bool:
+        """
+        Records the result of a user, who finished the quiz. Only the first result of each user is
+        recorded.
+
+        Args:
+            user_id: The ID of the user.
+            correct: The number of correct answers.
+
+        Returns:
+            :obj:`bool`: Whether the result was recorded.
+        """
+        with self._results_lock:
+            if user_id in self._finished:
+                return False
+            self._finished.add(user_id)
+            # Ties are ranked by the order of finishing, so the result is moved to the end
+            self._results.pop(user_id, None)
+            self._results[user_id] = correct
+            return True
+
+    def leaderboard(self) -> List[Tuple[int, int]]:
+        """
+        Gives the results ranked by the number of correct answers. Ties are ranked by the order
+        in which the quiz was finished.
+
+        Returns:
+            List[Tuple[:obj:`int`, :obj:`int`]]: The user IDs and their numbers of correct
+            answers.
+        """
+        with self._results_lock:
+            results = list(self._results.items())
+        return sorted(results, key=lambda result: result[1], reverse=True)
+
+    def rank_of(self, user_id: int) -> int:
+        """
+        Gives the rank of the user on the :meth:`leaderboard`.
+
+        Args:
+            user_id: The ID of the user.
+
+        Raises:
+            ValueError: If the user has not taken the quiz yet.
+        """
+        for rank, (uid, _) in enumerate(self.leaderboard(), start=1):
+            if uid == user_id:
+                return rank
+        raise ValueError('This user has not taken the quiz yet.')
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""This module contains the GeocodeCache class."""
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Hashable, Optional, Tuple
+
+from geopy import Location
+
+from components import PicklableBase
+
+
+class GeocodeCache(PicklableBase):
+    """
+    A size bounded least recently used cache for the results of a geocoder like
+    :class:`geopy.Photon`. Addresses are looked up by their normalized string, i.e. case and
+    whitespace don't matter, and coordinates are looked up rounded to :attr:`precision` decimal
+    places. Addresses that couldn't be found are cached as well, but expire earlier. Failed
+    requests are not cached.
+
+    Note:
+        The cache is kept in memory only. Pickle the instance, e.g. by storing it in ``bot_data``,
+        to keep it across restarts. Expiry is based on the wall clock for this reason.
+
+    Attributes:
+        max_size (:obj:`int`): The maximum number of cached results.
+        ttl (:obj:`float`): Number of seconds after which a found location expires.
+        negative_ttl (:obj:`float`): Number of seconds after which a not found location expires.
+        precision (:obj:`int`): Number of decimal places coordinates are rounded to.
+        hits (:obj:`int`): Number of lookups answered by the cache.
+        misses (:obj:`int`): Number of lookups that had to be passed to the geocoder.
+
+    Args:
+        max_size: Optional. The maximum number of cached results. Defaults to ``2048``.
+        ttl: Optional. Number of seconds after which a found location expires. Defaults to 30
+            days.
+        negative_ttl: Optional. Number of seconds after which a not found location expires.
+            Defaults to one day.
+        precision: Optional. Number of decimal places coordinates are rounded to. Defaults to
+            ``5``, which corresponds to about one meter.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 2048,
+        ttl: float = 30 * 24 * 3600,
+        negative_ttl: float = 24 * 3600,
+        precision: int = 5,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.precision = precision
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Optional[Location]]]' = OrderedDict()
+        self._entries_lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def normalize_address(address: str) -> str:
+        """
+        Gives the normalized form of an address, that is used as key.
+
+        Args:
+            address: The address.
+        """
+        return ' '.join(address.lower().replace(',', ' ').split())
+
+    def _lookup(
+        self, key: Hashable, fetch: Callable[[], Optional[Location]]
+    ) -> Optional[Location]:
+        now = time.time()
+        with self._entries_lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # The request is made without holding the lock. Concurrent lookups of the same key may
+        # therefore both reach the geocoder, which is harmless.
+        location = fetch()
+
+        with self._entries_lock:
+            self._entries[key] = (now + (self.ttl if location else self.negative_ttl), location)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return location
+
+    def geocode(
+        self, geocoder: Callable[[str], Optional[Location]], address: str
+    ) -> Optional[Location]:
+        """
+        Gives the location of an address. Asks the geocoder only, if there is no valid cached
+        result.
+
+        Args:
+            geocoder: The callable resolving the address, e.g. :meth:`geopy.Photon.geocode`.
+            address: The address.
+
+        Returns:
+            :class:`geopy.Location`: The location or :obj:`None`, if it couldn't be found.
+
+        Raises:
+            Any exception raised by :attr:`geocoder`.
+        """
+        key = ('address', self.normalize_address(address))
+        return self._lookup(key, lambda: geocoder(address))
+
+    def reverse(
+        self,
+        geocoder: Callable[[Tuple[float, float]], Optional[Location]],
+        coordinates: Tuple[float, float],
+    ) -> Optional[Location]:
+        """
+        Gives the location at the given coordinates. Asks the geocoder only, if there is no valid
+        cached result.
+
+        Args:
+            geocoder: The callable resolving the coordinates, e.g. :meth:`geopy.Photon.reverse`.
+            coordinates: Coordinates as tuple of latitude and longitude.
+
+        Returns:
+            :class:`geopy.Location`: The location or :obj:`None`, if it couldn't be found.
+
+        Raises:
+            Any exception raised by :attr:`geocoder`.
+        """
+        key = ('coordinates', tuple(round(c, self.precision) for c in coordinates))
+        return self._lookup(key, lambda: geocoder(coordinates))
+
+    def clear(self) -> None:
+        """Removes all cached results and resets the statistics."""
+        with self._entries_lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """:obj:`float`: The share of lookups answered by the cache. ``0``, if there were none."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
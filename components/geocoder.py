@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""This module contains the Geocoder class."""
+import socket
+import time
+from threading import BoundedSemaphore
+from typing import Any, Callable, Optional, Tuple, TypeVar
+from urllib.error import URLError
+from urllib.request import Request
+
+import requests
+from geopy import Location, Photon
+from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+
+RT = TypeVar('RT')
+
+
+class Geocoder:
+    """
+    A process wide client for the Photon geocoding service. All requests are made through a
+    single :class:`requests.Session`, which keeps the connections alive. At most
+    :attr:`max_concurrency` requests are in flight at the same time and requests that timed out
+    or found the service unavailable are retried with exponential backoff.
+
+    Note:
+        The instance is shared by all :class:`components.Member` instances. It is not meant to be
+        pickled or copied.
+
+    Attributes:
+        timeout (:obj:`float`): Timeout of a single request in seconds.
+        retries (:obj:`int`): Number of retries of a failed request.
+        backoff (:obj:`float`): Number of seconds to wait before the first retry. The waiting
+            time is doubled for each further retry.
+
+    Args:
+        timeout: Optional. Timeout of a single request in seconds. Defaults to ``5``.
+        max_concurrency: Optional. Maximum number of requests in flight at the same time. Defaults
+            to ``4``.
+        retries: Optional. Number of retries of a failed request. Defaults to ``2``.
+        backoff: Optional. Number of seconds to wait before the first retry. Defaults to ``0.5``.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 5,
+        max_concurrency: int = 4,
+        retries: int = 2,
+        backoff: float = 0.5,
+    ) -> None:
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._semaphore = BoundedSemaphore(max_concurrency)
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+        self._photon = Photon(timeout=timeout)
+        self._photon.urlopen = self._urlopen
+
+    def _urlopen(self, request: Request, timeout: float = None, **_: Any) -> requests.Response:
+        # Translates the exceptions, such that geopy maps them to its own exceptions
+        try:
+            return self._session.get(
+                request.get_full_url(), headers=dict(request.header_items()), timeout=timeout
+            )
+        except requests.Timeout as exc:
+            raise socket.timeout(str(exc)) from exc
+        except requests.ConnectionError as exc:
+            raise URLError(f'Service unreachable: {exc}') from exc
+
+    def _call(self, method: Callable[..., RT], *args: Any) -> RT:
+        for attempt in range(self.retries + 1):
+            try:
+                with self._semaphore:
+                    return method(*args)
+            except (GeocoderTimedOut, GeocoderUnavailable) as exc:
+                if attempt == self.retries:
+                    raise exc
+                time.sleep(self.backoff * 2 ** attempt)
+        raise RuntimeError('Unreachable')  # pragma: no cover
+
+    def geocode(self, address: str) -> Optional[Location]:
+        """
+        Gives the location of an address.
+
+        Args:
+            address: The address.
+
+        Returns:
+            :class:`geopy.Location`: The location or :obj:`None`, if it couldn't be found.
+
+        Raises:
+            :class:`geopy.exc.GeopyError`: If the request failed.
+        """
+        return self._call(self._photon.geocode, address)
+
+    def reverse(self, coordinates: Tuple[float, float]) -> Optional[Location]:
+        """
+        Gives the location at the given coordinates.
+
+        Args:
+            coordinates: Coordinates as tuple of latitude and longitude.
+
+        Returns:
+            :class:`geopy.Location`: The location or :obj:`None`, if it couldn't be found.
+
+        Raises:
+            :class:`geopy.exc.GeopyError`: If the request failed.
+        """
+        return self._call(self._photon.reverse, coordinates)
@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """This module contains helper functions and casses."""
+import gc
 import locale
+import sys
 import threading
 from contextlib import contextmanager
-from typing import Generator
+from types import BuiltinFunctionType, FunctionType, ModuleType
+from typing import Any, Generator, Tuple, Type
 
 LOCALE_LOCK = threading.Lock()
 
@@ -25,6 +28,33 @@ def setlocale(name: str) -> Generator:
             locale.setlocale(locale.LC_ALL, saved)
 
 
+def deep_getsizeof(obj: Any, exclude: Tuple[Type, ...] = ()) -> int:
+    """
+    Estimates the memory used by an object and all objects it references. Every object is counted
+    only once. Classes, modules and functions are not counted.
+
+    Args:
+        obj: The object.
+        exclude: Optional. Instances of these types are neither counted nor followed. Use this for
+            objects that are shared with others, e.g. the orchestra.
+
+    Returns:
+        :obj:`int`: The size in bytes.
+    """
+    ignored = exclude + (type, ModuleType, FunctionType, BuiltinFunctionType)
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, ignored):
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        stack.extend(gc.get_referents(current))
+    return size
+
+
 COORDINATES_PATTERN = r'(\d*\.\d*), *(\d*\.\d*)'
 """
 :obj:`str`: Regex pattern for coordinates tuples.
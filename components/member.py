@@ -4,18 +4,31 @@
 from __future__ import annotations
 
 import copy
+from concurrent.futures import Future, ThreadPoolExecutor
 from io import BytesIO
 
 import datetime as dt
 import shutil
 import re
 from tempfile import NamedTemporaryFile
-from collections import defaultdict
-from typing import Optional, Union, List, Tuple, Dict, Any, ClassVar, NoReturn
+from collections import defaultdict, deque
+from typing import (
+    Optional,
+    Union,
+    List,
+    Tuple,
+    Dict,
+    Any,
+    ClassVar,
+    NoReturn,
+    Iterable,
+    BinaryIO,
+    Deque,
+)
 
 import requests
 import vobject
-from geopy import Photon, distance
+from geopy import Location, distance
 from geopy.exc import GeopyError
 from camelot import read_pdf
 import numpy as np
@@ -47,6 +60,9 @@ from components import (
     Bassoon,
     Tuba,
     Gender,
+    GeocodeCache,
+    Geocoder,
+    VCardCache,
 )
 from components.helpers import setlocale
 from .userscore import UserScore
@@ -102,6 +118,9 @@ class Member:  # pylint: disable=R0902,R0913,R0904
     _AKADRESSEN: ClassVar[Optional[pd.DataFrame]] = None
     _AKADRESSEN_ACTIVE: ClassVar[Optional[pd.DataFrame]] = None
     _AKADRESSEN_CACHE_TIME: ClassVar[Optional[dt.date]] = None
+    _GEOCODE_CACHE: ClassVar[Optional[GeocodeCache]] = None
+    _GEOCODER: ClassVar[Geocoder] = Geocoder()
+    _VCARD_CACHE: ClassVar[VCardCache] = VCardCache()
 
     def __init__(
         self,
@@ -144,7 +163,6 @@ class Member:  # pylint: disable=R0902,R0913,R0904
         self._functions: List[str] = []
         self.functions = functions  # type: ignore
 
-        self._geo_locator: Photon = Photon(timeout=5)
         self._address: Optional[str] = None
         self._longitude: Optional[float] = None
         self._latitude: Optional[float] = None
@@ -154,6 +172,11 @@ class Member:  # pylint: disable=R0902,R0913,R0904
         if longitude and latitude:
             self.set_address(coordinates=(latitude, longitude))
 
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # for backwards compatibility: Members used to carry their own geocoder
+        state.pop('_geo_locator', None)
+        self.__dict__.update(state)
+
     def __repr__(self) -> str:
         return f'Member({self.full_name or str(self.user_id)})'
 
@@ -198,38 +221,68 @@ class Member:  # pylint: disable=R0902,R0913,R0904
                 f'{"Aktiviert" if self.allow_contact_sharing else "Deaktiviert"}'
             )
 
-    def set_address(
-        self, address: str = None, coordinates: Tuple[float, float] = None
-    ) -> Optional[str]:
+    @classmethod
+    def resolve_address(
+        cls, address: str = None, coordinates: Tuple[float, float] = None
+    ) -> Optional[Location]:
         """
-        Tries to get the missing data from the Open Street Map API. Exactly one of the optional
-        parameters must be passed.
+        Looks up an address or coordinates with the Open Street Map API without changing any
+        member. Exactly one of the optional parameters must be passed. If a cache was set with
+        :meth:`set_geocode_cache`, it is consulted first. Requests are made by the
+        :class:`components.Geocoder` shared by all members, see :meth:`set_geocoder`.
 
         Args:
             address: The address.
             coordinates: Coordinates as tuple of latitude and longitude.
 
         Returns:
-            The found address.
+            :class:`geopy.Location`: The location or :obj:`None`, if it couldn't be found or the
+            request failed.
         """
         if bool(address and coordinates) or not bool(address or coordinates):
             raise ValueError('Exactly one of the parameters must be passed!')
         try:
+            cache, geocoder = cls._GEOCODE_CACHE, cls._GEOCODER
             if address:
-                location = self._geo_locator.geocode(address)
-            else:
-                location = self._geo_locator.reverse(coordinates)
+                if cache is not None:
+                    return cache.geocode(geocoder.geocode, address)
+                return geocoder.geocode(address)
+            if coordinates is None:
+                return None
+            if cache is not None:
+                return cache.reverse(geocoder.reverse, coordinates)
+            return geocoder.reverse(coordinates)
         except GeopyError:
-            self._raw_address = None
-            self._address = None
-            self._longitude = None
-            self._latitude = None
+            return None
+
+    def set_address(
+        self,
+        address: str = None,
+        coordinates: Tuple[float, float] = None,
+        location: Location = None,
+    ) -> Optional[str]:
+        """
+        Tries to get the missing data from the Open Street Map API via :meth:`resolve_address`.
+        Exactly one of the optional parameters must be passed.
+
+        Args:
+            address: The address.
+            coordinates: Coordinates as tuple of latitude and longitude.
+            location: A location as returned by :meth:`resolve_address`. Pass this, if the
+                address was already resolved, e.g. in the background.
 
-            return self._address
+        Returns:
+            The found address.
+        """
+        if sum(bool(arg) for arg in (address, coordinates, location)) != 1:
+            raise ValueError('Exactly one of the parameters must be passed!')
+        if location is None:
+            location = self.resolve_address(address=address, coordinates=coordinates)
 
         if location:
             if 'properties' in location.raw:
-                raw = location.raw['properties']
+                # Locations may be shared via the cache, so we don't alter the original
+                raw = dict(location.raw['properties'])
                 if (
                     ('street' in raw or 'name' in raw)
                     and 'postcode' in raw
@@ -366,6 +419,20 @@ class Member:  # pylint: disable=R0902,R0913,R0904
             return ', '.join(self.functions)
         return None
 
+    @property
+    def function_aliases(self) -> List[str]:
+        """
+        The function(s) the member holds, including gender specific aliases like *Männerwart* for
+        *Pärchenwart*. List may be empty.
+        """
+        functions = list(self.functions)
+        if 'Pärchenwart' in functions:
+            if self.gender == Gender.FEMALE:
+                functions.append('Männerwart')
+            elif self.gender == Gender.MALE:
+                functions.append('Frauenwart')
+        return functions
+
     @property
     def vcard_filename(self) -> str:
         """
@@ -375,7 +442,7 @@ class Member:  # pylint: disable=R0902,R0913,R0904
 
     def vcard(self, bot: Bot, admin: bool = False) -> BytesIO:
         """
-        Gives a vCard of the member.
+        Gives a vCard of the member. See :meth:`serialized_vcard`.
 
         Args:
             bot: A Telegram bot to retrieve the members photo (if set). Must be the same bot that
@@ -385,6 +452,27 @@ class Member:  # pylint: disable=R0902,R0913,R0904
         Returns:
             The vCard as bytes stream. Make sure to close it!
 
+        Raises:
+            ValueError: If sharing contact information is not allowed and :attr:`admin` is
+                :obj:`False`.
+        """
+        return BytesIO(self.serialized_vcard(bot, admin=admin))
+
+    def serialized_vcard(self, bot: Bot, admin: bool = False, store: bool = True) -> bytes:
+        """
+        Gives the serialized vCard of the member. The result is cached until the member changes.
+        See :meth:`set_vcard_cache`.
+
+        Args:
+            bot: A Telegram bot to retrieve the members photo (if set). Must be the same bot that
+                retrieved the file ID.
+            admin: Whether this method is invoked with admin rights.
+            store: Optional. Whether to cache the vCard, if it's not cached yet. See
+                :meth:`components.VCardCache.vcard`. Defaults to :obj:`True`.
+
+        Returns:
+            :obj:`bytes`: The UTF-8 encoded vCard.
+
         Raises:
             ValueError: If sharing contact information is not allowed and :attr:`admin` is
                 :obj:`False`.
@@ -392,6 +480,81 @@ class Member:  # pylint: disable=R0902,R0913,R0904
         if not (self.allow_contact_sharing or admin):
             raise ValueError('This member does not allow sharing it\'s contact information.')
 
+        # The admin flag only affects the permission check, not the vCard itself
+        key = (self.user_id, self._vcard_version)
+        return self._VCARD_CACHE.vcard(key, lambda: self._build_vcard(bot), store=store)
+
+    @classmethod
+    def write_vcards(
+        cls,
+        bot: Bot,
+        members: Iterable['Member'],
+        out: BinaryIO,
+        admin: bool = False,
+        max_workers: int = 4,
+    ) -> int:
+        """
+        Writes the vCards of multiple members to a single file, which can be imported as contact
+        list. The vCards are built by :meth:`serialized_vcard`, where at most :attr:`max_workers`
+        vCards are built, i.e. photos are downloaded, at the same time. The vCards are written in
+        the order of :attr:`members` as soon as they are available, such that at most
+        :attr:`max_workers` vCards are held in memory. Cached vCards are used, but the built ones
+        are not added to the cache.
+
+        Args:
+            bot: A Telegram bot to retrieve the members photos. Must be the same bot that
+                retrieved the file IDs.
+            members: The members.
+            out: The binary file to write to.
+            admin: Whether this method is invoked with admin rights.
+            max_workers: Optional. The maximum number of vCards built at the same time. Defaults
+                to ``4``.
+
+        Returns:
+            :obj:`int`: The number of written vCards.
+
+        Raises:
+            ValueError: If sharing contact information is not allowed for any of the members and
+                :attr:`admin` is :obj:`False`.
+        """
+        members = list(members)
+        if not admin and not all(member.allow_contact_sharing for member in members):
+            raise ValueError('Some of the members do not allow sharing their contact information.')
+
+        pending: Deque[Future] = deque()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='VCards') as executor:
+            for member in members:
+                if len(pending) >= max_workers:
+                    out.write(pending.popleft().result())
+                pending.append(
+                    executor.submit(member.serialized_vcard, bot, admin=admin, store=False)
+                )
+            while pending:
+                out.write(pending.popleft().result())
+        return len(members)
+
+    @property
+    def _vcard_version(self) -> Tuple[Any, ...]:
+        # All data that the vCard depends on
+        return (
+            self.first_name,
+            self.last_name,
+            self.nickname,
+            self.phone_number,
+            self.instruments_str,
+            self.functions_str,
+            self.gender,
+            self.date_of_birth,
+            # Only the fields used in the vCard. Other raw properties may be unhashable
+            tuple(
+                self._raw_address.get(key) for key in ('city', 'postcode', 'street', 'housenumber')
+            )
+            if self._raw_address
+            else None,
+            self.photo_file_id,
+        )
+
+    def _build_vcard(self, bot: Bot) -> bytes:
         vcard = vobject.vCard()
         if self.full_name:
             vcard.add('fn').value = self.full_name.replace('"', '')
@@ -427,19 +590,12 @@ class Member:  # pylint: disable=R0902,R0913,R0904
             )
 
         if self.photo_file_id:
-            photo_stream = BytesIO()
-            file = bot.get_file(self.photo_file_id)
-            file.download(out=photo_stream)
-            photo_stream.seek(0)
             photo = vcard.add('photo')
             photo.encoding_param = 'B'
             photo.type_param = 'JPG'
-            photo.value = photo_stream.read()
+            photo.value = self._VCARD_CACHE.photo(bot, self.photo_file_id)
 
-        vcard_file = BytesIO()
-        vcard_file.write(vcard.serialize().encode('utf-8'))
-        vcard_file.seek(0)
-        return vcard_file
+        return vcard.serialize().encode('utf-8')
 
     @staticmethod
     def _compare(str1: str, str2: str, allow_partial: bool = True) -> float:
@@ -481,13 +637,7 @@ class Member:  # pylint: disable=R0902,R0913,R0904
         """
         if not self.functions_str:
             raise ValueError('This member holds no functions.')
-        functions = copy.deepcopy(self.functions)
-        if 'Pärchenwart' in self.functions:
-            if self.gender == Gender.FEMALE:
-                functions.append('Männerwart')
-            elif self.gender == Gender.MALE:
-                functions.append('Frauenwart')
-        return max(self._compare(f, string, allow_partial=False) for f in functions)
+        return max(self._compare(f, string, allow_partial=False) for f in self.function_aliases)
 
     def compare_first_name_to(self, string: str) -> float:
         """
@@ -634,6 +784,36 @@ class Member:  # pylint: disable=R0902,R0913,R0904
         cls._AD_USERNAME = username
         cls._AD_PASSWORD = password
 
+    @classmethod
+    def set_geocode_cache(cls, cache: Optional[GeocodeCache]) -> None:
+        """
+        Sets the cache to be consulted by :meth:`set_address` for all members.
+
+        Args:
+            cache: The cache. Pass :obj:`None` to disable caching.
+        """
+        cls._GEOCODE_CACHE = cache
+
+    @classmethod
+    def set_geocoder(cls, geocoder: Geocoder) -> None:
+        """
+        Sets the geocoder used by :meth:`set_address` for all members.
+
+        Args:
+            geocoder: The geocoder.
+        """
+        cls._GEOCODER = geocoder
+
+    @classmethod
+    def set_vcard_cache(cls, cache: VCardCache) -> None:
+        """
+        Sets the cache used by :meth:`vcard`.
+
+        Args:
+            cache: The cache.
+        """
+        cls._VCARD_CACHE = cache
+
     def copy(self) -> 'Member':
         """
         Returns: A (deep) copy of this member.
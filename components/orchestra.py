@@ -1,13 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """This module contains the Orchestra class."""
+import datetime as dtm
+import random
 from copy import deepcopy
 from threading import Lock
 
-from typing import Dict, List, Optional, Tuple, Any, Set, Iterable, NoReturn
+from typing import Dict, List, Optional, Tuple, Any, Set, Iterable, NoReturn, FrozenSet
 
 from components import (
     Member,
+    AttributeMatrix,
     PicklableBase,
     Score,
     AttributeManager,
@@ -16,6 +19,9 @@ from components import (
     PhotoManager,
 )
 
+# The hint members as set and list for fast lookups and draws and their distractor pool sizes
+_HintIndexEntry = Tuple[FrozenSet[Member], List[Member], Dict[Member, int]]
+
 
 class Orchestra(PicklableBase):
     """
@@ -25,20 +31,71 @@ class Orchestra(PicklableBase):
         Orchestra instance support subscription for all attribute managers listed as keys of
         :attr:`SUBSCRIPTABLE`.
 
+    Note:
+        For each pair of hint and question attribute, the members eligible to serve as hint are
+        kept in an index. Entries of the index are dropped, whenever a member is registered or
+        kicked from one of the two corresponding attribute managers and are rebuilt lazily on the
+        next access, that needs the hint members. Checks, whether there is any hint member at all,
+        e.g. in :meth:`questionable`, don't build missing entries, but stop at the first eligible
+        member instead. Make sure to always use :meth:`register_member`, :meth:`kick_member` and
+        :meth:`update_member` to change the orchestras members.
+
+    Note:
+        The orchestra owns exactly one copy of each member, which is shared with all the attribute
+        managers. This keeps memory usage and pickle size low. As the members may be read and
+        updated from different threads, the instances in :attr:`members` must be treated as read
+        only. To change a member, edit a copy as returned by :meth:`components.Member.copy` and
+        pass it to :meth:`update_member`, which applies the changes while holding a lock.
+
+        The lock only serializes the updates. Readers don't take it, as e.g. running games read
+        the members all the time. Each attribute of the stored instance is replaced as a whole,
+        but the attributes are not replaced all at once. Hence, a reader running concurrently to
+        an update may see some attributes of the member already updated and others not yet. The
+        same holds for copies made during an update.
+
     Attributes:
         attribute_managers (Dict[:obj:`str`, :class:`components.AttributeManager`]): A dictionary
             of attribute managers keeping track of the members
+        copy_members (:obj:`bool`): Whether each attribute manager keeps its own copy of the
+            members.
+        use_attribute_matrix (:obj:`bool`): Whether the index of hint members is built from
+            :attr:`attribute_matrix`.
+
+    Args:
+        copy_members: Optional. Pass :obj:`True` to have each attribute manager keep its own
+            copy of the members instead of sharing the orchestras copy. Defaults to :obj:`False`.
+        use_attribute_matrix: Optional. Pass :obj:`True` to build the index of hint members from
+            :attr:`attribute_matrix` instead of comparing the members pairwise. Defaults to
+            :obj:`False`.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, copy_members: bool = False, use_attribute_matrix: bool = False) -> None:
+        self.copy_members = copy_members
+        self.use_attribute_matrix = use_attribute_matrix
+        self._attribute_matrix: Optional[Tuple[int, AttributeMatrix]] = None
         self._members: Dict[int, Member] = dict()
         self._members_lock = Lock()
+        self._update_lock = Lock()
+        self._hint_index: Dict[Tuple[str, str, bool], _HintIndexEntry] = {}
+        self._hint_index_date: Optional[dtm.date] = None
+        self._refresh_lock = Lock()
+        self._changing_generations: Dict[str, int] = {}
+        self._hint_index_version = 0
+        self._hint_index_lock = Lock()
+        self._questionable_cache: Dict[
+            Tuple[bool, FrozenSet[int]], List[Tuple[AttributeManager, AttributeManager]]
+        ] = {}
+        self._questionable_cache_version = self._hint_index_version
+        self._questionable_hits = 0
+        self._questionable_misses = 0
         self.attribute_managers: Dict[str, AttributeManager] = {
             'address': AttributeManager(
                 'address', list(self.ATTRIBUTE_MANAGERS.difference(['address']))
             ),
             'age': ChangingAttributeManager(
-                'age', list(self.ATTRIBUTE_MANAGERS.difference(['age', 'birthday']))
+                'age',
+                list(self.ATTRIBUTE_MANAGERS.difference(['age', 'birthday'])),
+                anniversary_attribute='date_of_birth',
             ),
             'birthday': AttributeManager(
                 'birthday', list(self.ATTRIBUTE_MANAGERS.difference(['birthday', 'age']))
@@ -116,12 +173,19 @@ class Orchestra(PicklableBase):
         Raises:
             ValueError: If member is already registered.
         """
-        if member.user_id in self.members:
-            raise ValueError('This member is already registered.')
-
-        self.members[member.user_id] = deepcopy(member)
-        for a_m in self.attribute_managers.values():
-            a_m.register_member(member)
+        with self._update_lock:
+            if member.user_id in self.members:
+                raise ValueError('This member is already registered.')
+
+            new_member = deepcopy(member)
+            self.members[member.user_id] = new_member
+            for a_m in self.attribute_managers.values():
+                a_m.register_member(new_member, copy=self.copy_members)
+            self._invalidate_hint_index(
+                a_m
+                for a_m in self.attribute_managers.values()
+                if a_m.get_members_attribute(member)
+            )
 
     def kick_member(self, member: Member) -> None:
         """
@@ -133,23 +197,305 @@ class Orchestra(PicklableBase):
         Raises:
             ValueError: If member is not registered.
         """
-        if member.user_id not in self.members:
-            raise ValueError('This member is not registered.')
+        with self._update_lock:
+            if member.user_id not in self.members:
+                raise ValueError('This member is not registered.')
 
-        self.members.pop(member.user_id)
-        for a_m in self.attribute_managers.values():
-            a_m.kick_member(member)
+            self.members.pop(member.user_id)
+            affected_managers = [
+                a_m for a_m in self.attribute_managers.values() if a_m.registered_values(member)
+            ]
+            for a_m in self.attribute_managers.values():
+                a_m.kick_member(member)
+            self._invalidate_hint_index(affected_managers)
 
     def update_member(self, member: Member) -> None:
         """
-        Updates the information of a member. As :meth:`register_user`, this will copy the
-        member. To update the information again, call this method again.
+        Updates the information of a member. Only the attribute managers, for which the values of
+        the member changed, are updated.
+
+        Note:
+            If :attr:`member` is not the instance stored in :attr:`members`, its information is
+            copied to the stored instance. As for :meth:`register_member`, changes to
+            :attr:`member` won't directly affect the orchestra. To update the information again,
+            call this method again.
 
         Args:
             member: The member with new information.
+
+        Raises:
+            ValueError: If member is not registered.
+        """
+        with self._update_lock:
+            self._update_member(member)
+
+    def _update_member(self, member: Member) -> None:
+        if member.user_id not in self.members:
+            raise ValueError('This member is not registered.')
+
+        stored_member = self.members[member.user_id]
+        if member is not stored_member:
+            # The stored instance is shared with the attribute managers, so we keep its identity.
+            # The score is updated by running games independently, so we keep that, too.
+            # The attributes are replaced one by one, see the class docstring.
+            state = deepcopy(member).__dict__
+            state['user_score'] = stored_member.user_score
+            stored_member.__dict__.update(state)
+
+        changed_managers = [
+            a_m for a_m in self.attribute_managers.values() if a_m.has_changed(stored_member)
+        ]
+        # Copies held by the attribute managers need to be replaced in any case
+        for a_m in self.attribute_managers.values() if self.copy_members else changed_managers:
+            a_m.update_member(stored_member, copy=self.copy_members)
+        self._invalidate_hint_index(changed_managers)
+
+    def update_member_attribute(self, user_id: int, attribute: str, value: Any) -> None:
+        """
+        Sets a single attribute of a registered member and updates the attribute managers
+        accordingly. Atomic version of
+
+        .. code:: python
+
+            member = orchestra.members[user_id].copy()
+            member[attribute] = value
+            orchestra.update_member(member)
+
+        Args:
+            user_id: The user ID of the member.
+            attribute: The attribute to set. Must be one of
+                :attr:`components.Member.SUBSCRIPTABLE`.
+            value: The new value.
+
+        Raises:
+            ValueError: If there is no member with the given user ID.
+        """
+        with self._update_lock:
+            if user_id not in self.members:
+                raise ValueError('This member is not registered.')
+
+            member = self.members[user_id].copy()
+            member[attribute] = value
+            self._update_member(member)
+
+    @property
+    def generation(self) -> int:
+        """
+        A counter that is increased, whenever the values of the members in the attribute managers
+        change. This includes registering, kicking and updating members as well as changes of
+        :class:`components.ChangingAttributeManager` instances over night.
+        """
+        with self._hint_index_lock:
+            return self._hint_index_version
+
+    def _invalidate_hint_index(self, attribute_managers: Iterable[AttributeManager]) -> None:
+        descriptions = {a_m.description for a_m in attribute_managers}
+        if not descriptions:
+            return
+        with self._hint_index_lock:
+            self._hint_index_version += 1
+            for key in [
+                k for k in self._hint_index if k[0] in descriptions or k[1] in descriptions
+            ]:
+                self._hint_index.pop(key)
+
+    def refresh_changing_attributes(self) -> None:
+        """
+        Updates the values of all :class:`components.ChangingAttributeManager` instances to the
+        current date and drops the affected entries of the hint index. Does nothing, if this was
+        already done today. This is meant to be called by a daily job shortly after midnight.
+        Looking up questions does *not* trigger the update.
+        """
+        today = dtm.date.today()
+        with self._refresh_lock:
+            if self._hint_index_date == today:
+                return
+
+            changed = []
+            for a_m in self.attribute_managers.values():
+                if isinstance(a_m, ChangingAttributeManager):
+                    a_m.refresh()
+                    if a_m.generation != self._changing_generations.get(a_m.description):
+                        self._changing_generations[a_m.description] = a_m.generation
+                        changed.append(a_m)
+            self._invalidate_hint_index(changed)
+            self._hint_index_date = today
+
+    @property
+    def attribute_matrix(self) -> AttributeMatrix:
+        """
+        A columnar snapshot of all the attribute managers. The snapshot is cached and only rebuilt,
+        if the orchestra changed.
+        """
+        with self._hint_index_lock:
+            cached = self._attribute_matrix
+            version = self._hint_index_version
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        matrix = AttributeMatrix(self.attribute_managers.values())
+        with self._hint_index_lock:
+            if version == self._hint_index_version:
+                self._attribute_matrix = (version, matrix)
+        return matrix
+
+    def _hint_index_entry(
+        self,
+        hint_manager: AttributeManager,
+        question_manager: AttributeManager,
+        multiple_choice: bool,
+    ) -> _HintIndexEntry:
+        key = (hint_manager.description, question_manager.description, multiple_choice)
+        with self._hint_index_lock:
+            entry = self._hint_index.get(key)
+            version = self._hint_index_version
+        if entry is None:
+            if self.use_attribute_matrix:
+                question_space = self.attribute_matrix.question_space(
+                    hint_manager, question_manager, multiple_choice=multiple_choice
+                )
+            else:
+                question_space = hint_manager.question_space(
+                    question_manager, multiple_choice=multiple_choice
+                )
+            entry = (frozenset(question_space), list(question_space), question_space)
+            with self._hint_index_lock:
+                # Don't store the result, if the orchestra changed in the meantime
+                if version == self._hint_index_version:
+                    self._hint_index[key] = entry
+        return entry
+
+    def hint_members(
+        self,
+        hint_manager: AttributeManager,
+        question_manager: AttributeManager,
+        multiple_choice: bool = True,
+    ) -> FrozenSet[Member]:
+        """
+        Gives the members, that are currently eligible to serve as hint for questions with the
+        given hint and question attribute. Results are looked up from an index and only computed,
+        if the corresponding attribute managers changed.
+
+        Args:
+            hint_manager: The manager describing the attribute serving as hint.
+            question_manager: The manager describing the attribute serving as question.
+            multiple_choice: Optional. Whether the questions will be multiple choice or free text.
+                Defaults to :obj:`True`.
+        """
+        return self._hint_index_entry(hint_manager, question_manager, multiple_choice)[0]
+
+    def question_space(
+        self, multiple_choice: bool = True
+    ) -> Dict[Tuple[str, str], Dict[Member, int]]:
+        """
+        Enumerates the questions that can currently be asked for all pairs of hint and question
+        attribute. The results are looked up from the index described in :meth:`hint_members`,
+        where they are stored along with the hint members. See
+        :meth:`components.AttributeManager.question_space` for details.
+
+        Note:
+            As in :meth:`questionable`, questions for :attr:`components.Question.PHOTO` are always
+            considered multiple choice.
+
+        Args:
+            multiple_choice: Optional. Whether the questions will be multiple choice or free text.
+                Defaults to :obj:`True`.
+
+        Returns:
+            Dict[Tuple[:obj:`str`, :obj:`str`], Dict[:class:`components.Member`, :obj:`int`]]: For
+            each pair of descriptions of hint and question attribute, the members that can
+            currently serve as hint and the sizes of their distractor pools. Pairs without hint
+            members are omitted.
+        """
+        out = {}
+        for hint_manager in self.attribute_managers.values():
+            for question_manager in self.attribute_managers.values():
+                *_, question_space = self._hint_index_entry(
+                    hint_manager,
+                    question_manager,
+                    True if question_manager.description == 'photo_file_id' else multiple_choice,
+                )
+                if question_space:
+                    out[(hint_manager.description, question_manager.description)] = dict(
+                        question_space
+                    )
+        return out
+
+    def is_hintable_with(
+        self,
+        hint_manager: AttributeManager,
+        question_manager: AttributeManager,
+        multiple_choice: bool = True,
+        exclude_members: Iterable[Member] = None,
+    ) -> bool:
+        """
+        Checks, if there currently is a member eligible to serve as hint for questions with the
+        given hint and question attribute. If the index described in :meth:`hint_members` has an
+        entry for the pair, this compares the number of eligible members with the number of
+        excluded members among them, i.e. the costs only depend on the number of excluded members.
+        Otherwise, :meth:`components.AttributeManager.is_hintable_with` is used, which stops at
+        the first eligible member. The entry is not built in this case.
+
+        Args:
+            hint_manager: The manager describing the attribute serving as hint.
+            question_manager: The manager describing the attribute serving as question.
+            multiple_choice: Optional. Whether the questions will be multiple choice or free text.
+                Defaults to :obj:`True`.
+            exclude_members: Optional. Members to exclude from serving as hint.
+        """
+        key = (hint_manager.description, question_manager.description, multiple_choice)
+        with self._hint_index_lock:
+            entry = self._hint_index.get(key)
+        if entry is None:
+            # Building the entry checks all candidates, so we only look for the first one
+            return hint_manager.is_hintable_with(
+                question_manager, multiple_choice=multiple_choice, exclude_members=exclude_members
+            )
+
+        hint_members, candidates, _ = entry
+        if not exclude_members:
+            return len(candidates) > 0
+        return len(candidates) > len(hint_members.intersection(exclude_members))
+
+    def draw_hint_member(
+        self,
+        hint_manager: AttributeManager,
+        question_manager: AttributeManager,
+        multiple_choice: bool = True,
+        exclude_members: Iterable[Member] = None,
+    ) -> Member:
         """
-        self.kick_member(member)
-        self.register_member(member)
+        Draws a member to build a question for. In contrast to
+        :meth:`components.AttributeManager.draw_hint_member`, this looks up the eligible members
+        from the index described in :meth:`hint_members`.
+
+        Args:
+            hint_manager: The manager describing the attribute serving as hint.
+            question_manager: The manager describing the attribute serving as question.
+            multiple_choice: Optional. Whether the questions will be multiple choice or free text.
+                Defaults to :obj:`True`.
+            exclude_members: Optional. Members to exclude from serving as hint.
+
+        Raises:
+            RuntimeError: If there is no member eligible to serve as hint.
+        """
+        hint_members, candidates, _ = self._hint_index_entry(
+            hint_manager, question_manager, multiple_choice
+        )
+        excluded = hint_members.intersection(exclude_members or [])
+        if len(excluded) == len(hint_members):
+            raise RuntimeError(
+                f'{hint_manager.description} currently not hintable for '
+                f'{question_manager.description}'
+            )
+
+        if 2 * len(excluded) > len(hint_members):
+            return random.choice([m for m in candidates if m not in excluded])
+        # Excluded members are usually few, so drawing until we hit an allowed member is cheap
+        while True:
+            member = random.choice(candidates)
+            if member not in excluded:
+                return member
 
     def questionable(
         self,
@@ -161,24 +507,62 @@ class Orchestra(PicklableBase):
         a pair of hint attribute and question attribute, which have enough different values for the
         orchestras members to generate questions from it.
 
+        Note:
+            Results are cached per :attr:`multiple_choice` and :attr:`exclude_members` until
+            :attr:`generation` changes. See :meth:`questionable_cache_info`.
+
         Args:
             multiple_choice: Optional. Whether the questions will be multiple choice or free text.
                 Defaults to :obj:`True`.
             exclude_members: Optional. Members to exclude from serving as hint.
         """
-        out = []
-        for a_m in self.attribute_managers.values():
-            for b_m in self.attribute_managers.values():
-                if b_m.description == 'photo_file_id':
-                    if a_m.is_hintable_with(
-                        b_m, multiple_choice=True, exclude_members=exclude_members
-                    ):
-                        out.append((a_m, b_m))
-                elif a_m.is_hintable_with(
-                    b_m, multiple_choice=multiple_choice, exclude_members=exclude_members
-                ):
-                    out.append((a_m, b_m))
-        return out
+        exclude_members = frozenset(exclude_members or [])
+        key = (multiple_choice, frozenset(m.user_id for m in exclude_members))
+
+        with self._hint_index_lock:
+            version = self._hint_index_version
+            if self._questionable_cache_version != version:
+                self._questionable_cache.clear()
+                self._questionable_cache_version = version
+            cached = self._questionable_cache.get(key)
+            if cached is not None:
+                self._questionable_hits += 1
+                return list(cached)
+            self._questionable_misses += 1
+
+        out = [
+            (a_m, b_m)
+            for a_m in self.attribute_managers.values()
+            for b_m in self.attribute_managers.values()
+            if self.is_hintable_with(
+                a_m,
+                b_m,
+                multiple_choice=True if b_m.description == 'photo_file_id' else multiple_choice,
+                exclude_members=exclude_members,
+            )
+        ]
+
+        with self._hint_index_lock:
+            # Don't store the result, if the orchestra changed in the meantime
+            if version == self._hint_index_version:
+                self._questionable_cache[key] = out
+        return list(out)
+
+    def questionable_cache_info(self) -> Dict[str, int]:
+        """
+        Gives statistics about the cache of :meth:`questionable`.
+
+        Returns:
+            A dictionary with the keys ``'hits'`` and ``'misses'`` for the number of calls of
+            :meth:`questionable` answered from the cache or not, respectively, and ``'size'`` for
+            the current number of cached results.
+        """
+        with self._hint_index_lock:
+            return {
+                'hits': self._questionable_hits,
+                'misses': self._questionable_misses,
+                'size': len(self._questionable_cache),
+            }
 
     def _score(self, attr: str) -> List[Score]:
         if attr == 'overall':
@@ -344,16 +728,53 @@ class Orchestra(PicklableBase):
         """
         return self._score_text('overall', length=length, html=html)
 
-    def copy(self) -> 'Orchestra':
+    @classmethod
+    def from_members(
+        cls,
+        members: Iterable[Member],
+        copy_members: bool = False,
+        use_attribute_matrix: bool = False,
+    ) -> 'Orchestra':
         """
-        Returns a (deep) copy of this orchestra.
-        """
-        new_orchestra = self.__class__()
+        Builds a new orchestra from the given members. In contrast to calling
+        :meth:`register_member` for each member, every attribute manager is built in a single
+        pass. The members are copied by :meth:`components.Member.copy`.
+
+        Note:
+            There are no checks for double registration. If a user ID appears more than once,
+            the last member with that user ID is used.
 
-        for member in self.members.values():
-            new_orchestra.register_member(member.copy())
+        Args:
+            members: The members.
+            copy_members: Optional. See :class:`Orchestra`. Defaults to :obj:`False`.
+            use_attribute_matrix: Optional. See :class:`Orchestra`. Defaults to :obj:`False`.
+        """
+        orchestra = cls(copy_members=copy_members, use_attribute_matrix=use_attribute_matrix)
+        with orchestra._members_lock:  # pylint: disable=W0212
+            new_members = orchestra._members  # pylint: disable=W0212
+            for member in members:
+                new_members[member.user_id] = member.copy()
+        for a_m in orchestra.attribute_managers.values():
+            a_m.register_members(new_members.values(), copy=copy_members)
+        return orchestra
 
-        return new_orchestra
+    def copy(self) -> 'Orchestra':
+        """
+        Returns a (deep) copy of this orchestra with the same settings.
+        """
+        return self.from_members(
+            self.members.values(),
+            copy_members=self.copy_members,
+            use_attribute_matrix=self.use_attribute_matrix,
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super().__getstate__()
+        # The caches can be rebuilt at any time and would only bloat the pickle
+        state['_attribute_matrix'] = None
+        state['_questionable_cache'] = {}
+        state['_hint_index'] = {}
+        return state
 
     def __eq__(self, other: object) -> bool:
         return False
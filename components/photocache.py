@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""This module contains the PhotoCache class."""
+import hashlib
+import os
+from io import BytesIO
+from threading import Lock
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+from PIL import Image, ImageDraw
+from telegram import Bot, Message
+
+from components import PicklableBase, PHOTO_OPTIONS
+
+
+class PhotoCache(PicklableBase):
+    """
+    A local, content-addressed cache for the photos of the members. Each photo is downloaded only
+    once and stored as ``<directory>/photos/<sha256 of the content>.jpg``, such that identical
+    photos with different file IDs are stored only once. The digests are additionally indexed by
+    the Telegram ``file_unique_id``, such that a new file ID of a known photo costs a single
+    :meth:`telegram.Bot.get_file` request instead of a download.
+
+    Additionally, the cache builds collages of four photos arranged in a 2×2 grid, which are
+    labelled with :attr:`components.PHOTO_OPTIONS`. Collages are stored as
+    ``<directory>/collages/<key>.jpg``, where the key is derived from the contents of the four
+    photos. Once a collage was sent, its Telegram file ID is remembered and used instead of
+    uploading the collage again.
+
+    Note:
+        The file IDs are kept in memory only. Pickle the instance, e.g. by storing it in
+        ``bot_data``, to keep them across restarts.
+
+    Attributes:
+        directory (:obj:`str`): The directory of the cache.
+        size (:obj:`int`): The edge length of a single photo within a collage in pixels.
+
+    Args:
+        directory: The directory of the cache. Will be created, if it doesn't exist.
+        size: Optional. The edge length of a single photo within a collage in pixels. Defaults to
+            ``320``.
+    """
+
+    def __init__(self, directory: str, size: int = 320) -> None:
+        self.directory = directory
+        self.size = size
+        self._photo_digests: Dict[str, str] = dict()
+        self._unique_id_digests: Dict[str, str] = dict()
+        self._collage_file_ids: Dict[str, str] = dict()
+        self._cache_lock = Lock()
+        self._make_directories()
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        super().__setstate__(state)
+        self._make_directories()
+
+    def _make_directories(self) -> None:
+        os.makedirs(os.path.join(self.directory, 'photos'), exist_ok=True)
+        os.makedirs(os.path.join(self.directory, 'collages'), exist_ok=True)
+
+    def _path(self, kind: str, digest: str) -> str:
+        return os.path.join(self.directory, kind, f'{digest}.jpg')
+
+    def photo(self, bot: Bot, file_id: str, file_unique_id: str = None) -> str:
+        """
+        Gives the local path of the photo with the given file ID. Downloads the photo, if it's not
+        yet cached.
+
+        Args:
+            bot: The bot to download the photo with.
+            file_id: The Telegram file ID of the photo.
+            file_unique_id: Optional. The Telegram unique file ID of the photo. Pass this, if it's
+                known, to avoid a request for a new file ID of a cached photo.
+
+        Returns:
+            :obj:`str`: The path of the photo.
+        """
+        with self._cache_lock:
+            digest = self._photo_digests.get(file_id)
+            if digest is None and file_unique_id is not None:
+                digest = self._unique_id_digests.get(file_unique_id)
+        if digest is not None and os.path.isfile(self._path('photos', digest)):
+            with self._cache_lock:
+                self._photo_digests[file_id] = digest
+            return self._path('photos', digest)
+
+        file = bot.get_file(file_id)
+        with self._cache_lock:
+            digest = self._unique_id_digests.get(file.file_unique_id)
+        if digest is None or not os.path.isfile(self._path('photos', digest)):
+            content = bytes(file.download_as_bytearray())
+            digest = hashlib.sha256(content).hexdigest()
+            path = self._path('photos', digest)
+            if not os.path.isfile(path):
+                with open(path, 'wb') as out:
+                    out.write(content)
+
+        with self._cache_lock:
+            self._photo_digests[file_id] = digest
+            self._unique_id_digests[file.file_unique_id] = digest
+        return self._path('photos', digest)
+
+    def _collage_key(self, bot: Bot, file_ids: Sequence[str]) -> Tuple[str, List[str]]:
+        paths = [self.photo(bot, file_id) for file_id in file_ids]
+        digests = ''.join(os.path.splitext(os.path.basename(path))[0] for path in paths)
+        return hashlib.sha256(digests.encode()).hexdigest(), paths
+
+    def _render(self, paths: Sequence[str]) -> bytes:
+        collage = Image.new('RGB', (2 * self.size, 2 * self.size), 'white')
+        draw = ImageDraw.Draw(collage)
+        for index, (path, label) in enumerate(zip(paths, PHOTO_OPTIONS)):
+            x_pos, y_pos = (index % 2) * self.size, (index // 2) * self.size
+            with Image.open(path) as image:
+                photo = image.convert('RGB')
+                photo.thumbnail((self.size, self.size))
+                collage.paste(
+                    photo,
+                    (
+                        x_pos + (self.size - photo.width) // 2,
+                        y_pos + (self.size - photo.height) // 2,
+                    ),
+                )
+            left, top, right, bottom = draw.textbbox((x_pos + 6, y_pos + 6), label)
+            draw.rectangle((left - 4, top - 4, right + 4, bottom + 4), fill='black')
+            draw.text((x_pos + 6, y_pos + 6), label, fill='white')
+
+        out = BytesIO()
+        collage.save(out, format='JPEG', quality=85)
+        return out.getvalue()
+
+    def collage(self, bot: Bot, file_ids: Sequence[str]) -> str:
+        """
+        Gives the local path of the collage of the photos with the given file IDs. Downloads the
+        photos and builds the collage, if it's not yet cached.
+
+        Args:
+            bot: The bot to download the photos with.
+            file_ids: The Telegram file IDs of the four photos in the order of
+                :attr:`components.PHOTO_OPTIONS`.
+
+        Returns:
+            :obj:`str`: The path of the collage.
+        """
+        if len(file_ids) != len(PHOTO_OPTIONS):
+            raise ValueError(f'Collages need exactly {len(PHOTO_OPTIONS)} photos.')
+
+        key, paths = self._collage_key(bot, file_ids)
+        path = self._path('collages', key)
+        if not os.path.isfile(path):
+            content = self._render(paths)
+            with open(path, 'wb') as file:
+                file.write(content)
+        return path
+
+    def send_collage(
+        self, bot: Bot, chat_id: Union[int, str], file_ids: Sequence[str], **kwargs: object
+    ) -> Message:
+        """
+        Sends the collage of the photos with the given file IDs. If the collage was already sent
+        before, it is sent by its file ID. Otherwise, it's uploaded and the file ID is remembered.
+
+        Args:
+            bot: The bot to send the collage with.
+            chat_id: The chat to send the collage to.
+            file_ids: The Telegram file IDs of the four photos in the order of
+                :attr:`components.PHOTO_OPTIONS`.
+            **kwargs: Additional keyword arguments passed to :meth:`telegram.Bot.send_photo`.
+
+        Returns:
+            :class:`telegram.Message`: The sent message.
+        """
+        path = self.collage(bot, file_ids)
+        key = os.path.splitext(os.path.basename(path))[0]
+        with self._cache_lock:
+            collage_file_id = self._collage_file_ids.get(key)
+
+        if collage_file_id:
+            return bot.send_photo(chat_id=chat_id, photo=collage_file_id, **kwargs)
+
+        with open(path, 'rb') as file:
+            message = bot.send_photo(chat_id=chat_id, photo=file, **kwargs)
+        if message and message.photo:
+            with self._cache_lock:
+                self._collage_file_ids[key] = message.photo[-1].file_id
+        return message
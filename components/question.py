@@ -2,8 +2,9 @@
 # -*- coding: utf-8 -*-
 """This module contains the Question class."""
 import re
-from typing import TYPE_CHECKING, Union, List
+from typing import TYPE_CHECKING, Union, List, FrozenSet, Optional, Tuple
 
+from fuzzywuzzy import fuzz
 from telegram import Poll, Update
 
 from components import MessageType, UpdateType
@@ -12,11 +13,27 @@ from components.helpers import COORDINATES_PATTERN
 if TYPE_CHECKING:
     from components import Member  # noqa: F401
 
+_BIRTHDAY_SEPARATORS = re.compile(r'[.,; 0]')
+
+
+def _normalize(string: str) -> str:
+    return string.strip().lower()
+
+
+def _normalize_birthday(string: str) -> str:
+    # Leading zeros and separators are optional
+    return _BIRTHDAY_SEPARATORS.sub('', string)
+
 
 class Question:
     """
     Representation of a single question asked in an AkaNamen Bot components.
 
+    Note:
+        For free text questions, the correct answers are normalized once on creation, such that
+        :meth:`check_answer` only needs to normalize the given answer. Changes of the members
+        attributes made afterwards are not taken into account.
+
     Attributes:
         member (:class:`components.Member`): The member, who's attribute is the correct answer.
         attribute (:obj:`str`): The attribute that is asked for.
@@ -55,6 +72,36 @@ class Question:
         self.attribute: str = attribute
         self.multiple_choice: bool = multiple_choice
         self.poll = poll
+        self._answer_keys: FrozenSet[str] = frozenset()
+        self._answer_tokens: Optional[Tuple[str, ...]] = None
+        if not multiple_choice:
+            self._build_answer_keys()
+
+    def _build_answer_keys(self) -> None:
+        member = self.member
+        if self.attribute in [self.FIRST_NAME, self.LAST_NAME, self.NICKNAME]:
+            keys = [str(member[self.attribute])]
+        elif self.attribute == self.FULL_NAME:
+            keys = [str(member.full_name).replace('"', '')]
+        elif self.attribute == self.BIRTHDAY:
+            keys = [_normalize_birthday(str(member.birthday))]
+        elif self.attribute == self.AGE:
+            keys = [str(member.age)]
+        elif self.attribute == self.JOINED:
+            keys = [str(member.joined)]
+        elif self.attribute == self.FUNCTIONS:
+            keys = member.function_aliases
+        elif self.attribute == self.INSTRUMENT:
+            # The instruments are matched as a whole. Keys for the single instruments would let
+            # e.g. 'Sopransaxophon' match 'Altsaxophon' by the partial ratio
+            keys = [str(member.instruments_str)]
+        else:  # self.attribute == self.ADDRESS:
+            keys = [str(member.address)]
+
+        self._answer_keys = frozenset(_normalize(k) for k in keys)
+        if self.attribute == self.FULL_NAME:
+            # All words are required, only their order may differ
+            self._answer_tokens = tuple(sorted(next(iter(self._answer_keys)).split()))
 
     def check_update(self, update: Update) -> bool:
         """
@@ -111,28 +158,16 @@ class Question:
             return poll_answer.option_ids[0] == self.poll.correct_option_id  # type: ignore
 
         if update.message and update.message.text:
-            answer = update.message.text.strip().strip('\n')
+            answer = _normalize(update.message.text)
         else:
             answer = None
 
-        if self.attribute in [self.FIRST_NAME, self.LAST_NAME, self.NICKNAME, self.FULL_NAME]:
-            accuracy = getattr(self.member, f'compare_{self.attribute}_to')(answer)
-            return accuracy >= 0.90
         if self.attribute == self.BIRTHDAY:
-            bd_string = self.member.birthday.replace('0', '').replace('.', '')  # type: ignore
-            answer = answer.replace('.', '').replace(',', '').replace(';', '')
-            answer = answer.replace('0', '').replace(' ', '')
-            return answer == bd_string
-        if self.attribute == self.AGE:
-            return answer == str(self.member.age)
-        if self.attribute == self.JOINED:
-            return answer == str(self.member.joined)
-        if self.attribute == self.FUNCTIONS:
-            return self.member.compare_functions_to(answer) >= 0.85
-        if self.attribute == self.INSTRUMENT:
-            return self.member.compare_instruments_to(answer) >= 0.85
-        # self.attribute == self.ADDRESS:
-        if answer:
+            return _normalize_birthday(str(answer)) in self._answer_keys
+        if self.attribute in [self.AGE, self.JOINED]:
+            return answer in self._answer_keys
+
+        if self.attribute == self.ADDRESS and answer:
             match = re.search(COORDINATES_PATTERN, answer)
             if match:
                 return (
@@ -141,11 +176,42 @@ class Question:
                     )
                     <= 0.2
                 )
-            return self.member.compare_address_to(answer) >= 0.90
+
+        if answer is not None:
+            if answer in self._answer_keys:
+                return True
+            if (
+                self._answer_tokens is not None
+                and tuple(sorted(answer.split())) == self._answer_tokens
+            ):
+                return True
+            return self._fuzzy_accuracy(answer) >= self._FUZZY_THRESHOLDS[self.attribute]
 
         location = update.message.location
         return self.member.distance_of_address_to((location.latitude, location.longitude)) <= 0.2
 
+    def _fuzzy_accuracy(self, answer: str) -> float:
+        if self.attribute in [self.FIRST_NAME, self.LAST_NAME, self.NICKNAME, self.INSTRUMENT]:
+            return (
+                max(
+                    max(fuzz.ratio(key, answer), fuzz.partial_ratio(key, answer))
+                    for key in self._answer_keys
+                )
+                / 100
+            )
+        if self.attribute == self.FULL_NAME:
+            return (
+                max(
+                    fuzz.ratio(key, answer) + fuzz.token_set_ratio(key, answer)
+                    for key in self._answer_keys
+                )
+                / 200
+            )
+        if self.attribute == self.FUNCTIONS:
+            return max(fuzz.ratio(key, answer) for key in self._answer_keys) / 100
+        # self.attribute == self.ADDRESS:
+        return max(fuzz.token_sort_ratio(key, answer) for key in self._answer_keys) / 100
+
     FIRST_NAME: str = 'first_name'
     """:obj:`str`: First name of an AkaBlas member"""
     LAST_NAME: str = 'last_name'
@@ -182,3 +248,12 @@ class Question:
         FUNCTIONS,
     ]
     """List[:obj:`str`]: Attributes usable for questions"""
+    _FUZZY_THRESHOLDS = {
+        FIRST_NAME: 0.90,
+        LAST_NAME: 0.90,
+        NICKNAME: 0.90,
+        FULL_NAME: 0.90,
+        FUNCTIONS: 0.85,
+        INSTRUMENT: 0.85,
+        ADDRESS: 0.90,
+    }
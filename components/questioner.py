@@ -2,9 +2,39 @@
 # -*- coding: utf-8 -*-
 """This module contains the Question class."""
 import random
-from typing import List, Optional, Tuple
-from telegram import Update, Bot, Poll, InputMediaPhoto
-from components import Question, Orchestra, question_text, PHOTO_OPTIONS, Score, AttributeManager
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, cast
+from telegram import Update, Bot, Poll, InputMediaPhoto, Message
+from components import (
+    Question,
+    Orchestra,
+    question_text,
+    PHOTO_OPTIONS,
+    Score,
+    AttributeManager,
+    Member,
+    PhotoCache,
+    DailyQuiz,
+)
+
+_PREFETCH_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='QuestionPrefetch')
+
+
+@dataclass
+class _PreparedQuestion:  # pylint: disable=R0902
+    """Everything needed to send a question, but the actual sending."""
+
+    member: Member
+    hint_attribute: str
+    question_attribute: str
+    hint: Any
+    question: str
+    options: Optional[List[str]]
+    index: Optional[int]
+    multiple_choice: bool
+    photo_question: bool
+    generation: int
 
 
 class Questioner:
@@ -28,6 +58,12 @@ class Questioner:
         multiple_choice (:obj:`bool`): Whether the question to be asked are multiple choice or free
             text.
         score (:class:`components.Score`): The score for this game.
+        prefetch (:obj:`bool`): Whether the next question is prepared in the background while a
+            question is sent.
+        photo_cache (:class:`components.PhotoCache`): Optional. The cache to build collages for
+            photo questions with.
+        daily_quiz (:class:`components.DailyQuiz`): Optional. The daily quiz, whose questions are
+            asked.
 
     Args:
         user_id: The ID of the user this instance is associated with.
@@ -42,6 +78,16 @@ class Questioner:
         bot: The bot to use for asking questions.
         multiple_choice: Whether the question to be asked are multiple choice or free text.
             Defaults to :obj:`True`.
+        prefetch: Optional. Whether the next question is prepared in the background while a
+            question is sent, such that :meth:`ask_question` only has to send it. The prepared
+            question is discarded, if :attr:`orchestra` changed in the meantime. Defaults to
+            :obj:`False`.
+        photo_cache: Optional. A :class:`components.PhotoCache`. If passed, the four photos of a
+            question for :attr:`components.Question.PHOTO` are sent as a single labelled collage
+            instead of two media groups. The collage is built, when the question is prepared.
+        daily_quiz: Optional. A :class:`components.DailyQuiz`. If passed, its questions are asked
+            in order instead of randomly generated ones. In that case, :attr:`number_of_questions`
+            is the number of questions of the quiz and the passed value is ignored.
 
         Note:
             ``fe/male_first_names`` is valid for neither :attr:`hint_attributes` nor
@@ -57,16 +103,29 @@ class Questioner:
         number_of_questions: int,
         bot: Bot,
         multiple_choice: bool = True,
+        prefetch: bool = False,
+        photo_cache: PhotoCache = None,
+        daily_quiz: DailyQuiz = None,
     ) -> None:
 
         self.bot = bot
+        self.prefetch = prefetch
+        self.photo_cache = photo_cache
+        self.daily_quiz = daily_quiz
+        self._prefetched: Optional[Future] = None
         self.multiple_choice = multiple_choice
         self.orchestra = orchestra
         self.member = self.orchestra.members[user_id]
         self.score = Score(member=self.member)
         self.current_question: Optional[Question] = None
+        self._deck: Dict[Tuple[str, str], List[Member]] = dict()
+        self._deck_pairs: List[Tuple[AttributeManager, AttributeManager]] = []
+        self._deck_generation: Optional[int] = None
+        self._drawn: Set[Tuple[str, str, int]] = set()
         self._available_members_recurse = True
 
+        if daily_quiz:
+            number_of_questions = len(daily_quiz.questions)
         if number_of_questions <= 0:
             raise ValueError('Number of questions must be greater than zero. Joke Cookie.')
         self.number_of_questions = number_of_questions
@@ -178,81 +237,249 @@ class Questioner:
             if h in self.hint_attributes and q in self.question_attributes
         ]
 
-    def ask_question(self) -> None:
-        """
-        Asks the next question, if there is another.
+    def _is_multiple_choice(self, question_manager: AttributeManager) -> bool:
+        return question_manager.description == Question.PHOTO or self.multiple_choice
 
-        Raises:
-            RuntimeError: If there are no more questions to be asked.
-        """
-        if self.number_of_questions_asked == self.number_of_questions:
-            raise RuntimeError('No more questions to ask!')
+    def _build_pair_deck(
+        self, hint_manager: AttributeManager, question_manager: AttributeManager
+    ) -> List[Member]:
+        deck = [
+            member
+            for member in self.orchestra.hint_members(
+                hint_manager,
+                question_manager,
+                multiple_choice=self._is_multiple_choice(question_manager),
+            )
+            if member != self.member
+            and (hint_manager.description, question_manager.description, member.user_id)
+            not in self._drawn
+        ]
+        random.shuffle(deck)
+        return deck
+
+    def _draw_from_deck(self) -> Tuple[AttributeManager, AttributeManager, Member]:
+        # The deck consists of one shuffled list of hint members per pair of attributes. The lists
+        # are built lazily on the first draw from a pair and rebuilt, if the orchestra changed
+        if self._deck_generation != self.orchestra.generation:
+            self._deck_generation = self.orchestra.generation
+            self._deck_pairs = self.questionable()
+            self._deck = dict()
+
+        while True:
+            if not self._deck_pairs:
+                if not self._drawn:
+                    raise RuntimeError('There are no questions available.')
+                # Every combination was drawn, so we start over
+                self._drawn.clear()
+                self._deck_pairs = self.questionable()
+                self._deck = dict()
+                continue
+
+            index = random.randrange(len(self._deck_pairs))
+            hint_manager, question_manager = self._deck_pairs[index]
+            key = (hint_manager.description, question_manager.description)
+            if key not in self._deck:
+                self._deck[key] = self._build_pair_deck(hint_manager, question_manager)
+
+            deck = self._deck[key]
+            if deck:
+                member = deck.pop()
+                self._drawn.add((*key, member.user_id))
+                return hint_manager, question_manager, member
 
-        hint_manager, question_manager = random.choice(self.questionable())
+            # This pair is exhausted, so we remove it in O(1)
+            self._deck_pairs[index] = self._deck_pairs[-1]
+            self._deck_pairs.pop()
+
+    @staticmethod
+    def _truncate(options: Iterable[Any]) -> List[str]:
+        texts = list(str(o) for o in options)
+        # Truncate long options
+        for idx, opt in enumerate(texts):
+            if len(opt) > 100:
+                texts[idx] = opt[:96] + ' ...'
+        return texts
+
+    def _prepare_daily_question(self, number: int) -> _PreparedQuestion:
+        daily_question = cast(DailyQuiz, self.daily_quiz).questions[number]
+        photo_question = daily_question.question_attribute == Question.PHOTO
+        options = self._truncate(daily_question.options)
+        if photo_question and self.photo_cache:
+            self.photo_cache.collage(self.bot, options)
+
+        return _PreparedQuestion(
+            member=self.orchestra.members.get(daily_question.user_id)
+            or Member(daily_question.user_id),
+            hint_attribute=daily_question.hint_attribute,
+            question_attribute=daily_question.question_attribute,
+            hint=daily_question.hint,
+            question=daily_question.text,
+            options=options,
+            index=daily_question.correct_option_id,
+            multiple_choice=True,
+            photo_question=photo_question,
+            generation=self.orchestra.generation,
+        )
+
+    def _prepare_question(self, number: int) -> _PreparedQuestion:
+        # number is the zero based number of the question within the game
+        if self.daily_quiz:
+            return self._prepare_daily_question(number)
+
+        generation = self.orchestra.generation
+
+        hint_manager, question_manager, hint_member = self._draw_from_deck()
         hint_attribute = hint_manager.description
         question_attribute = question_manager.description
-
-        if question_manager.description == Question.PHOTO:
-            multiple_choice = True
-            photo_question = True
-        else:
-            multiple_choice = self.multiple_choice
-            photo_question = False
+        multiple_choice = self._is_multiple_choice(question_manager)
+        photo_question = question_manager.description == Question.PHOTO
 
         if multiple_choice:
             member, hint, opts, index = hint_manager.build_question_with(
-                question_manager, multiple_choice=True, exclude_members=[self.member]
+                question_manager, multiple_choice=True, hint_member=hint_member
             )
             question = question_text(
                 member, question_attribute, hint_attribute, multiple_choice=True
             )
-            options = list(str(o) for o in opts)
+            texts = self._truncate(opts)
+            options: Optional[List[str]] = texts
 
-            # Truncate long options
-            for idx, opt in enumerate(options):
-                if len(opt) > 100:
-                    options[idx] = opt[:96] + ' ...'
+            # Build the collage in advance, so that it only needs to be sent
+            if photo_question and self.photo_cache:
+                self.photo_cache.collage(self.bot, texts)
+        else:
+            member, hint, _ = hint_manager.build_question_with(
+                question_manager, multiple_choice=False, hint_member=hint_member
+            )
+            question = question_text(
+                member, question_attribute, hint_attribute, multiple_choice=False, hint_value=hint
+            )
+            options, index = None, None
+
+        return _PreparedQuestion(
+            member=member,
+            hint_attribute=hint_attribute,
+            question_attribute=question_attribute,
+            hint=hint,
+            question=question,
+            options=options,
+            index=index,
+            multiple_choice=multiple_choice,
+            photo_question=photo_question,
+            generation=generation,
+        )
+
+    def _send_question(self, prepared: _PreparedQuestion) -> Optional[Message]:
+        # Returns the message of the poll, if one was sent
+        chat_id = self.member.user_id
+
+        if prepared.multiple_choice:
+            options = cast(List[str], prepared.options)
 
             # Send photos if needed
-            if photo_question:
+            if prepared.photo_question and self.photo_cache:
+                self.photo_cache.send_collage(bot=self.bot, chat_id=chat_id, file_ids=options)
+            elif prepared.photo_question:
                 self.bot.send_media_group(
-                    chat_id=self.member.user_id,
+                    chat_id=chat_id,
                     media=[InputMediaPhoto(options[0]), InputMediaPhoto(options[1])],
                 )
                 self.bot.send_media_group(
-                    chat_id=self.member.user_id,
+                    chat_id=chat_id,
                     media=[InputMediaPhoto(options[2]), InputMediaPhoto(options[3])],
                 )
-            if hint_attribute == Question.PHOTO:
-                self.bot.send_photo(chat_id=self.member.user_id, photo=hint)
+            if prepared.hint_attribute == Question.PHOTO:
+                self.bot.send_photo(chat_id=chat_id, photo=prepared.hint)
 
             # Send the question
-            poll = self.bot.send_poll(
-                chat_id=self.member.user_id,
-                question=question,
-                options=(PHOTO_OPTIONS if photo_question else options),
+            return self.bot.send_poll(
+                chat_id=chat_id,
+                question=prepared.question,
+                options=(PHOTO_OPTIONS if prepared.photo_question else options),
                 is_anonymous=False,
                 type=Poll.QUIZ,
-                correct_option_id=index,
-            ).poll
-            self.current_question = Question(
-                member, question_attribute, poll=poll, multiple_choice=multiple_choice
+                correct_option_id=prepared.index,
+            )
+
+        if prepared.hint_attribute == Question.PHOTO:
+            self.bot.send_photo(
+                chat_id=chat_id,
+                photo=prepared.member.photo_file_id,
+                caption=prepared.question,
             )
         else:
-            member, hint, _ = hint_manager.build_question_with(
-                question_manager, multiple_choice=False, exclude_members=[self.member]
+            self.bot.send_message(chat_id=chat_id, text=prepared.question)
+        return None
+
+    def _take_prefetched(self) -> Optional[_PreparedQuestion]:
+        future, self._prefetched = self._prefetched, None
+        if future is None:
+            return None
+        try:
+            prepared = future.result()
+        except Exception:  # pylint: disable=W0703
+            # Let the synchronous preparation raise the error, if it persists
+            return None
+        if prepared.generation != self.orchestra.generation:
+            self._return_to_deck(prepared)
+            return None
+        return prepared
+
+    def _return_to_deck(self, prepared: _PreparedQuestion) -> None:
+        # The question is not asked, so its combination must be available for drawing again
+        self._drawn.discard(
+            (prepared.hint_attribute, prepared.question_attribute, prepared.member.user_id)
+        )
+        # The pair decks may already be rebuilt without the combination, so we rebuild them again
+        self._deck_generation = None
+
+    def ask_question(self) -> None:
+        """
+        Asks the next question, if there is another. The combinations of hint attribute, question
+        attribute and hint member are drawn from a shuffled deck without replacement, i.e. no
+        combination is repeated until all of them were asked. The deck is updated, whenever the
+        orchestra changes.
+
+        If :attr:`prefetch` is :obj:`True`, the question prepared in the background is used,
+        unless the orchestra changed in the meantime. Preparing the next question is started in
+        the background, before the current question is being sent. If sending the question
+        fails, neither question counts as drawn.
+
+        Raises:
+            RuntimeError: If there are no more questions to be asked.
+        """
+        if self.number_of_questions_asked == self.number_of_questions:
+            raise RuntimeError('No more questions to ask!')
+
+        prepared = self._take_prefetched() or self._prepare_question(
+            self.number_of_questions_asked
+        )
+
+        # Prepare the next question while the requests are made
+        if self.prefetch and self.number_of_questions_asked + 1 < self.number_of_questions:
+            self._prefetched = _PREFETCH_EXECUTOR.submit(
+                self._prepare_question, self.number_of_questions_asked + 1
             )
-            question = question_text(
-                member, question_attribute, hint_attribute, multiple_choice=False, hint_value=hint
+
+        try:
+            poll_message = self._send_question(prepared)
+        except Exception:
+            # Neither question is asked, so the next try starts over with a fresh one. We wait
+            # for the preparation in the background to finish, as it draws from the deck, too
+            prefetched = self._take_prefetched()
+            for unused in [prepared, prefetched]:
+                if unused:
+                    self._return_to_deck(unused)
+            raise
+
+        if prepared.multiple_choice:
+            self.current_question = Question(
+                prepared.member,
+                prepared.question_attribute,
+                poll=cast(Message, poll_message).poll,
             )
-            if hint_attribute == Question.PHOTO:
-                self.bot.send_photo(
-                    chat_id=self.member.user_id, photo=member.photo_file_id, caption=question
-                )
-            else:
-                self.bot.send_message(chat_id=self.member.user_id, text=question)
+        else:
             self.current_question = Question(
-                member, question_attribute, multiple_choice=multiple_choice
+                prepared.member, prepared.question_attribute, multiple_choice=False
             )
-
         self.number_of_questions_asked += 1
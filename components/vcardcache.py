@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""This module contains the VCardCache class."""
+from collections import OrderedDict
+from io import BytesIO
+from threading import Lock
+from typing import Callable, Hashable, TYPE_CHECKING
+
+from telegram import Bot
+
+if TYPE_CHECKING:
+    from components import PhotoCache
+
+
+class VCardCache:
+    """
+    A size bounded least recently used cache for serialized vCards as built by
+    :meth:`components.Member.vcard`. The keys are expected to contain everything the vCard
+    depends on, such that changed members simply miss the cache and outdated entries are evicted
+    eventually.
+
+    Photos for the vCards are fetched via :meth:`photo`. If a :attr:`photo_cache` is set, they are
+    kept on disk, i.e. a photo is downloaded only once, even if the vCard needs to be rebuilt.
+
+    Note:
+        The cache is kept in memory only and is not meant to be pickled.
+
+    Attributes:
+        photo_cache (:class:`components.PhotoCache`): Optional. The store for the photos.
+        max_size (:obj:`int`): The maximum number of cached vCards.
+        hits (:obj:`int`): Number of lookups answered by the cache.
+        misses (:obj:`int`): Number of lookups that had to build the vCard.
+
+    Args:
+        photo_cache: Optional. The store for the photos. If not passed, photos are downloaded
+            each time a vCard is built.
+        max_size: Optional. The maximum number of cached vCards. Defaults to ``256``.
+    """
+
+    def __init__(self, photo_cache: 'PhotoCache' = None, max_size: int = 256) -> None:
+        self.photo_cache = photo_cache
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, bytes]' = OrderedDict()
+        self._entries_lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def vcard(self, key: Hashable, build: Callable[[], bytes], store: bool = True) -> bytes:
+        """
+        Gives the serialized vCard for the given key. Builds it only, if it's not cached.
+
+        Args:
+            key: The key.
+            build: The callable building the serialized vCard.
+            store: Optional. Whether to cache the vCard, if it had to be built. Pass :obj:`False`
+                for bulk lookups, which would otherwise evict all other entries. Defaults to
+                :obj:`True`.
+
+        Returns:
+            :obj:`bytes`: The serialized vCard.
+
+        Raises:
+            Any exception raised by :attr:`build`.
+        """
+        with self._entries_lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return content
+            self.misses += 1
+
+        # The vCard is built without holding the lock, as this may include a download
+        content = build()
+        if not store:
+            return content
+
+        with self._entries_lock:
+            self._entries[key] = content
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return content
+
+    def photo(self, bot: Bot, file_id: str) -> bytes:
+        """
+        Gives the content of the photo with the given file ID.
+
+        Args:
+            bot: The bot to download the photo with. Must be the same bot that retrieved the file
+                ID.
+            file_id: The Telegram file ID of the photo.
+
+        Returns:
+            :obj:`bytes`: The content of the photo.
+        """
+        if self.photo_cache is None:
+            photo_stream = BytesIO()
+            bot.get_file(file_id).download(out=photo_stream)
+            return photo_stream.getvalue()
+
+        with open(self.photo_cache.photo(bot, file_id), 'rb') as file:
+            return file.read()
+
+    def clear(self) -> None:
+        """Removes all cached vCards and resets the statistics."""
+        with self._entries_lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
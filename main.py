@@ -35,6 +35,8 @@ def main() -> None:
     ad_password = config['akadressen']['password']
     yourls_url = config['yourls']['url']
     yourls_signature = config['yourls']['signature']
+    photo_cache_directory = config['akanamen-bot'].get('photo_cache_directory')
+    session_timeout = config['akanamen-bot'].getfloat('session_timeout')
 
     # Create the Updater and pass it your bot's token.
     # Make sure to set use_context=True to use the new context based callbacks
@@ -60,6 +62,8 @@ def main() -> None:
         ad_password=ad_password,
         yourls_url=yourls_url,
         yourls_signature=yourls_signature,
+        photo_cache_directory=photo_cache_directory,
+        session_timeout=session_timeout,
     )
 
     # Start the Bot
@@ -115,6 +115,36 @@ class TestAttributeManager:
         assert am.data == {'test1': {member, member3}, 'test2': {member2}}
         assert all(member3 is not m for m in am.data['test1'])
 
+    def test_register_member_without_copy(self, member):
+        member.last_name = 'test'
+        am = AttributeManager(self.description, [])
+
+        am.register_member(member, copy=False)
+        assert am.data == {'test': {member}}
+        assert all(member is m for m in am.data['test'])
+
+        am.update_member(member, copy=False)
+        assert all(member is m for m in am.data['test'])
+
+    @pytest.mark.parametrize('copy', [True, False])
+    def test_register_members(self, copy):
+        members = [Member(i, last_name=str(i % 3)) for i in range(6)] + [Member(6)]
+        am = AttributeManager(self.description, [])
+        generation = am.generation
+
+        am.register_members(members, copy=copy)
+        assert am.data == {
+            '0': {members[0], members[3]},
+            '1': {members[1], members[4]},
+            '2': {members[2], members[5]},
+        }
+        assert am.registered_values(members[6]) is None
+        assert am.generation > generation
+        assert all((m is members[m.user_id]) is not copy for m in am.available_members)
+
+        with pytest.raises(RuntimeError, match='only available for empty'):
+            am.register_members([Member(7, last_name='7')])
+
     def test_double_register(self, member):
         member.last_name = 'test'
         am = AttributeManager(self.description, [])
@@ -136,6 +166,34 @@ class TestAttributeManager:
         am.kick_member(member)
         assert am.data == {}
 
+    def test_kick_changed_member(self, member):
+        member.last_name = 'test'
+        am = AttributeManager(self.description, [])
+
+        am.register_member(member)
+        am.register_member(Member(1, last_name='other'))
+        assert am.registered_values(member) == ['test']
+
+        member.last_name = 'changed'
+        assert am.registered_values(member) == ['test']
+        am.kick_member(member)
+        assert am.data == {'other': {Member(1)}}
+        assert am.registered_values(member) is None
+
+    def test_has_changed(self, member):
+        am = AttributeManager(self.description, [])
+        assert not am.has_changed(member)
+
+        member.last_name = 'test'
+        assert am.has_changed(member)
+        am.register_member(member, copy=False)
+        assert not am.has_changed(member)
+
+        member.phone_number = '123'
+        assert not am.has_changed(member)
+        member.last_name = 'changed'
+        assert am.has_changed(member)
+
     def test_update_member(self, member):
         member.last_name = 'test1'
         am = AttributeManager(self.description, [])
@@ -209,6 +267,32 @@ class TestAttributeManager:
 
         assert am.available_members == frozenset(Member(i) for i in range(10))
 
+    def test_available_members_caching(self):
+        am = AttributeManager(self.description, [])
+        assert am.generation == 0
+
+        am.register_member(Member(user_id=0))
+        assert am.generation == 0
+        am.register_member(Member(user_id=1, last_name='1'))
+        assert am.generation == 1
+
+        available_members = am.available_members
+        assert am.available_members is available_members
+        assert available_members == frozenset([Member(1)])
+
+        am.register_member(Member(user_id=2, last_name='2'))
+        assert am.generation == 2
+        assert am.available_members == frozenset([Member(1), Member(2)])
+        available_members = am.available_members
+
+        am.kick_member(Member(0))
+        assert am.generation == 2
+        assert am.available_members is available_members
+
+        am.kick_member(Member(1))
+        assert am.generation == 3
+        assert am.available_members == frozenset([Member(2)])
+
     def test_is_hintable_with_member(self):
         am = AttributeManager(self.description, [])
         bm = AttributeManager('first_name', [])
@@ -288,6 +372,53 @@ class TestAttributeManager:
             bm, multiple_choice=multiple_choice, exclude_members=[Member(100)]
         )
 
+    @pytest.mark.parametrize('multiple_choice', [True, False])
+    def test_hint_members(self, dummy_am, multiple_choice):
+        am = AttributeManager('last_name', [])
+        assert am.hint_members(dummy_am, multiple_choice=multiple_choice) == frozenset()
+
+        am = AttributeManager('last_name', ['first_name'])
+        bm = AttributeManager('first_name', [])
+        for i in range(3, 10):
+            member = Member(i, first_name='a', last_name='b')
+            am.register_member(member)
+            bm.register_member(member)
+        for i in [42, 43, 44, 45]:
+            member = Member(i, first_name=str(i), last_name='b')
+            am.register_member(member)
+            bm.register_member(member)
+        assert am.hint_members(bm, multiple_choice=multiple_choice) == frozenset()
+
+        for i in [100, 101]:
+            member = Member(i, first_name=str(i), last_name=str(i))
+            am.register_member(member)
+            bm.register_member(member)
+        assert am.hint_members(bm, multiple_choice=multiple_choice) == {Member(100), Member(101)}
+
+    def test_question_space(self, dummy_am):
+        am = AttributeManager('last_name', ['first_name'])
+        bm = AttributeManager('first_name', [])
+        assert am.question_space(dummy_am) == {}
+        assert am.question_space(bm) == {}
+
+        for i in range(6):
+            member = Member(i, first_name=str(i), last_name=str(i))
+            am.register_member(member)
+            bm.register_member(member)
+        member = Member(6, first_name='0', last_name='6')
+        am.register_member(member)
+        bm.register_member(member)
+
+        question_space = am.question_space(bm)
+        assert frozenset(question_space) == am.hint_members(bm)
+        assert question_space == {
+            m: len(bm.distinct_values_for_member(am, m)) for m in am.hint_members(bm)
+        }
+        assert set(question_space.values()) == {5}
+
+        question_space = am.question_space(bm, multiple_choice=False)
+        assert question_space == {m: 0 for m in am.hint_members(bm, multiple_choice=False)}
+
     def test_draw_hint_member_errors(self, dummy_am):
         am = AttributeManager(self.description, [])
         with pytest.raises(ValueError, match=f'is not a valid question for {self.description}'):
@@ -596,6 +727,20 @@ class TestNameManager:
         assert am.male_data == {'test1': {member, member3}, 'test2': {member2}}
         assert all(member3 is not m for m in am.male_data['test1'])
 
+    def test_has_changed(self, member):
+        member.first_name = 'test'
+        am = NameManager(self.description, [])
+        am.register_member(member, copy=False)
+        assert not am.has_changed(member)
+
+        member.gender = Gender.MALE
+        assert am.has_changed(member)
+        am.update_member(member, copy=False)
+        assert not am.has_changed(member)
+
+        member.gender = Gender.FEMALE
+        assert am.has_changed(member)
+
     def test_double_register(self, member):
         member.first_name = 'test'
         member.gender = Gender.MALE
@@ -621,6 +766,19 @@ class TestNameManager:
         am.kick_member(member)
         assert data == {}
 
+    def test_kick_changed_member(self, member):
+        member.first_name = 'test'
+        member.gender = Gender.MALE
+        am = NameManager(self.description, [])
+
+        am.register_member(member)
+        member.first_name = 'changed'
+        member.gender = Gender.FEMALE
+        am.kick_member(member)
+        assert am.data == {}
+        assert am.male_data == {}
+        assert am.female_data == {}
+
     def test_distinct_values_for_member_no_attr(self, member):
         am = NameManager(self.description, [])
         bm = AttributeManager('last_name', [])
@@ -950,6 +1108,91 @@ class TestChangingAttributeManager:
             def today(cls, *args, **kwargs):
                 return mock_date_2
 
+        generation = am.generation
         monkeypatch.setattr(dtm, 'date', Date2)
 
+        # The values are only updated by refresh
+        assert am.data == {23: {member}}
+        am.refresh()
         assert am.data == {24: {member}}
+        assert am.generation > generation
+        assert am.available_members == frozenset([member])
+
+    def test_refresh_incremental(self, monkeypatch):
+        class Date:
+            mock_date = dtm.date(2021, 2, 27)
+
+            @classmethod
+            def today(cls, *args, **kwargs):
+                return cls.mock_date
+
+        monkeypatch.setattr(dtm, 'date', Date)
+
+        calls = []
+
+        def gma(member):
+            calls.append(member.user_id)
+            return member.age
+
+        am = ChangingAttributeManager(
+            'age', [], get_members_attribute=gma, anniversary_attribute='date_of_birth'
+        )
+        birthdays = [
+            dtm.datetime(2000, 2, 28).date(),
+            dtm.datetime(2000, 2, 29).date(),
+            dtm.datetime(2000, 3, 1).date(),
+            dtm.datetime(2000, 3, 2).date(),
+            dtm.datetime(2000, 6, 1).date(),
+        ]
+        members = [Member(i, date_of_birth=birthday) for i, birthday in enumerate(birthdays)]
+        for member in members:
+            am.register_member(member, copy=False)
+        am.register_member(Member(10), copy=False)
+        assert am.data == {20: set(members)}
+
+        calls.clear()
+        generation = am.generation
+        am.refresh()
+        assert calls == []
+        assert am.generation == generation
+
+        Date.mock_date = dtm.datetime(2021, 3, 1).date()
+        am.refresh()
+        assert am.data == {21: set(members[:3]), 20: set(members[3:])}
+        assert sorted(calls) == [0, 1, 2]
+        assert am.generation == generation + 1
+
+        Date.mock_date = dtm.datetime(2023, 3, 1).date()
+        calls.clear()
+        am.refresh()
+        assert am.data == {23: set(members[:3]), 22: set(members[3:])}
+        assert sorted(calls) == [0, 1, 2, 3, 4]
+
+        am.kick_member(members[1])
+        Date.mock_date = dtm.datetime(2023, 3, 2).date()
+        calls.clear()
+        am.refresh()
+        assert am.data == {23: {members[0], members[2], members[3]}, 22: {members[4]}}
+        assert calls == [3]
+
+    def test_has_changed(self, member, monkeypatch):
+        class Date:
+            @classmethod
+            def today(cls, *args, **kwargs):
+                return dtm.datetime(2020, 9, 5).date()
+
+        monkeypatch.setattr(dtm, 'date', Date)
+
+        am = ChangingAttributeManager('age', [], anniversary_attribute='date_of_birth')
+        member.date_of_birth = dtm.datetime(1990, 1, 1).date()
+        am.register_member(member, copy=False)
+        assert not am.has_changed(member)
+
+        # Same age, but a different birthday
+        member.date_of_birth = dtm.datetime(1990, 2, 1).date()
+        assert am.has_changed(member)
+        am.update_member(member, copy=False)
+        assert not am.has_changed(member)
+
+        member.date_of_birth = dtm.datetime(1991, 2, 1).date()
+        assert am.has_changed(member)
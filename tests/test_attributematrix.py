@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+import pickle
+
+import pytest
+
+from components import AttributeMatrix, Gender, Member, Orchestra
+
+
+@pytest.fixture(scope='function')
+def matrix(populated_orchestra):
+    return AttributeMatrix(populated_orchestra.attribute_managers.values())
+
+
+def pairs(orchestra):
+    for hint_manager in orchestra.attribute_managers.values():
+        for question_manager in orchestra.attribute_managers.values():
+            yield hint_manager, question_manager
+
+
+class TestAttributeMatrix:
+    @pytest.mark.parametrize('populated_orchestra', [{'members': 40}], indirect=True)
+    def test_distinct_values_for_member(self, populated_orchestra, matrix):
+        members = list(populated_orchestra.members.values()) + [
+            Member(0, first_name='Unknown', gender=Gender.MALE),
+            Member(-1, first_name='Genderless', nickname='Nick'),
+        ]
+        for hint_manager, question_manager in pairs(populated_orchestra):
+            for member in members:
+                assert matrix.distinct_values_for_member(
+                    question_manager, hint_manager, member
+                ) == question_manager.distinct_values_for_member(hint_manager, member)
+
+    @pytest.mark.parametrize('populated_orchestra', [{'members': 40}], indirect=True)
+    @pytest.mark.parametrize('multiple_choice', [True, False])
+    def test_is_hintable_with_member(self, populated_orchestra, matrix, multiple_choice):
+        for hint_manager, question_manager in pairs(populated_orchestra):
+            for member in populated_orchestra.members.values():
+                assert matrix.unique_attributes_of(
+                    hint_manager, member
+                ) == hint_manager.unique_attributes_of(member)
+                assert matrix.is_hintable_with_member(
+                    hint_manager, question_manager, member, multiple_choice=multiple_choice
+                ) == hint_manager.is_hintable_with_member(
+                    question_manager, member, multiple_choice=multiple_choice
+                )
+
+    @pytest.mark.parametrize('populated_orchestra', [{'members': 40}], indirect=True)
+    @pytest.mark.parametrize('multiple_choice', [True, False])
+    def test_hint_members(self, populated_orchestra, matrix, multiple_choice):
+        for hint_manager, question_manager in pairs(populated_orchestra):
+            # Small chunks to make sure that chunking doesn't change the result
+            assert matrix.hint_members(
+                hint_manager, question_manager, multiple_choice=multiple_choice, chunk_size=7
+            ) == hint_manager.hint_members(question_manager, multiple_choice=multiple_choice)
+
+        a_m = populated_orchestra.attribute_managers
+        assert matrix.hint_members(a_m['first_name'], a_m['full_name']) == frozenset()
+
+    @pytest.mark.parametrize('populated_orchestra', [{'members': 40}], indirect=True)
+    @pytest.mark.parametrize('multiple_choice', [True, False])
+    def test_question_space(self, populated_orchestra, matrix, multiple_choice):
+        for hint_manager, question_manager in pairs(populated_orchestra):
+            assert matrix.question_space(
+                hint_manager, question_manager, multiple_choice=multiple_choice, chunk_size=7
+            ) == hint_manager.question_space(question_manager, multiple_choice=multiple_choice)
+
+    @pytest.mark.parametrize('populated_orchestra', [{'members': 40}], indirect=True)
+    def test_draw_question_attributes(self, populated_orchestra, matrix):
+        a_m = populated_orchestra.attribute_managers
+        hint_manager, question_manager = a_m['first_name'], a_m['last_name']
+        for member in hint_manager.hint_members(question_manager):
+            attributes, index = matrix.draw_question_attributes(
+                question_manager, hint_manager, member
+            )
+            assert len(set(attributes)) == 4
+            assert attributes[index] == member.last_name
+            distinct_values = question_manager.distinct_values_for_member(hint_manager, member)
+            assert set(attributes).difference({member.last_name}) <= distinct_values
+
+        with pytest.raises(RuntimeError, match='no attribute'):
+            matrix.draw_question_attributes(question_manager, hint_manager, Member(0))
+
+        orchestra = Orchestra()
+        for i in range(3):
+            orchestra.register_member(Member(i, first_name=f'first_{i}', last_name=f'last_{i}'))
+        a_m = orchestra.attribute_managers
+        with pytest.raises(RuntimeError, match='not hintable'):
+            AttributeMatrix(a_m.values()).draw_question_attributes(
+                a_m['last_name'], a_m['first_name'], orchestra.members[0]
+            )
+
+    def test_orchestra_attribute_matrix(self):
+        orchestra = Orchestra(use_attribute_matrix=True)
+        for i in range(5):
+            orchestra.register_member(
+                Member(i, first_name=f'first_{i}', last_name=f'last_{i}', gender=Gender.FEMALE)
+            )
+
+        matrix = orchestra.attribute_matrix
+        assert orchestra.attribute_matrix is matrix
+        a_m = orchestra.attribute_managers
+        assert (
+            orchestra.hint_members(a_m['first_name'], a_m['last_name'])
+            == a_m['first_name'].hint_members(a_m['last_name'])
+            == frozenset(orchestra.members.values())
+        )
+
+        orchestra.kick_member(Member(4))
+        assert orchestra.attribute_matrix is not matrix
+        assert orchestra.hint_members(a_m['first_name'], a_m['last_name']) == frozenset(
+            orchestra.members.values()
+        )
+
+        unpickled = pickle.loads(pickle.dumps(orchestra))
+        assert unpickled._attribute_matrix is None
+        assert unpickled.hint_members(
+            unpickled.attribute_managers['first_name'], unpickled.attribute_managers['last_name']
+        ) == frozenset(unpickled.members.values())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+import datetime as dtm
+import pickle
+
+import pytest
+
+from components import DailyQuiz, DailyQuestion, Member, Orchestra
+
+
+@pytest.fixture(scope='function')
+def orchestra():
+    orchestra = Orchestra()
+    for i in range(6):
+        orchestra.register_member(Member(i, first_name=f'first_{i}', last_name=f'last_{i}'))
+    return orchestra
+
+
+@pytest.fixture(scope='function')
+def daily_quiz(orchestra):
+    return DailyQuiz.generate(orchestra, number_of_questions=5, date=dtm.date(2021, 1, 1))
+
+
+class TestDailyQuiz:
+    def test_generate(self, orchestra, daily_quiz):
+        assert daily_quiz.date == dtm.date(2021, 1, 1)
+        assert len(daily_quiz.questions) == 5
+        for question in daily_quiz.questions:
+            assert isinstance(question, DailyQuestion)
+            assert {question.hint_attribute, question.question_attribute} == {
+                'first_name',
+                'last_name',
+            }
+            assert len(question.options) == 4
+            member = orchestra.members[question.user_id]
+            assert question.hint == member[question.hint_attribute]
+            assert question.options[question.correct_option_id] == str(
+                member[question.question_attribute]
+            )
+            assert question.text
+
+    def test_generate_default_date(self, orchestra):
+        assert DailyQuiz.generate(orchestra, 1).date == dtm.date.today()
+
+    def test_generate_error(self):
+        with pytest.raises(RuntimeError, match='no questionable attributes'):
+            DailyQuiz.generate(Orchestra())
+
+    def test_results(self, daily_quiz):
+        assert not daily_quiz.has_played(1)
+        assert daily_quiz.add_result(1, 3)
+        assert daily_quiz.has_played(1)
+        assert not daily_quiz.add_result(1, 5)
+        assert daily_quiz.leaderboard() == [(1, 3)]
+
+    def test_start(self, daily_quiz):
+        assert daily_quiz.start(1)
+        assert daily_quiz.has_played(1)
+        assert not daily_quiz.start(1)
+        # Players who didn't finish are ranked with no correct answers
+        assert daily_quiz.start(2)
+        assert daily_quiz.leaderboard() == [(1, 0), (2, 0)]
+
+        assert daily_quiz.add_result(2, 3)
+        assert not daily_quiz.add_result(2, 5)
+        assert daily_quiz.add_result(1, 3)
+        assert not daily_quiz.start(1)
+        # Ties are ranked by the order of finishing
+        assert daily_quiz.leaderboard() == [(2, 3), (1, 3)]
+
+    def test_leaderboard(self, daily_quiz):
+        for user_id, correct in [(1, 2), (2, 4), (3, 2), (4, 5)]:
+            daily_quiz.add_result(user_id, correct)
+
+        assert daily_quiz.leaderboard() == [(4, 5), (2, 4), (1, 2), (3, 2)]
+        assert daily_quiz.rank_of(4) == 1
+        assert daily_quiz.rank_of(3) == 4
+        with pytest.raises(ValueError, match='not taken the quiz'):
+            daily_quiz.rank_of(5)
+
+    def test_pickle(self, daily_quiz):
+        daily_quiz.add_result(1, 3)
+        unpickled = pickle.loads(pickle.dumps(daily_quiz))
+        assert unpickled.date == daily_quiz.date
+        assert unpickled.questions == daily_quiz.questions
+        assert unpickled.leaderboard() == [(1, 3)]
+        assert unpickled.add_result(2, 1)
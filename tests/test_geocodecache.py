@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+import pickle
+import time
+
+import pytest
+from geopy.exc import GeopyError
+
+from components import GeocodeCache
+from tests.addresses import get_address_from_cache
+
+ADDRESS = 'Universitätsplatz 2, 38106 Braunschweig'
+
+
+class Geocoder:
+    def __init__(self):
+        self.requests = []
+
+    def geocode(self, address):
+        self.requests.append(address)
+        return get_address_from_cache(ADDRESS) if 'universitätsplatz' in address.lower() else None
+
+    def reverse(self, coordinates):
+        self.requests.append(coordinates)
+        return get_address_from_cache(ADDRESS)
+
+    def fail(self, *args):
+        self.requests.append(args)
+        raise GeopyError('Timeout')
+
+
+@pytest.fixture(scope='function')
+def geocoder():
+    return Geocoder()
+
+
+@pytest.fixture(scope='function')
+def now(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    return now
+
+
+class TestGeocodeCache:
+    def test_geocode(self, geocoder):
+        cache = GeocodeCache()
+        location = cache.geocode(geocoder.geocode, ADDRESS)
+        assert location.latitude == get_address_from_cache(ADDRESS).latitude
+        assert cache.geocode(geocoder.geocode, f'  {ADDRESS.upper()} ') is location
+        assert cache.geocode(geocoder.geocode, ADDRESS.replace(',', '')) is location
+        assert geocoder.requests == [ADDRESS]
+        assert (cache.hits, cache.misses) == (2, 1)
+        assert cache.hit_rate == pytest.approx(2 / 3)
+        assert len(cache) == 1
+
+    def test_reverse(self, geocoder):
+        cache = GeocodeCache(precision=3)
+        location = cache.reverse(geocoder.reverse, (52.27345, 10.52969))
+        assert cache.reverse(geocoder.reverse, (52.2731, 10.5299)) is location
+        assert cache.reverse(geocoder.reverse, (52.275, 10.5299)) is not location
+        assert len(geocoder.requests) == 2
+
+    def test_ttl(self, geocoder, now):
+        cache = GeocodeCache(ttl=100, negative_ttl=10)
+        cache.geocode(geocoder.geocode, ADDRESS)
+        assert cache.geocode(geocoder.geocode, 'Unknown') is None
+
+        now[0] += 50
+        cache.geocode(geocoder.geocode, ADDRESS)
+        cache.geocode(geocoder.geocode, 'Unknown')
+        assert geocoder.requests == [ADDRESS, 'Unknown', 'Unknown']
+
+        now[0] += 51
+        cache.geocode(geocoder.geocode, ADDRESS)
+        assert geocoder.requests == [ADDRESS, 'Unknown', 'Unknown', ADDRESS]
+
+    def test_max_size(self, geocoder):
+        cache = GeocodeCache(max_size=2)
+        for address in ['a', 'b', 'a', 'c']:
+            cache.geocode(geocoder.geocode, address)
+        assert len(cache) == 2
+
+        # 'b' was the least recently used
+        cache.geocode(geocoder.geocode, 'a')
+        cache.geocode(geocoder.geocode, 'b')
+        assert geocoder.requests == ['a', 'b', 'c', 'b']
+
+    def test_errors_not_cached(self, geocoder):
+        cache = GeocodeCache()
+        for _ in range(2):
+            with pytest.raises(GeopyError):
+                cache.geocode(geocoder.fail, ADDRESS)
+        assert len(geocoder.requests) == 2
+        assert len(cache) == 0
+
+    def test_clear(self, geocoder):
+        cache = GeocodeCache()
+        cache.geocode(geocoder.geocode, ADDRESS)
+        cache.clear()
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses) == (0, 0)
+        assert cache.hit_rate == 0
+
+    def test_pickle(self, geocoder):
+        cache = GeocodeCache()
+        cache.geocode(geocoder.geocode, ADDRESS)
+        unpickled = pickle.loads(pickle.dumps(cache))
+        assert unpickled.geocode(geocoder.geocode, ADDRESS).address == (
+            cache.geocode(geocoder.geocode, ADDRESS).address
+        )
+        assert geocoder.requests == [ADDRESS]
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+import threading
+import time
+
+import pytest
+import requests
+from geopy import Photon
+from geopy.exc import GeocoderTimedOut, GeocoderUnavailable, GeocoderServiceError
+
+from components import Geocoder
+from tests.addresses import get_address_from_cache
+from tests.conftest import orig_geocode
+
+ADDRESS = 'Universitätsplatz 2, 38106 Braunschweig'
+
+
+@pytest.fixture(scope='function')
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, 'sleep', sleeps.append)
+    return sleeps
+
+
+class TestGeocoder:
+    def test_geocode(self, monkeypatch):
+        monkeypatch.setattr(Photon, 'geocode', get_address_from_cache)
+        monkeypatch.setattr(Photon, 'reverse', lambda *args: get_address_from_cache(ADDRESS))
+
+        geocoder = Geocoder()
+        assert geocoder.geocode(ADDRESS).address == get_address_from_cache(ADDRESS).address
+        assert geocoder.reverse((52.27, 10.52)).address == get_address_from_cache(ADDRESS).address
+
+    @pytest.mark.parametrize('exception', [GeocoderTimedOut, GeocoderUnavailable])
+    def test_retries(self, monkeypatch, sleeps, exception):
+        calls = []
+
+        def geocode(*args):
+            calls.append(args[1])
+            if len(calls) < 3:
+                raise exception()
+            return get_address_from_cache(*args)
+
+        monkeypatch.setattr(Photon, 'geocode', geocode)
+        geocoder = Geocoder(retries=2, backoff=0.5)
+        assert geocoder.geocode(ADDRESS) is not None
+        assert calls == [ADDRESS] * 3
+        assert sleeps == [0.5, 1]
+
+        calls.clear()
+        sleeps.clear()
+        with pytest.raises(exception):
+            Geocoder(retries=1, backoff=0.5).geocode(ADDRESS)
+        assert calls == [ADDRESS] * 2
+        assert sleeps == [0.5]
+
+    def test_no_retry_on_other_errors(self, monkeypatch, sleeps):
+        calls = []
+
+        def geocode(*args):
+            calls.append(args[1])
+            raise GeocoderServiceError()
+
+        monkeypatch.setattr(Photon, 'geocode', geocode)
+        with pytest.raises(GeocoderServiceError):
+            Geocoder().geocode(ADDRESS)
+        assert len(calls) == 1
+        assert sleeps == []
+
+    def test_max_concurrency(self, monkeypatch):
+        in_flight = 0
+        max_in_flight = 0
+        lock = threading.Lock()
+
+        def geocode(*args):
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return None
+
+        monkeypatch.setattr(Photon, 'geocode', geocode)
+        geocoder = Geocoder(max_concurrency=2)
+        threads = [threading.Thread(target=geocoder.geocode, args=(ADDRESS,)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert max_in_flight == 2
+
+    @pytest.mark.parametrize(
+        'exception, expected',
+        [(requests.Timeout, GeocoderTimedOut), (requests.ConnectionError, GeocoderUnavailable)],
+    )
+    def test_session_errors(self, monkeypatch, sleeps, exception, expected):
+        geocoder = Geocoder(retries=0)
+        requested_urls = []
+
+        def get(url, *args, **kwargs):
+            requested_urls.append(url)
+            raise exception('unreachable')
+
+        monkeypatch.setattr(geocoder._session, 'get', get)
+        monkeypatch.setattr(Photon, 'geocode', orig_geocode)
+        with pytest.raises(expected):
+            geocoder.geocode(ADDRESS)
+        assert len(requested_urls) == 1
+        assert requested_urls[0].startswith('https://photon.komoot')
@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 import datetime as dt
 import locale
-from components.helpers import setlocale
+import sys
+
+from components.helpers import setlocale, deep_getsizeof
 
 
 class TestHelpers:
@@ -20,3 +22,23 @@ class TestHelpers:
             assert date.strftime('%A') == 'Friday'
 
         assert locale.getlocale() == current_locale
+
+    def test_deep_getsizeof(self):
+        class Shared:
+            pass
+
+        payload = 'x' * 1000
+        shared = Shared()
+        shared.payload = 'y' * 10000
+        obj = {'a': [payload, payload], 'b': shared}
+
+        size = deep_getsizeof(obj)
+        assert size >= sys.getsizeof(obj) + sys.getsizeof(payload) + sys.getsizeof(shared.payload)
+        # The payload is referenced twice, but counted only once
+        assert size < sys.getsizeof(obj) + 2 * sys.getsizeof(payload) + sys.getsizeof(
+            shared.payload
+        )
+
+        excluded = deep_getsizeof(obj, exclude=(Shared,))
+        assert excluded < sys.getsizeof(shared.payload)
+        assert excluded >= sys.getsizeof(obj) + sys.getsizeof(payload)
@@ -1,10 +1,16 @@
 #!/usr/bin/env python
+import pickle
+import time
+from io import BytesIO
+
 import pytest
 import datetime as dt
 import responses
 import pandas as pd
+import vobject
 from geopy import Photon
-from components import Gender, Member, instruments, UserScore
+from geopy.exc import GeopyError
+from components import Gender, Member, instruments, UserScore, GeocodeCache, VCardCache
 from telegram import User
 
 from tests.addresses import get_address_from_cache
@@ -199,6 +205,46 @@ class TestMember:
         with pytest.raises(ValueError):
             member.set_address()
 
+    def test_set_address_geocode_cache(self, monkeypatch):
+        requests = []
+
+        def geocode(*args, **kwargs):
+            requests.append(args[1])
+            return get_address_from_cache(*args)
+
+        monkeypatch.setattr(Photon, 'geocode', geocode)
+        monkeypatch.setattr(Member, '_GEOCODE_CACHE', None)
+        cache = GeocodeCache()
+        Member.set_geocode_cache(cache)
+
+        member_1 = Member(1, address=self.address)
+        member_2 = Member(2, address=self.address)
+        assert member_1.address == member_2.address == 'Universitätsplatz 2, 38106 Braunschweig'
+        assert member_1._raw_address is not member_2._raw_address
+        assert requests == [self.address]
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_resolve_address(self, monkeypatch):
+        monkeypatch.setattr(Photon, 'geocode', get_address_from_cache)
+        location = Member.resolve_address(address=self.address)
+        assert location.address == get_address_from_cache(self.address).address
+
+        member = Member(1)
+        assert member.set_address(location=location) == 'Universitätsplatz 2, 38106 Braunschweig'
+        assert member.latitude == location.latitude
+        assert member.longitude == location.longitude
+
+        def geocode(*args, **kwargs):
+            raise GeopyError('Timeout')
+
+        monkeypatch.setattr(Photon, 'geocode', geocode)
+        assert Member.resolve_address(address=self.address) is None
+
+        with pytest.raises(ValueError, match='Exactly one'):
+            Member.resolve_address()
+        with pytest.raises(ValueError, match='Exactly one'):
+            member.set_address(address=self.address, location=location)
+
     def test_set_address_international(self, member, monkeypatch):
         monkeypatch.setattr(Photon, 'geocode', get_address_from_cache)
         assert 'Denmark' in member.set_address(address='Hammervej 20, 7160 Tørring, Dänemark')
@@ -344,6 +390,131 @@ class TestMember:
             vcard_string = vcard.read().decode('utf-8')
             assert 'TITLE:Lappenwart\, Pärchenwart' in vcard_string
 
+    def test_vcard_cache(self, member, bot, monkeypatch):
+        downloads = []
+
+        class FakeFile:
+            def download(self, out):
+                out.write(b'photo')
+
+        def get_file(file_id, *args, **kwargs):
+            downloads.append(file_id)
+            return FakeFile()
+
+        monkeypatch.setattr(bot, 'get_file', get_file)
+        monkeypatch.setattr(Member, '_VCARD_CACHE', None)
+        cache = VCardCache()
+        Member.set_vcard_cache(cache)
+
+        member.allow_contact_sharing = True
+        member.first_name = self.first_name
+        member.photo_file_id = 'photo_file_id'
+        with member.vcard(bot) as vcard:
+            vcard_string = vcard.read().decode('utf-8')
+        with member.vcard(bot) as vcard:
+            assert vcard.read().decode('utf-8') == vcard_string
+        assert downloads == ['photo_file_id']
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # The admin flag doesn't change the vCard
+        with member.vcard(bot, admin=True) as vcard:
+            assert vcard.read().decode('utf-8') == vcard_string
+        assert (cache.hits, cache.misses) == (2, 1)
+
+        # Changes of the member invalidate the cached vCard
+        member.first_name = 'Changed'
+        with member.vcard(bot) as vcard:
+            assert 'Changed' in vcard.read().decode('utf-8')
+        assert (cache.hits, cache.misses) == (2, 2)
+        assert downloads == ['photo_file_id'] * 2
+
+    def test_vcard_cache_address(self, member, bot, monkeypatch):
+        monkeypatch.setattr(Member, '_VCARD_CACHE', VCardCache())
+        member.allow_contact_sharing = True
+        # Photon locations contain unhashable properties like the extent
+        location = get_address_from_cache('777 Brockton Avenue, Abington MA 2351')
+        assert isinstance(location.raw['properties']['extent'], list)
+        member.set_address(location=location)
+
+        vcard_string = member.serialized_vcard(bot).decode('utf-8')
+        assert 'Abington' in vcard_string
+        assert member.serialized_vcard(bot).decode('utf-8') == vcard_string
+        assert (Member._VCARD_CACHE.hits, Member._VCARD_CACHE.misses) == (1, 1)
+
+        member.set_address(location=get_address_from_cache('30 Memorial Drive, Avon MA 2322'))
+        assert 'Avon' in member.serialized_vcard(bot).decode('utf-8')
+        assert (Member._VCARD_CACHE.hits, Member._VCARD_CACHE.misses) == (1, 2)
+
+    def test_write_vcards(self, bot, monkeypatch, tmp_path):
+        downloads = []
+
+        class FakeFile:
+            def __init__(self, file_id):
+                self.file_id = file_id
+
+            def download(self, out):
+                time.sleep(0.05)
+                out.write(self.file_id.encode())
+
+        def get_file(file_id, *args, **kwargs):
+            downloads.append(file_id)
+            return FakeFile(file_id)
+
+        monkeypatch.setattr(bot, 'get_file', get_file)
+        cache = VCardCache()
+        monkeypatch.setattr(Member, '_VCARD_CACHE', cache)
+
+        members = [
+            Member(
+                i, first_name=f'Name {i}', photo_file_id=f'photo_{i}', allow_contact_sharing=True
+            )
+            for i in range(8)
+        ]
+        with open(tmp_path / 'vcards.vcf', 'w+b') as file:
+            start = time.time()
+            assert Member.write_vcards(bot, members, file, max_workers=4) == 8
+            assert time.time() - start < 8 * 0.05
+            file.seek(0)
+            content = file.read()
+
+        vcards = list(vobject.readComponents(content.decode('utf-8')))
+        assert [vcard.fn.value for vcard in vcards] == [f'Name {i}' for i in range(8)]
+        assert sorted(downloads) == sorted(f'photo_{i}' for i in range(8))
+        # The export doesn't flood the cache
+        assert len(cache) == 0
+        assert content == b''.join(member.serialized_vcard(bot) for member in members)
+
+        members[0].allow_contact_sharing = False
+        with pytest.raises(ValueError, match='do not allow'):
+            Member.write_vcards(bot, members, BytesIO())
+        out = BytesIO()
+        assert Member.write_vcards(bot, members, out, admin=True) == 8
+        assert out.getvalue().count(b'BEGIN:VCARD') == 8
+
+    def test_write_vcards_bounded(self, bot, monkeypatch):
+        vcards = BytesIO()
+        written_at_download = {}
+
+        class FakeFile:
+            def __init__(self, file_id):
+                self.file_id = file_id
+
+            def download(self, out):
+                written_at_download[self.file_id] = vcards.getvalue().count(b'BEGIN:VCARD')
+                time.sleep(0.01)
+                out.write(self.file_id.encode())
+
+        monkeypatch.setattr(bot, 'get_file', lambda file_id, *args, **kwargs: FakeFile(file_id))
+        monkeypatch.setattr(Member, '_VCARD_CACHE', VCardCache())
+
+        members = [
+            Member(i, photo_file_id=f'photo_{i}', allow_contact_sharing=True) for i in range(12)
+        ]
+        assert Member.write_vcards(bot, members, vcards, max_workers=2) == 12
+        # A vCard is only built, once all but the last two vCards before it are written
+        for i in range(12):
+            assert written_at_download[f'photo_{i}'] >= i - 1
+
     def test_age(self, member, today):
         assert member.age is None
         member.date_of_birth = dt.date(1999, 12, 31)
@@ -494,6 +665,17 @@ class TestMember:
         assert new_member.functions == []
         assert new_member.joined is None
 
+    def test_pickle_backwards_compat(self):
+        member = Member(1, first_name='first')
+        assert not hasattr(member, '_geo_locator')
+
+        # Members used to carry their own geocoder
+        member._geo_locator = Photon(timeout=5)
+        unpickled = pickle.loads(pickle.dumps(member))
+        assert not hasattr(unpickled, '_geo_locator')
+        assert unpickled.first_name == 'first'
+        assert 'Photon' not in str(pickle.dumps(unpickled))
+
     def test_to_string(self, member, monkeypatch):
         monkeypatch.setattr(Photon, 'geocode', get_address_from_cache)
 
@@ -1,11 +1,21 @@
 #!/usr/bin/env python
+import pickle
+from threading import Thread
 from uuid import uuid4
 
 import pytest
 import datetime as dt
 from geopy import Photon
 
-from components import Gender, Member, instruments, Orchestra, Score, AttributeManager
+from components import (
+    Gender,
+    Member,
+    instruments,
+    Orchestra,
+    Score,
+    AttributeManager,
+    NameManager,
+)
 
 from tests.addresses import get_address_from_cache
 
@@ -134,6 +144,175 @@ class TestOrchestra:
         assert orchestra.attribute_managers['functions'].data == {'AkaNamenWart': {member}}
         assert orchestra.attribute_managers['photo_file_id'].data == {'Photo_File_ID': {member}}
 
+    @pytest.mark.parametrize('copy_members', [True, False])
+    def test_register_member_copy_members(self, member, copy_members):
+        orchestra = Orchestra(copy_members=copy_members)
+        member.first_name = 'first_name'
+        member.last_name = 'last_name'
+        member.gender = Gender.MALE
+        orchestra.register_member(member)
+
+        o_member = orchestra.members[member.user_id]
+        assert o_member is not member
+        for data in [
+            orchestra['first_name'].data,
+            orchestra['first_name'].male_data,
+            orchestra['full_name'].data,
+            orchestra['last_name'].data,
+        ]:
+            (m,) = list(data.values())[0]
+            assert (m is o_member) is not copy_members
+
+    def test_pickle_size(self):
+        orchestras = [Orchestra(), Orchestra(copy_members=True)]
+        for orchestra in orchestras:
+            for i in range(20):
+                orchestra.register_member(
+                    Member(i, first_name=str(i), last_name=str(i), gender=Gender.MALE)
+                )
+        shared, copied = (len(pickle.dumps(o)) for o in orchestras)
+        assert 1.5 * shared < copied
+
+    def test_update_member_only_changed_managers(self, orchestra, member):
+        member.first_name = 'first_name'
+        member.last_name = 'last_name'
+        orchestra.register_member(member)
+        for i in range(3):
+            orchestra.register_member(Member(i, first_name=str(i), last_name=str(i)))
+        o_member = orchestra.members[member.user_id]
+
+        def generations():
+            return {name: a_m.generation for name, a_m in orchestra.attribute_managers.items()}
+
+        a_m = orchestra.attribute_managers
+        hint_members = orchestra.hint_members(a_m['first_name'], a_m['last_name'])
+        before = generations()
+
+        o_member.phone_number = '123'
+        orchestra.update_member(o_member)
+        assert generations() == before
+        assert orchestra.hint_members(a_m['first_name'], a_m['last_name']) is hint_members
+
+        o_member.last_name = 'changed'
+        orchestra.update_member(o_member)
+        after = generations()
+        assert {name for name in before if before[name] != after[name]} == {
+            'last_name',
+            'full_name',
+        }
+        assert a_m['last_name'].data['changed'] == {member}
+        assert orchestra.hint_members(a_m['first_name'], a_m['last_name']) is not hint_members
+
+        o_member.gender = Gender.FEMALE
+        orchestra.update_member(o_member)
+        assert a_m['first_name'].female_data == {'first_name': {member}}
+
+        # Updating with another instance keeps the identity of the stored instance
+        member.nickname = 'nickname'
+        orchestra.update_member(member)
+        assert orchestra.members[member.user_id] is o_member
+        assert o_member.nickname == 'nickname'
+        assert o_member.gender is None
+        (nickname_member,) = a_m['nickname'].data['nickname']
+        assert nickname_member is o_member
+        assert a_m['first_name'].female_data == {}
+
+        with pytest.raises(ValueError, match='not registered'):
+            orchestra.update_member(Member(42))
+
+    def test_update_member_attribute(self, orchestra, member):
+        orchestra.register_member(member)
+        a_m = orchestra.attribute_managers
+        generation = a_m['instruments'].generation
+
+        orchestra.update_member_attribute(member.user_id, 'phone_number', '123')
+        assert orchestra.members[member.user_id].phone_number == '123'
+        assert a_m['instruments'].generation == generation
+
+        orchestra.update_member_attribute(member.user_id, 'instruments', [instruments.Tuba()])
+        assert orchestra.members[member.user_id].instruments == [instruments.Tuba()]
+        assert a_m['instruments'].data == {instruments.Tuba(): {member}}
+
+        with pytest.raises(ValueError, match='not registered'):
+            orchestra.update_member_attribute(42, 'phone_number', '123')
+
+    def test_update_member_concurrently(self, orchestra, member):
+        orchestra.register_member(member)
+        stored_member = orchestra.members[member.user_id]
+        attributes = ['first_name', 'last_name', 'nickname', 'phone_number']
+
+        def update(attribute):
+            for i in range(50):
+                orchestra.update_member_attribute(member.user_id, attribute, f'{attribute} {i}')
+
+        threads = [Thread(target=update, args=(attribute,)) for attribute in attributes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert orchestra.members[member.user_id] is stored_member
+        for attribute in attributes:
+            assert stored_member[attribute] == f'{attribute} 49'
+
+        # Editing a copy doesn't discard scores added in the meantime
+        copied_member = stored_member.copy()
+        stored_member.user_score.add_to_score(2, 1)
+        copied_member.nickname = 'Copy'
+        orchestra.update_member(copied_member)
+        assert stored_member.nickname == 'Copy'
+        assert stored_member.user_score.overall_score.answers == 2
+
+    @pytest.mark.parametrize('populated_orchestra', [{'members': 30}], indirect=True)
+    @pytest.mark.parametrize('copy_members', [True, False])
+    def test_from_members(self, populated_orchestra, copy_members):
+        members = list(populated_orchestra.members.values())
+        orchestra = Orchestra.from_members(members, copy_members=copy_members)
+
+        assert orchestra.members == populated_orchestra.members
+        assert all(orchestra.members[m.user_id] is not m for m in members)
+        for name, a_m in orchestra.attribute_managers.items():
+            expected = populated_orchestra.attribute_managers[name]
+            assert a_m.data == expected.data
+            if isinstance(a_m, NameManager):
+                assert a_m.male_data == expected.male_data
+                assert a_m.female_data == expected.female_data
+            for member in a_m.available_members:
+                assert (member is orchestra.members[member.user_id]) is not copy_members
+
+        # Double registration is not checked, the last member wins
+        orchestra = Orchestra.from_members(
+            [Member(1, first_name='first'), Member(1, first_name='second')]
+        )
+        assert orchestra.members[1].first_name == 'second'
+        assert orchestra.attribute_managers['first_name'].data == {'second': {Member(1)}}
+
+        # The orchestra can be used as usual afterwards
+        orchestra.register_member(Member(2, first_name='third'))
+        orchestra.kick_member(Member(1))
+        assert orchestra.attribute_managers['first_name'].data == {'third': {Member(2)}}
+
+    @pytest.mark.parametrize('populated_orchestra', [{'members': 10}], indirect=True)
+    def test_copy(self, populated_orchestra):
+        orchestra = populated_orchestra.copy()
+        assert orchestra is not populated_orchestra
+        assert orchestra.members == populated_orchestra.members
+        for name, a_m in orchestra.attribute_managers.items():
+            assert a_m.data == populated_orchestra.attribute_managers[name].data
+
+    @pytest.mark.parametrize('copy_members', [True, False])
+    @pytest.mark.parametrize('use_attribute_matrix', [True, False])
+    def test_copy_settings(self, copy_members, use_attribute_matrix):
+        orchestra = Orchestra(copy_members=copy_members, use_attribute_matrix=use_attribute_matrix)
+        orchestra.register_member(Member(1, first_name='first_name'))
+        copied = orchestra.copy()
+        assert copied.copy_members is copy_members
+        assert copied.use_attribute_matrix is use_attribute_matrix
+        stored = copied.members[1]
+        assert (
+            next(iter(copied.attribute_managers['first_name'].data['first_name'])) is stored
+        ) is not copy_members
+
     def test_kick_member(self, orchestra, member):
         member.first_name = 'first_name'
         member.last_name = 'last_name'
@@ -350,3 +529,183 @@ class TestOrchestra:
             ('photo_file_id', 'first_name'),
             ('photo_file_id', 'full_name'),
         ]
+
+    def test_hint_members(self, orchestra):
+        first_name, last_name = orchestra['first_name'], orchestra['last_name']
+        for i, name in enumerate(['John', 'Mike', 'Brad', 'Marc', 'Joe']):
+            orchestra.register_member(Member(i, first_name=name, gender=Gender.MALE))
+        assert orchestra.hint_members(last_name, first_name) == frozenset()
+
+        orchestra.register_member(
+            Member(9, first_name='Dong', last_name='Silver', gender=Gender.MALE)
+        )
+        assert orchestra.hint_members(last_name, first_name) == {Member(9)}
+        assert orchestra.hint_members(first_name, last_name) == frozenset()
+        assert orchestra.hint_members(last_name, first_name) == last_name.hint_members(first_name)
+
+        orchestra.update_member(Member(9, first_name='Dong', gender=Gender.MALE))
+        assert orchestra.hint_members(last_name, first_name) == frozenset()
+
+        orchestra.update_member(
+            Member(9, first_name='Dong', last_name='Silver', gender=Gender.MALE)
+        )
+        assert orchestra.hint_members(last_name, first_name) == {Member(9)}
+
+        orchestra.kick_member(Member(9))
+        assert orchestra.hint_members(last_name, first_name) == frozenset()
+
+    @pytest.mark.parametrize('multiple_choice', [True, False])
+    def test_question_space(self, orchestra, multiple_choice):
+        assert orchestra.question_space(multiple_choice) == {}
+
+        for i in range(5):
+            orchestra.register_member(
+                Member(
+                    i,
+                    first_name=f'first_{i}',
+                    last_name=f'last_{i}',
+                    photo_file_id=str(i),
+                    gender=Gender.MALE,
+                )
+            )
+
+        question_space = orchestra.question_space(multiple_choice)
+        for hint_manager in orchestra.attribute_managers.values():
+            for question_manager in orchestra.attribute_managers.values():
+                key = (hint_manager.description, question_manager.description)
+                expected = hint_manager.question_space(
+                    question_manager,
+                    multiple_choice=multiple_choice or key[1] == 'photo_file_id',
+                )
+                assert question_space.get(key, {}) == expected
+        assert ('first_name', 'photo_file_id') in question_space
+        assert question_space[('first_name', 'last_name')][Member(0)] == (
+            4 if multiple_choice else 0
+        )
+
+        # Changing the results must not affect the index
+        question_space[('first_name', 'last_name')].clear()
+        assert orchestra.question_space(multiple_choice)[('first_name', 'last_name')]
+
+    def test_draw_hint_member(self, orchestra):
+        first_name, last_name = orchestra['first_name'], orchestra['last_name']
+        with pytest.raises(RuntimeError, match='last_name currently not hintable for first_name'):
+            orchestra.draw_hint_member(last_name, first_name)
+
+        for i in range(10):
+            orchestra.register_member(Member(i, first_name=str(i), last_name=str(i)))
+
+        for _ in range(10):
+            member = orchestra.draw_hint_member(last_name, first_name, exclude_members=[Member(0)])
+            assert member in orchestra.hint_members(last_name, first_name)
+            assert member != Member(0)
+
+        member = orchestra.draw_hint_member(
+            last_name, first_name, exclude_members=[Member(i) for i in range(9)]
+        )
+        assert member == Member(9)
+
+        with pytest.raises(RuntimeError, match='last_name currently not hintable for first_name'):
+            orchestra.draw_hint_member(
+                last_name, first_name, exclude_members=[Member(i) for i in range(10)]
+            )
+
+    @pytest.mark.parametrize('multiple_choice', [True, False])
+    def test_is_hintable_with(self, orchestra, multiple_choice):
+        first_name, last_name = orchestra['first_name'], orchestra['last_name']
+        assert not orchestra.is_hintable_with(last_name, first_name, multiple_choice)
+
+        for i in range(4):
+            orchestra.register_member(Member(i, first_name=str(i), last_name=str(i)))
+
+        # The first round checks without the index, the second one uses the index entry
+        for build_index in [False, True]:
+            if build_index:
+                orchestra.hint_members(last_name, first_name, multiple_choice)
+            for exclude_members in [None, [], [Member(0)], [Member(0), Member(0)], [Member(42)]]:
+                assert orchestra.is_hintable_with(
+                    last_name, first_name, multiple_choice, exclude_members=exclude_members
+                ) == last_name.is_hintable_with(
+                    first_name, multiple_choice, exclude_members=exclude_members
+                )
+            all_members = [Member(i) for i in range(4)]
+            assert not orchestra.is_hintable_with(
+                last_name, first_name, multiple_choice, exclude_members=all_members
+            )
+            assert bool(orchestra._hint_index) is build_index
+        assert not orchestra.is_hintable_with(first_name, orchestra['full_name'], multiple_choice)
+
+    def test_hint_index_date_change(self, orchestra, monkeypatch):
+        class Date(dt.date):
+            @classmethod
+            def today(cls):
+                return dt.date(2020, 9, 5)
+
+        monkeypatch.setattr(dt, 'date', Date)
+        for i, date_of_birth in enumerate(
+            [dt.date(1990, 9, 5), dt.date(1989, 9, 6), dt.date(1992, 1, 1), dt.date(1993, 1, 1)]
+        ):
+            orchestra.register_member(Member(i, first_name=str(i), date_of_birth=date_of_birth))
+        first_name, age = orchestra['first_name'], orchestra['age']
+        assert orchestra.hint_members(first_name, age) == frozenset()
+
+        class Date2(dt.date):
+            @classmethod
+            def today(cls):
+                return dt.date(2020, 9, 6)
+
+        monkeypatch.setattr(dt, 'date', Date2)
+        # Looking up questions does not update the ages
+        assert orchestra.hint_members(first_name, age) == frozenset()
+        orchestra.refresh_changing_attributes()
+        assert len(orchestra.hint_members(first_name, age)) == 4
+
+    def test_questionable_cache(self, orchestra, monkeypatch):
+        class Date(dt.date):
+            @classmethod
+            def today(cls):
+                return dt.date(2020, 9, 5)
+
+        monkeypatch.setattr(dt, 'date', Date)
+        for i, date_of_birth in enumerate(
+            [dt.date(1990, 9, 5), dt.date(1989, 9, 6), dt.date(1992, 1, 1), dt.date(1993, 1, 1)]
+        ):
+            orchestra.register_member(Member(i, first_name=str(i), date_of_birth=date_of_birth))
+        first_name, age = orchestra['first_name'], orchestra['age']
+
+        questionable = orchestra.questionable()
+        assert (first_name, age) not in questionable
+        assert orchestra.questionable_cache_info() == {'hits': 0, 'misses': 1, 'size': 1}
+        questionable.clear()
+        assert orchestra.questionable() == orchestra.questionable()
+        assert (first_name, age) not in orchestra.questionable()
+        assert orchestra.questionable_cache_info() == {'hits': 3, 'misses': 1, 'size': 1}
+
+        orchestra.questionable(exclude_members=[Member(0)])
+        orchestra.questionable(exclude_members=[Member(0)])
+        orchestra.questionable(multiple_choice=False, exclude_members=[Member(0)])
+        assert orchestra.questionable_cache_info() == {'hits': 4, 'misses': 3, 'size': 3}
+
+        # Updates that don't change the attribute managers keep the cache
+        generation = orchestra.generation
+        orchestra.update_member_attribute(0, 'phone_number', '123')
+        assert orchestra.generation == generation
+        orchestra.questionable()
+        assert orchestra.questionable_cache_info() == {'hits': 5, 'misses': 3, 'size': 3}
+
+        orchestra.update_member_attribute(0, 'last_name', 'last_name')
+        assert orchestra.generation > generation
+        orchestra.questionable()
+        assert orchestra.questionable_cache_info() == {'hits': 5, 'misses': 4, 'size': 1}
+
+        class Date2(dt.date):
+            @classmethod
+            def today(cls):
+                return dt.date(2020, 9, 6)
+
+        monkeypatch.setattr(dt, 'date', Date2)
+        orchestra.refresh_changing_attributes()
+        assert (first_name, age) in orchestra.questionable()
+        assert orchestra.questionable_cache_info() == {'hits': 5, 'misses': 5, 'size': 1}
+
+        assert orchestra.__getstate__()['_questionable_cache'] == {}
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+import os
+import pickle
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from telegram import Message, PhotoSize
+
+from components import PhotoCache, PHOTO_OPTIONS
+
+COLORS = {'red': (255, 0, 0), 'green': (0, 255, 0), 'blue': (0, 0, 255), 'black': (0, 0, 0)}
+
+
+class FakeFile:
+    def __init__(self, file_id):
+        self.file_id = file_id
+        # File IDs like 'red_new' refer to the same file as 'red'
+        self.file_unique_id = file_id.split('_new')[0]
+        self.downloads = 0
+
+    def download_as_bytearray(self):
+        self.downloads += 1
+        # File IDs like 'red_2' have the same content as 'red'
+        out = BytesIO()
+        Image.new('RGB', (50, 80), COLORS[self.file_id.split('_')[0]]).save(out, format='JPEG')
+        return bytearray(out.getvalue())
+
+
+@pytest.fixture(scope='function')
+def downloads(bot, monkeypatch):
+    downloads = []
+
+    def get_file(file_id, *args, **kwargs):
+        downloads.append(file_id)
+        return FakeFile(file_id)
+
+    monkeypatch.setattr(bot, 'get_file', get_file)
+    return downloads
+
+
+@pytest.fixture(scope='function')
+def photo_cache(tmp_path):
+    return PhotoCache(str(tmp_path), size=40)
+
+
+class TestPhotoCache:
+    def test_photo(self, bot, downloads, photo_cache, tmp_path):
+        path = photo_cache.photo(bot, 'red')
+        assert os.path.isfile(path)
+        assert os.path.dirname(path) == str(tmp_path / 'photos')
+        assert photo_cache.photo(bot, 'red') == path
+        assert downloads == ['red']
+
+        # Same content, different file ID
+        assert photo_cache.photo(bot, 'red_2') == path
+        assert downloads == ['red', 'red_2']
+        assert len(os.listdir(tmp_path / 'photos')) == 1
+
+    def test_photo_file_unique_id(self, bot, downloads, photo_cache, monkeypatch, tmp_path):
+        files = []
+        get_file = bot.get_file
+
+        def counting_get_file(file_id, *args, **kwargs):
+            files.append(get_file(file_id))
+            return files[-1]
+
+        monkeypatch.setattr(bot, 'get_file', counting_get_file)
+
+        path = photo_cache.photo(bot, 'red')
+        assert photo_cache.photo(bot, 'red_new') == path
+        assert downloads == ['red', 'red_new']
+        assert [file.downloads for file in files] == [1, 0]
+
+        # If the unique file ID is known, no request is needed at all
+        assert photo_cache.photo(bot, 'red_newer', file_unique_id='red') == path
+        assert downloads == ['red', 'red_new']
+
+        # Unknown unique file IDs are requested as usual
+        assert photo_cache.photo(bot, 'green', file_unique_id='green') != path
+        assert downloads == ['red', 'red_new', 'green']
+
+    def test_collage(self, bot, downloads, photo_cache, tmp_path):
+        file_ids = ['red', 'green', 'blue', 'black']
+        path = photo_cache.collage(bot, file_ids)
+        with Image.open(path) as collage:
+            assert collage.size == (80, 80)
+            # Check the centers of the four quadrants
+            for (x_pos, y_pos), file_id in zip([(20, 30), (60, 30), (20, 70), (60, 70)], file_ids):
+                pixel = collage.getpixel((x_pos, y_pos))
+                assert all(abs(p - c) < 30 for p, c in zip(pixel, COLORS[file_id]))
+
+        assert photo_cache.collage(bot, ['red_2', 'green', 'blue', 'black']) == path
+        assert photo_cache.collage(bot, ['green', 'red', 'blue', 'black']) != path
+        assert len(os.listdir(tmp_path / 'collages')) == 2
+        assert len(os.listdir(tmp_path / 'photos')) == 4
+
+        with pytest.raises(ValueError, match=str(len(PHOTO_OPTIONS))):
+            photo_cache.collage(bot, file_ids[:3])
+
+    def test_send_collage(self, bot, downloads, photo_cache, monkeypatch, tmp_path):
+        sent = []
+
+        def send_photo(chat_id, photo, **kwargs):
+            sent.append(photo if isinstance(photo, str) else 'upload')
+            return Message(
+                1, None, None, None, photo=[PhotoSize('collage_file_id', 'unique_id', 80, 80)]
+            )
+
+        monkeypatch.setattr(bot, 'send_photo', send_photo)
+
+        file_ids = ['red', 'green', 'blue', 'black']
+        photo_cache.send_collage(bot, 123, file_ids)
+        photo_cache.send_collage(bot, 123, file_ids)
+        assert sent == ['upload', 'collage_file_id']
+
+        unpickled = pickle.loads(pickle.dumps(photo_cache))
+        unpickled.send_collage(bot, 123, file_ids)
+        assert sent[-1] == 'collage_file_id'
+        assert downloads == file_ids
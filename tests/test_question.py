@@ -177,6 +177,7 @@ class TestQuestion:
             ('first last', True),
             ('first nick', True),
             ('nick last', False),
+            ('last nick first', True),
             ('nick', False),
             ('last', False),
             ('fisrt nik lst', False),
@@ -192,6 +193,23 @@ class TestQuestion:
         assert q.check_answer(update) is result
         assert q.correct_answer == member.full_name
 
+    @pytest.mark.parametrize(
+        'answer, result',
+        [
+            ('maximilian max maximilian', True),
+            ('maximilian maximilian max', True),
+            ('max maximilian', False),
+            ('maximilian', False),
+        ],
+    )
+    def test_check_answer_free_text_full_name_all_words(self, answer, result, member):
+        member.first_name = 'Maximilian'
+        member.nickname = 'Max'
+        member.last_name = 'Maximilian'
+        q = Question(member, Question.FULL_NAME, multiple_choice=False)
+        update = Update(1, message=Message(1, None, None, None, text=answer))
+        assert q.check_answer(update) is result
+
     @pytest.mark.parametrize(
         'answer, result',
         [
@@ -282,6 +300,23 @@ class TestQuestion:
         assert q.check_answer(update) is result
         assert q.correct_answer == member.functions_str
 
+    @pytest.mark.parametrize(
+        'gender, answer, result',
+        [
+            (Gender.MALE, 'Frauenwart', True),
+            (Gender.MALE, 'Männerwart', False),
+            (Gender.FEMALE, 'Männerwart', True),
+            (None, 'Pärchenwart', True),
+            (None, 'Frauenwart', False),
+        ],
+    )
+    def test_check_answer_free_text_function_aliases(self, gender, answer, result, member):
+        member.gender = gender
+        member.functions = ['Pärchenwart']
+        q = Question(member, Question.FUNCTIONS, multiple_choice=False)
+        update = Update(1, message=Message(1, None, None, None, text=answer))
+        assert q.check_answer(update) is result
+
     @pytest.mark.parametrize(
         'answer, result',
         [
@@ -1,9 +1,27 @@
 #!/usr/bin/env python
 import random
+import threading
 import pytest
 
-from telegram import Update, PollAnswer, User, Message, Chat, Location, Poll, PollOption
-from components import Member, Orchestra, Questioner, Question
+from telegram import (
+    Update,
+    PollAnswer,
+    User,
+    Message,
+    Chat,
+    Location,
+    Poll,
+    PollOption,
+    TelegramError,
+)
+from components import (
+    Member,
+    Orchestra,
+    Questioner,
+    Question,
+    PhotoCache,
+    DailyQuiz,
+)
 
 
 @pytest.fixture(scope='function')
@@ -55,6 +73,7 @@ class TestQuestioner:
         assert questioner.orchestra is orchestra
         assert questioner.bot is bot
         assert questioner.multiple_choice is True
+        assert questioner.prefetch is False
         assert questioner.score.answers == 0
         assert not questioner.current_question
         assert not questioner.check_update(Update(123))
@@ -535,3 +554,324 @@ class TestQuestioner:
         questioner.number_of_questions_asked = 42
         with pytest.raises(RuntimeError, match='No more questions to ask!'):
             questioner.ask_question()
+
+    @pytest.mark.parametrize('populated_orchestra', [{'members': 30}], indirect=True)
+    def test_prefetch(self, bot, chat_id, populated_orchestra, empty_member, monkeypatch):
+        def send_poll(*args, **kwargs):
+            return fake_poll()
+
+        def send_pass(*args, **kwargs):
+            pass
+
+        for method in ['send_photo', 'send_media_group', 'send_message']:
+            monkeypatch.setattr(bot, method, send_pass)
+        monkeypatch.setattr(bot, 'send_poll', send_poll)
+
+        orchestra = populated_orchestra
+        orchestra.register_member(empty_member)
+        questioner = Questioner(
+            user_id=int(chat_id),
+            orchestra=orchestra,
+            hint_attributes=['first_name'],
+            question_attributes=['last_name'],
+            number_of_questions=3,
+            bot=bot,
+            prefetch=True,
+        )
+
+        synchronous_preparations = 0
+        prepare_question = questioner._prepare_question
+
+        def counting_prepare_question(number):
+            nonlocal synchronous_preparations
+            if threading.current_thread() is threading.main_thread():
+                synchronous_preparations += 1
+            return prepare_question(number)
+
+        monkeypatch.setattr(questioner, '_prepare_question', counting_prepare_question)
+
+        questioner.ask_question()
+        assert synchronous_preparations == 1
+        prepared = questioner._prefetched.result()
+
+        # The prefetched question is used
+        questioner.ask_question()
+        assert synchronous_preparations == 1
+        assert questioner.current_question.member is prepared.member
+        assert questioner.current_question.attribute == 'last_name'
+        questioner._prefetched.result()
+
+        # The orchestra changed in the meantime, so the question is prepared again
+        orchestra.register_member(Member(1234, first_name='first', last_name='last'))
+        questioner.ask_question()
+        assert synchronous_preparations == 2
+
+        # Nothing is prefetched after the last question
+        assert questioner.number_of_questions_asked == 3
+        assert questioner._prefetched is None
+
+    @pytest.mark.parametrize('populated_orchestra', [{'members': 30}], indirect=True)
+    @pytest.mark.parametrize(
+        'hint_attribute, question_attribute, expected_calls',
+        [
+            ('first_name', 'photo_file_id', ['media_group', 'media_group', 'poll']),
+            ('photo_file_id', 'last_name', ['photo', 'poll']),
+        ],
+    )
+    def test_send_order(
+        self,
+        bot,
+        chat_id,
+        populated_orchestra,
+        empty_member,
+        monkeypatch,
+        hint_attribute,
+        question_attribute,
+        expected_calls,
+    ):
+        calls = []
+        poll_message = None
+
+        def record(name):
+            def send(*args, **kwargs):
+                nonlocal poll_message
+                calls.append(name)
+                if name == 'poll':
+                    poll_message = fake_poll()
+                    return poll_message
+
+            return send
+
+        monkeypatch.setattr(bot, 'send_media_group', record('media_group'))
+        monkeypatch.setattr(bot, 'send_photo', record('photo'))
+        monkeypatch.setattr(bot, 'send_poll', record('poll'))
+
+        orchestra = populated_orchestra
+        orchestra.register_member(empty_member)
+        questioner = Questioner(
+            user_id=int(chat_id),
+            orchestra=orchestra,
+            hint_attributes=[hint_attribute],
+            question_attributes=[question_attribute],
+            number_of_questions=2,
+            bot=bot,
+            prefetch=True,
+        )
+
+        questioner.ask_question()
+        assert calls == expected_calls
+        assert questioner.current_question.poll is poll_message.poll
+        assert questioner.number_of_questions_asked == 1
+
+    @pytest.mark.parametrize('populated_orchestra', [{'members': 30}], indirect=True)
+    def test_send_failure(self, bot, chat_id, populated_orchestra, empty_member, monkeypatch):
+        calls = []
+
+        def send_media_group(*args, **kwargs):
+            calls.append('media_group')
+            raise TelegramError('media group failed')
+
+        def send_poll(*args, **kwargs):
+            calls.append('poll')
+            return fake_poll()
+
+        monkeypatch.setattr(bot, 'send_media_group', send_media_group)
+        monkeypatch.setattr(bot, 'send_poll', send_poll)
+
+        orchestra = populated_orchestra
+        orchestra.register_member(empty_member)
+        questioner = Questioner(
+            user_id=int(chat_id),
+            orchestra=orchestra,
+            hint_attributes=['first_name'],
+            question_attributes=['photo_file_id'],
+            number_of_questions=2,
+            bot=bot,
+            prefetch=True,
+        )
+
+        with pytest.raises(TelegramError, match='media group failed'):
+            questioner.ask_question()
+
+        # The remaining requests of the question are skipped
+        assert calls == ['media_group']
+        assert questioner.current_question is None
+        assert questioner.number_of_questions_asked == 0
+        # Neither the question nor the prefetched one count as drawn
+        assert questioner._prefetched is None
+        assert not questioner._drawn
+
+    @pytest.mark.parametrize('populated_orchestra', [{'members': 30}], indirect=True)
+    def test_photo_collage(
+        self, bot, chat_id, populated_orchestra, empty_member, monkeypatch, tmp_path
+    ):
+        calls = []
+
+        def send_poll(*args, **kwargs):
+            calls.append('poll')
+            return fake_poll()
+
+        def send_media_group(*args, **kwargs):
+            calls.append('media_group')
+
+        def collage(bot, file_ids):
+            calls.append(('collage', tuple(file_ids)))
+
+        def send_collage(bot, chat_id, file_ids):
+            calls.append(('send_collage', tuple(file_ids)))
+
+        photo_cache = PhotoCache(str(tmp_path))
+        monkeypatch.setattr(photo_cache, 'collage', collage)
+        monkeypatch.setattr(photo_cache, 'send_collage', send_collage)
+        monkeypatch.setattr(bot, 'send_poll', send_poll)
+        monkeypatch.setattr(bot, 'send_media_group', send_media_group)
+
+        orchestra = populated_orchestra
+        orchestra.register_member(empty_member)
+        questioner = Questioner(
+            user_id=int(chat_id),
+            orchestra=orchestra,
+            hint_attributes=['first_name'],
+            question_attributes=['photo_file_id'],
+            number_of_questions=2,
+            bot=bot,
+            photo_cache=photo_cache,
+        )
+        assert questioner.photo_cache is photo_cache
+
+        questioner.ask_question()
+        assert len(calls) == 3
+        assert calls[0][0] == 'collage'
+        assert calls[1] == ('send_collage', calls[0][1])
+        assert calls[2] == 'poll'
+        assert questioner.current_question.attribute == 'photo_file_id'
+
+    def test_deck(self, bot, chat_id, empty_orchestra, empty_member, monkeypatch):
+        monkeypatch.setattr(bot, 'send_message', lambda *args, **kwargs: None)
+
+        orchestra = empty_orchestra
+        orchestra.register_member(empty_member)
+        for i in range(5):
+            orchestra.register_member(Member(i, first_name=f'first_{i}', last_name=f'last_{i}'))
+
+        questioner = Questioner(
+            user_id=int(chat_id),
+            orchestra=orchestra,
+            hint_attributes=['first_name'],
+            question_attributes=['last_name'],
+            number_of_questions=13,
+            bot=bot,
+            multiple_choice=False,
+        )
+
+        def ask(number):
+            user_ids = []
+            for _ in range(number):
+                questioner.ask_question()
+                user_ids.append(questioner.current_question.member.user_id)
+            return user_ids
+
+        # No repetitions until the deck is exhausted
+        assert sorted(ask(5)) == list(range(5))
+        first = ask(3)
+        assert len(set(first)) == 3
+
+        # New members are added to the current round
+        orchestra.register_member(Member(5, first_name='first_5', last_name='last_5'))
+        second = ask(3)
+        assert sorted(first + second) == list(range(6))
+
+        assert len(set(ask(2))) == 2
+
+    def test_deck_discarded_prefetch(
+        self, bot, chat_id, empty_orchestra, empty_member, monkeypatch
+    ):
+        monkeypatch.setattr(bot, 'send_message', lambda *args, **kwargs: None)
+
+        orchestra = empty_orchestra
+        orchestra.register_member(empty_member)
+        for i in range(5):
+            orchestra.register_member(Member(i, first_name=f'first_{i}', last_name=f'last_{i}'))
+
+        questioner = Questioner(
+            user_id=int(chat_id),
+            orchestra=orchestra,
+            hint_attributes=['first_name'],
+            question_attributes=['last_name'],
+            number_of_questions=6,
+            bot=bot,
+            multiple_choice=False,
+            prefetch=True,
+        )
+
+        user_ids = []
+        questioner.ask_question()
+        user_ids.append(questioner.current_question.member.user_id)
+        discarded = questioner._prefetched.result().member.user_id
+
+        # The orchestra changed, so the prefetched question is discarded and put back to the deck
+        orchestra.register_member(Member(5, first_name='first_5', last_name='last_5'))
+        for _ in range(5):
+            questioner.ask_question()
+            user_ids.append(questioner.current_question.member.user_id)
+            if len(user_ids) == 2:
+                assert (
+                    user_ids[-1] == discarded
+                    or ('first_name', 'last_name', discarded) not in questioner._drawn
+                )
+
+        assert discarded in user_ids
+        assert sorted(user_ids) == list(range(6))
+
+    def test_deck_empty(self, bot, chat_id, empty_orchestra, empty_member, monkeypatch):
+        empty_orchestra.register_member(empty_member)
+        for i in range(4):
+            empty_orchestra.register_member(Member(i, nickname=str(i), last_name=str(i)))
+
+        questioner = Questioner(
+            user_id=int(chat_id),
+            orchestra=empty_orchestra,
+            hint_attributes=['nickname'],
+            question_attributes=['last_name'],
+            number_of_questions=42,
+            bot=bot,
+        )
+        monkeypatch.setattr(questioner, 'questionable', lambda: [])
+        with pytest.raises(RuntimeError, match='no questions available'):
+            questioner.ask_question()
+
+    def test_daily_quiz(self, bot, chat_id, empty_orchestra, empty_member, monkeypatch):
+        sent_polls = []
+
+        def send_poll(*args, **kwargs):
+            sent_polls.append(kwargs)
+            return fake_poll()
+
+        monkeypatch.setattr(bot, 'send_poll', send_poll)
+        monkeypatch.setattr(bot, 'send_message', lambda *args, **kwargs: None)
+
+        empty_orchestra.register_member(empty_member)
+        for i in range(5):
+            empty_orchestra.register_member(
+                Member(i, first_name=f'first_{i}', last_name=f'last_{i}')
+            )
+        daily_quiz = DailyQuiz.generate(empty_orchestra, number_of_questions=3)
+
+        questioner = Questioner(
+            user_id=int(chat_id),
+            orchestra=empty_orchestra,
+            hint_attributes=[],
+            question_attributes=[],
+            number_of_questions=42,
+            bot=bot,
+            daily_quiz=daily_quiz,
+        )
+        assert questioner.number_of_questions == 3
+
+        for daily_question in daily_quiz.questions:
+            questioner.ask_question()
+            question = questioner.current_question
+            assert question.member.user_id == daily_question.user_id
+            assert question.attribute == daily_question.question_attribute
+            assert sent_polls[-1]['options'] == list(daily_question.options)
+            assert sent_polls[-1]['correct_option_id'] == daily_question.correct_option_id
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from components import VCardCache, PhotoCache
+
+
+class FakeFile:
+    def __init__(self, file_id):
+        self.file_id = file_id
+        self.file_unique_id = file_id
+
+    def download(self, out):
+        out.write(self.download_as_bytearray())
+
+    def download_as_bytearray(self):
+        out = BytesIO()
+        Image.new('RGB', (50, 80), (255, 0, 0)).save(out, format='JPEG')
+        return bytearray(out.getvalue())
+
+
+@pytest.fixture(scope='function')
+def downloads(bot, monkeypatch):
+    downloads = []
+
+    def get_file(file_id, *args, **kwargs):
+        downloads.append(file_id)
+        return FakeFile(file_id)
+
+    monkeypatch.setattr(bot, 'get_file', get_file)
+    return downloads
+
+
+class TestVCardCache:
+    def test_vcard(self):
+        cache = VCardCache(max_size=2)
+        builds = []
+
+        def build(content):
+            def _build():
+                builds.append(content)
+                return content
+
+            return _build
+
+        assert cache.vcard('a', build(b'a')) == b'a'
+        assert cache.vcard('a', build(b'other')) == b'a'
+        assert builds == [b'a']
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        cache.vcard('b', build(b'b'))
+        cache.vcard('a', build(b'a'))
+        cache.vcard('c', build(b'c'))
+        assert len(cache) == 2
+        # 'b' was the least recently used entry
+        cache.vcard('b', build(b'b'))
+        assert builds == [b'a', b'b', b'c', b'b']
+
+        cache.clear()
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses) == (0, 0)
+
+    def test_vcard_no_store(self):
+        cache = VCardCache()
+        assert cache.vcard('a', lambda: b'a', store=False) == b'a'
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses) == (0, 1)
+
+        # Cached vCards are still used
+        cache.vcard('a', lambda: b'a')
+        assert cache.vcard('a', lambda: b'other', store=False) == b'a'
+        assert len(cache) == 1
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_vcard_failed_build(self):
+        cache = VCardCache()
+
+        def fail():
+            raise RuntimeError('Download failed')
+
+        with pytest.raises(RuntimeError, match='Download failed'):
+            cache.vcard('a', fail)
+        assert len(cache) == 0
+        assert cache.vcard('a', lambda: b'a') == b'a'
+
+    def test_photo_without_photo_cache(self, bot, downloads):
+        cache = VCardCache()
+        content = cache.photo(bot, 'photo')
+        assert content == bytes(FakeFile('photo').download_as_bytearray())
+        assert cache.photo(bot, 'photo') == content
+        assert downloads == ['photo', 'photo']
+
+    def test_photo_with_photo_cache(self, bot, downloads, tmp_path):
+        cache = VCardCache(photo_cache=PhotoCache(str(tmp_path)))
+        content = cache.photo(bot, 'photo')
+        assert content == bytes(FakeFile('photo').download_as_bytearray())
+        assert cache.photo(bot, 'photo') == content
+        assert downloads == ['photo']